@@ -0,0 +1,216 @@
+"""
+Host Capabilities
+What this host can do, detected once at startup and refreshed rarely:
+ffmpeg/ffprobe versions, the encoders and filters the transcode pipeline
+needs, usable CPU cores and whether the storage backends answer.
+
+The result is cached in memory, so the readiness endpoint and the
+transcode pipeline read it without spawning a process per call. Free disk
+space is read live (a statvfs call, no subprocess).
+"""
+
+import os
+import shutil
+import time
+import threading
+import subprocess
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# In order of preference; the transcode pipeline uses the first one available
+VIDEO_ENCODERS = ("libx264", "libopenh264")
+AUDIO_ENCODERS = ("aac", "libfdk_aac")
+REQUIRED_FILTERS = ("scale", "crop")
+
+# readiness() outcomes
+READY = "ready"            # everything needed to serve uploads and transcodes
+DEGRADED = "degraded"      # serving, but a configured storage backend does not answer
+NOT_READY = "not_ready"    # not probed yet, ffmpeg unusable or out of disk
+
+
+def available_cpus() -> int:
+    """CPU cores this process may use (CPU affinity and the cgroup v2 quota, e.g. a container limit)"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _run(args: List[str], timeout: float = 10) -> Optional[str]:
+    """stdout of a command, or None when it is missing, fails or hangs"""
+    try:
+        result = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Capability probe {' '.join(args)} failed: {e}")
+        return None
+    if result.returncode != 0:
+        logger.warning(f"Capability probe {' '.join(args)} exited with {result.returncode}: {result.stderr[-500:]}")
+        return None
+    return result.stdout
+
+
+def _listed_names(output: Optional[str]) -> List[str]:
+    """
+    Names from ``ffmpeg -encoders`` / ``-filters``: each entry is a flags
+    column followed by the name, after a legend that ends with a dashed line
+    """
+    if not output:
+        return []
+    lines = output.splitlines()
+    start = next((i + 1 for i, line in enumerate(lines) if line.strip().startswith("---")), 0)
+    return [line.split()[1] for line in lines[start:] if len(line.split()) >= 2]
+
+
+def _free_mb(path: str) -> Optional[float]:
+    # Directories created on first use are measured on their nearest existing parent
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+    try:
+        return round(shutil.disk_usage(path).free / 2**20, 1)
+    except OSError:
+        return None
+
+
+class Capabilities:
+    """
+    Cached capability probe
+
+    Usage:
+        capabilities = Capabilities({"scratch": tempfile.gettempdir()}, storage_status=...)
+        capabilities.start()              # first probe in the background, then every refresh_interval
+        capabilities.video_encoder        # "libx264", or None when ffmpeg has no H.264 encoder
+        status, report = capabilities.readiness()
+    """
+
+    def __init__(self, disk_paths: Dict[str, str], storage_status: Optional[Callable[[], Dict[str, Dict[str, Any]]]] = None,
+                 refresh_interval: float = 3600, min_free_mb: float = 500):
+        self.disk_paths = disk_paths
+        self.storage_status = storage_status
+        self.refresh_interval = refresh_interval
+        self.min_free_mb = min_free_mb
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def probe(self) -> Dict[str, Any]:
+        """Run the probe now (blocking: spawns ffmpeg/ffprobe and calls the storage backends)"""
+        with self._lock:
+            started = time.perf_counter()
+            version = _run(["ffmpeg", "-hide_banner", "-version"])
+            probe_version = _run(["ffprobe", "-hide_banner", "-version"])
+            encoders = _listed_names(_run(["ffmpeg", "-hide_banner", "-encoders"])) if version else []
+            filters = _listed_names(_run(["ffmpeg", "-hide_banner", "-filters"])) if version else []
+
+            storage = {}
+            if self.storage_status is not None:
+                try:
+                    storage = self.storage_status()
+                except Exception as e:
+                    logger.error(f"Storage capability probe failed: {e}")
+                    storage = {"error": str(e)}
+
+            snapshot = {
+                "probed_at": time.time(),
+                "probe_seconds": round(time.perf_counter() - started, 3),
+                "ffmpeg": {
+                    "available": version is not None,
+                    "version": version.splitlines()[0] if version else None,
+                    "ffprobe_version": probe_version.splitlines()[0] if probe_version else None,
+                    "video_encoder": next((name for name in VIDEO_ENCODERS if name in encoders), None),
+                    "audio_encoder": next((name for name in AUDIO_ENCODERS if name in encoders), None),
+                    "encoders": [name for name in VIDEO_ENCODERS + AUDIO_ENCODERS if name in encoders],
+                    "missing_filters": [name for name in REQUIRED_FILTERS if name not in filters]
+                },
+                "cpus": available_cpus(),
+                "storage": storage
+            }
+            self._snapshot = snapshot
+        logger.info(f"Capabilities probed in {snapshot['probe_seconds']:.2f}s: ffmpeg "
+                    f"{'available' if version else 'missing'}, video encoder {snapshot['ffmpeg']['video_encoder']}")
+        return snapshot
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Last probe result (None until the first probe finished)"""
+        return self._snapshot
+
+    def _ffmpeg(self, key: str) -> Any:
+        snapshot = self._snapshot
+        return snapshot["ffmpeg"][key] if snapshot is not None else None
+
+    @property
+    def video_encoder(self) -> Optional[str]:
+        return self._ffmpeg("video_encoder")
+
+    @property
+    def audio_encoder(self) -> Optional[str]:
+        return self._ffmpeg("audio_encoder")
+
+    def disk(self) -> Dict[str, Dict[str, Any]]:
+        """Free space per watched directory, read now"""
+        return {
+            name: {"path": path, "free_mb": _free_mb(path)}
+            for name, path in self.disk_paths.items()
+        }
+
+    def readiness(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        READY, DEGRADED or NOT_READY with the reasons and the cached report
+        (no subprocess - safe to call on every readiness check)
+        """
+        snapshot = self._snapshot
+        disk = self.disk()
+        problems, warnings = [], []
+        if snapshot is None:
+            problems.append("capabilities not probed yet")
+        else:
+            ffmpeg = snapshot["ffmpeg"]
+            if not ffmpeg["available"]:
+                problems.append("ffmpeg not available")
+            else:
+                if ffmpeg["video_encoder"] is None:
+                    problems.append(f"no H.264 encoder (need one of {', '.join(VIDEO_ENCODERS)})")
+                if ffmpeg["audio_encoder"] is None:
+                    problems.append(f"no AAC encoder (need one of {', '.join(AUDIO_ENCODERS)})")
+                if ffmpeg["missing_filters"]:
+                    problems.append(f"ffmpeg filters missing: {', '.join(ffmpeg['missing_filters'])}")
+            for backend, status in snapshot["storage"].items():
+                if isinstance(status, dict) and status.get("configured") and not status.get("reachable"):
+                    warnings.append(f"{backend} storage unreachable")
+        for name, usage in disk.items():
+            if usage["free_mb"] is not None and usage["free_mb"] < self.min_free_mb:
+                problems.append(f"{name} directory has {usage['free_mb']:.0f}MB free (minimum {self.min_free_mb:.0f}MB)")
+
+        status = NOT_READY if problems else DEGRADED if warnings else READY
+        return status, {
+            "status": status,
+            "problems": problems,
+            "warnings": warnings,
+            "disk": disk,
+            "capabilities": snapshot
+        }
+
+    def start(self) -> None:
+        """Probe in a background thread now and every refresh_interval"""
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.probe()
+                except Exception as e:
+                    logger.error(f"Capability probe failed: {e}")
+                self._stop.wait(self.refresh_interval)
+
+        threading.Thread(target=run, name="capability-probe", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
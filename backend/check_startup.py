@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the backend (cold start)
+
+Imports main in fresh interpreters and reports the median import time and
+the slowest top-level imports (python -X importtime). Fails when the median
+exceeds the budget or when a platform SDK that should load lazily is
+imported at startup, so CI catches cold-start regressions.
+
+Usage:
+    python check_startup.py --runs 5 --budget-ms 600 [--json startup.json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Imported on first use (lazy_imports) - must not be loaded by "import main"
+LAZY_MODULES = ("instagrapi", "googleapiclient", "google_auth_oauthlib", "google.oauth2", "boto3", "httplib2")
+
+PROBE = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "import main\n"
+    "print(time.perf_counter() - started)\n"
+    f"print('eager:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+)
+
+
+def import_once(work_dir: str) -> dict:
+    """Import main in a fresh interpreter; returns seconds, eagerly loaded SDKs and per-module timings"""
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        BASE_URL=os.getenv("BASE_URL", "http://localhost:8000"),
+        INSTAGRAM_REDIRECT_URI=os.getenv("INSTAGRAM_REDIRECT_URI", "http://localhost:3000/auth/instagram/callback"),
+        SESSION_STORE_URL=f"sqlite:///{work_dir}/sessions.db",
+        IDEMPOTENCY_STORE_URL=f"sqlite:///{work_dir}/idempotency.db",
+        JOB_QUEUE_URL=f"sqlite:///{work_dir}/jobs.db"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=work_dir, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+    seconds, eager = result.stdout.splitlines()[-2:]
+    eager = eager[len("eager:"):]
+
+    # "import time: self [us] | cumulative | imported package", nested by
+    # indentation; a module's imports are listed before the module itself
+    imported_by_main = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            children[name.strip()] = int(cumulative) / 1000
+        elif depth == 0:
+            if name.strip() == "main":
+                imported_by_main = children
+            children = {}
+    return {"seconds": float(seconds), "eager": [name for name in eager.split(",") if name], "modules": imported_by_main}
+
+
+def check_startup(runs: int, budget_ms: float, top: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="cast-startup-") as work_dir:
+        samples = [import_once(work_dir) for _ in range(runs)]
+
+    # The first run also pays for cold .pyc compilation and disk cache
+    timed = samples[1:] or samples
+    median_ms = statistics.median(sample["seconds"] for sample in timed) * 1000
+    slowest = sorted(timed[-1]["modules"].items(), key=lambda item: item[1], reverse=True)[:top]
+    eager = sorted({name for sample in samples for name in sample["eager"]})
+    return {
+        "runs": runs,
+        "median_ms": round(median_ms, 1),
+        "first_run_ms": round(samples[0]["seconds"] * 1000, 1),
+        "budget_ms": budget_ms,
+        "eager_platform_imports": eager,
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest},
+        "ok": median_ms <= budget_ms and not eager
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure how long importing the backend takes")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=600)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = check_startup(args.runs, args.budget_ms, args.top)
+    print(f"import main: median {report['median_ms']}ms over {args.runs - 1 or 1} warm run(s), "
+          f"first run {report['first_run_ms']}ms (budget {args.budget_ms:.0f}ms)")
+    for name, ms in report["slowest_imports_ms"].items():
+        print(f"  {ms:>8.1f}ms  {name}")
+    if report["eager_platform_imports"]:
+        print(f"❌ Imported at startup instead of lazily: {', '.join(report['eager_platform_imports'])}")
+    if report["median_ms"] > args.budget_ms:
+        print("❌ Startup import time over budget")
+    if report["ok"]:
+        print("✅ Startup import time within budget")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(0 if report["ok"] else 1)
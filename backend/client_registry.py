@@ -0,0 +1,217 @@
+"""
+Client Registry
+Bounded registry for live instagrapi Client objects and pending 2FA clients
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None if it cannot be read"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class ClientRegistry:
+    """
+    LRU registry of logged-in clients plus a TTL map of pending 2FA clients
+
+    At most ``max_resident`` logged-in clients are kept in memory. When the
+    limit is exceeded, or a client has been idle for ``idle_ttl`` seconds,
+    the least recently used client is evicted: its settings are handed to
+    ``spill(account, client)`` so it can be persisted, and ``restore(account)``
+    rebuilds it on the next access. Clients parked while waiting for a 2FA
+    code expire after ``pending_ttl`` seconds. ``start()`` sweeps every
+    ``sweep_interval`` seconds, so expiry does not wait for the next access.
+    """
+
+    def __init__(self, max_resident: int = 50, idle_ttl: float = 1800, pending_ttl: float = 600,
+                 max_pending: int = 100,
+                 spill: Optional[Callable[[str, Any], None]] = None,
+                 restore: Optional[Callable[[str], Any]] = None,
+                 sweep_interval: float = 60):
+        self.max_resident = max_resident
+        self.idle_ttl = idle_ttl
+        self.pending_ttl = pending_ttl
+        self.max_pending = max_pending
+        self.spill = spill
+        self.restore = restore
+        self.sweep_interval = sweep_interval
+
+        self._resident: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._pending: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.hits = 0
+        self.restores = 0
+        self.evictions = 0
+        self.expired_pending = 0
+
+    # -- logged-in clients -------------------------------------------------
+
+    def get(self, account: str) -> Optional[Any]:
+        """
+        Get a logged-in client, restoring it from spilled settings if needed
+
+        Args:
+            account: Account identifier (Instagram username)
+
+        Returns:
+            Client, or None if the account has no live or restorable session
+        """
+        with self._lock:
+            entry = self._resident.get(account)
+            if entry is not None:
+                self._resident[account] = (time.monotonic(), entry[1])
+                self._resident.move_to_end(account)
+                self.hits += 1
+                return entry[1]
+
+        if self.restore is None:
+            return None
+        client = self.restore(account)
+        if client is None:
+            return None
+        with self._lock:
+            self.restores += 1
+        self.put(account, client)
+        return client
+
+    def put(self, account: str, client: Any) -> None:
+        """Register a logged-in client (drops any pending 2FA client for it)"""
+        with self._lock:
+            self._pending.pop(account, None)
+            self._resident[account] = (time.monotonic(), client)
+            self._resident.move_to_end(account)
+            evicted = self._collect_evictions()
+        self._spill(evicted)
+
+    def remove(self, account: str) -> bool:
+        """Drop an account's resident and pending clients without spilling (logout)"""
+        with self._lock:
+            resident = self._resident.pop(account, None)
+            pending = self._pending.pop(account, None)
+        return resident is not None or pending is not None
+
+    def __contains__(self, account: str) -> bool:
+        with self._lock:
+            return account in self._resident
+
+    def accounts(self) -> List[str]:
+        """Resident accounts, most recently used first"""
+        with self._lock:
+            return list(reversed(self._resident))
+
+    # -- pending 2FA clients -----------------------------------------------
+
+    def put_pending(self, account: str, client: Any) -> None:
+        """Park a client that is waiting for a 2FA verification code"""
+        with self._lock:
+            self._pending[account] = (time.monotonic(), client)
+            self._pending.move_to_end(account)
+            self._expire_pending()
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.expired_pending += 1
+
+    def get_pending(self, account: str) -> Optional[Any]:
+        """Get the client parked for 2FA completion, if it has not expired"""
+        with self._lock:
+            self._expire_pending()
+            entry = self._pending.get(account)
+            return entry[1] if entry is not None else None
+
+    def has_pending(self, account: str) -> bool:
+        return self.get_pending(account) is not None
+
+    # -- maintenance -------------------------------------------------------
+
+    def sweep(self) -> None:
+        """Evict idle clients and expire pending ones"""
+        with self._lock:
+            self._expire_pending()
+            evicted = self._collect_evictions()
+        self._spill(evicted)
+
+    def start(self) -> None:
+        """Sweep in a background thread every sweep_interval"""
+        def run():
+            while not self._stop.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Client registry sweep failed: {e}")
+
+        threading.Thread(target=run, name="client-registry-sweep", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry counters and memory accounting"""
+        self.sweep()
+        with self._lock:
+            return {
+                "resident": len(self._resident),
+                "max_resident": self.max_resident,
+                "pending_2fa": len(self._pending),
+                "hits": self.hits,
+                "restores": self.restores,
+                "evictions": self.evictions,
+                "expired_pending": self.expired_pending,
+                "process_rss_bytes": process_rss_bytes()
+            }
+
+    def _collect_evictions(self) -> List[Tuple[str, Any]]:
+        """Pop LRU and idle clients (lock held); spilling happens outside the lock"""
+        evicted = []
+        now = time.monotonic()
+        while self._resident:
+            account, (last_used, client) = next(iter(self._resident.items()))
+            over_limit = len(self._resident) > self.max_resident
+            idle = self.idle_ttl and now - last_used > self.idle_ttl
+            if not (over_limit or idle):
+                break
+            self._resident.popitem(last=False)
+            evicted.append((account, client))
+            self.evictions += 1
+        return evicted
+
+    def _expire_pending(self) -> None:
+        """Drop pending 2FA clients older than pending_ttl (lock held)"""
+        now = time.monotonic()
+        while self._pending:
+            account, (parked_at, _) = next(iter(self._pending.items()))
+            if now - parked_at <= self.pending_ttl:
+                break
+            self._pending.popitem(last=False)
+            self.expired_pending += 1
+            logger.info(f"Expired pending 2FA client for {account}")
+
+    def _spill(self, evicted: List[Tuple[str, Any]]) -> None:
+        for account, client in evicted:
+            if self.spill is None:
+                continue
+            try:
+                self.spill(account, client)
+                logger.info(f"Spilled idle client for {account} to saved settings")
+            except Exception as e:
+                logger.warning(f"Failed to spill client for {account}: {e}")
@@ -0,0 +1,172 @@
+"""
+Bounded Executors
+Named thread pools for blocking work called from async endpoints, each with
+its own concurrency limit and queue limit
+"""
+
+import math
+import time
+import asyncio
+import threading
+import contextvars
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(HTTPException):
+    """Raised when an executor's queue is full - surfaces as 503 (or 429) with Retry-After"""
+
+    def __init__(self, name: str, retry_after: int = 5, status_code: int = 503):
+        super().__init__(
+            status_code=status_code,
+            detail=f"Server busy ({name} operations at capacity), please retry shortly",
+            headers={"Retry-After": str(retry_after)}
+        )
+        self.executor_name = name
+
+
+class BoundedExecutor:
+    """
+    Thread pool with ``max_workers`` running calls and at most ``max_queue``
+    calls waiting; further submissions are rejected (with ``reject_status``)
+    instead of piling up. Retry-After is estimated from the average call
+    duration and the backlog ahead.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, reject_status: int = 503):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.reject_status = reject_status
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self.avg_duration = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Submit a blocking call
+
+        Raises:
+            ExecutorSaturated: all workers busy and the queue is full
+        """
+        with self._lock:
+            if self._active + self._queued >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                logger.warning(f"Executor {self.name} saturated ({self._active} running, {self._queued} queued)")
+                raise ExecutorSaturated(self.name, self._retry_after(), self.reject_status)
+            self._queued += 1
+            self.peak_queued = max(self.peak_queued, self._queued)
+        # Carry context variables (e.g. the current trace span) into the worker thread
+        future = self._pool.submit(contextvars.copy_context().run, self._call, fn, args, kwargs)
+        future.add_done_callback(self._release_cancelled)
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on this executor and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return concurrency counters and saturation (0-1)"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._queued,
+                "saturation": round((self._active + self._queued) / (self.max_workers + self.max_queue), 3),
+                "peak_queued": self.peak_queued,
+                "avg_duration": round(self.avg_duration, 3),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _retry_after(self) -> int:
+        """Seconds until a slot is likely free (lock held)"""
+        if not self.avg_duration:
+            return 5
+        backlog = (self._active + self._queued) / self.max_workers
+        return min(300, max(1, math.ceil(self.avg_duration * backlog / 2)))
+
+    def _release_cancelled(self, future: Future) -> None:
+        # A call cancelled while still queued (awaiting task cancelled, client
+        # gone, shutdown) never reaches _call - free its queue slot here
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _call(self, fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        started = time.monotonic()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            duration = time.monotonic() - started
+            with self._lock:
+                self._active -= 1
+                # Exponentially weighted, so Retry-After follows recent load
+                self.avg_duration = duration if not self.avg_duration else 0.8 * self.avg_duration + 0.2 * duration
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+
+class Executors:
+    """
+    Registry of named bounded executors
+
+    Usage:
+        executors = Executors({"youtube": (8, 64), "ffmpeg": (2, 8, 429)})
+        response = await executors.run("youtube", request.execute)
+
+    Limits are (max_workers, max_queue) or (max_workers, max_queue, reject_status).
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[int, ...]]):
+        self._executors = {
+            name: BoundedExecutor(name, *limit)
+            for name, limit in limits.items()
+        }
+
+    def __getitem__(self, name: str) -> BoundedExecutor:
+        return self._executors[name]
+
+    async def run(self, name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call on the named executor"""
+        return await self._executors[name].run(fn, *args, **kwargs)
+
+    def bind(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Async wrapper that always runs fn on the named executor"""
+        async def wrapper(*args, **kwargs):
+            return await self.run(name, fn, *args, **kwargs)
+        return wrapper
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return stats for every executor"""
+        return {name: executor.stats() for name, executor in self._executors.items()}
+
+    def shutdown(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown()
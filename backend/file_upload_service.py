@@ -4,12 +4,14 @@ Handles uploading files to AWS S3 or other cloud providers
 """
 
 import os
-import boto3
 import uuid
+import time
+import hashlib
 import requests
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import HTTPException
 import logging
+from metrics import instrument_boto3_client
 
 logger = logging.getLogger(__name__)
 
@@ -27,15 +29,20 @@ class FileUploadService:
         self.cloudinary_api_key = os.getenv('CLOUDINARY_API_KEY')
         self.cloudinary_api_secret = os.getenv('CLOUDINARY_API_SECRET')
         
+        # Keep-alive connections to Cloudinary, shared by all uploads
+        self.http = requests.Session()
+        
         # Initialize S3 client if credentials are available
         if self.aws_access_key and self.aws_secret_key and self.bucket_name:
             try:
+                import boto3   # Only needed when S3 is configured; slow to import
                 self.s3_client = boto3.client(
                     's3',
                     aws_access_key_id=self.aws_access_key,
                     aws_secret_access_key=self.aws_secret_key,
                     region_name=self.region
                 )
+                instrument_boto3_client(self.s3_client)
                 logger.info("S3 client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize S3 client: {e}")
@@ -90,6 +97,38 @@ class FileUploadService:
             logger.error(f"Failed to upload file to S3: {e}")
             return None
     
+    def storage_status(self, timeout: float = 5) -> Dict[str, Dict[str, Any]]:
+        """
+        Whether each storage backend is configured and answers (S3 HeadBucket,
+        Cloudinary Admin API ping) - for the readiness probe, not per upload
+        """
+        status = {
+            "s3": {"configured": self.s3_client is not None, "reachable": None},
+            "cloudinary": {
+                "configured": all([self.cloudinary_cloud_name, self.cloudinary_api_key, self.cloudinary_api_secret]),
+                "reachable": None
+            }
+        }
+        if status["s3"]["configured"]:
+            try:
+                self.s3_client.head_bucket(Bucket=self.bucket_name)
+                status["s3"]["reachable"] = True
+            except Exception as e:
+                status["s3"].update(reachable=False, error=str(e))
+        if status["cloudinary"]["configured"]:
+            try:
+                response = self.http.get(
+                    f"https://api.cloudinary.com/v1_1/{self.cloudinary_cloud_name}/ping",
+                    auth=(self.cloudinary_api_key, self.cloudinary_api_secret),
+                    timeout=timeout
+                )
+                status["cloudinary"]["reachable"] = response.status_code == 200
+                if response.status_code != 200:
+                    status["cloudinary"]["error"] = f"HTTP {response.status_code}"
+            except Exception as e:
+                status["cloudinary"].update(reachable=False, error=str(e))
+        return status
+
     def upload_video_to_cloudinary(self, file_content: bytes, filename: str) -> Optional[str]:
         """
         Upload video file to Cloudinary and return public URL
@@ -114,23 +153,21 @@ class FileUploadService:
                 'file': (filename, file_content, 'video/mp4')
             }
             
+            timestamp = str(int(time.time()))
             data = {
                 'api_key': self.cloudinary_api_key,
-                'timestamp': str(int(time.time())),
+                'timestamp': timestamp,
                 'folder': 'instagram-uploads',
                 'resource_type': 'video'
             }
             
             # Generate signature (simplified - in production, use proper signature generation)
-            import hashlib
-            import time
-            timestamp = str(int(time.time()))
             string_to_sign = f"folder=instagram-uploads&resource_type=video&timestamp={timestamp}{self.cloudinary_api_secret}"
             signature = hashlib.sha1(string_to_sign.encode()).hexdigest()
             data['signature'] = signature
             
             # Upload to Cloudinary
-            response = requests.post(upload_url, files=files, data=data, timeout=30)
+            response = self.http.post(upload_url, files=files, data=data, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
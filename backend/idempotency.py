@@ -0,0 +1,290 @@
+"""
+Idempotency Store
+Records of requests made with an Idempotency-Key header, so a client retry
+replays the stored response (or waits for the original request) instead of
+publishing the same video twice.
+
+Backends:
+    sqlite:///path/to/idempotency.db  - local file, shared by all workers on a host
+    redis://host:port/db              - shared by all instances (requires the redis package)
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, UploadFile
+from fastapi.responses import Response
+
+logger = logging.getLogger(__name__)
+
+# begin() outcomes
+STARTED = "started"          # caller owns the key and must complete() or release() it
+IN_FLIGHT = "in_flight"      # another request with this key is still running
+COMPLETED = "completed"      # stored response available for replay
+MISMATCH = "mismatch"        # key was used for a different request
+
+# Response headers worth replaying besides the body
+REPLAYED_HEADERS = ("location", "preference-applied", "retry-after")
+
+
+class IdempotencyStore(ABC):
+    """
+    Interface shared by the backends
+
+    A key is held ``in_flight`` while its first request runs, for at most
+    ``lock_ttl`` seconds (after that it is considered abandoned and can be
+    taken over). Completed responses are kept for ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = 86400, lock_ttl: float = 900):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+
+    @abstractmethod
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Claim a key for a request
+
+        Returns:
+            (outcome, record) - record is the stored entry for IN_FLIGHT,
+            COMPLETED and MISMATCH, None for STARTED
+        """
+
+    @abstractmethod
+    def complete(self, key: str, status_code: int, body: str, headers: Dict[str, str]) -> None:
+        """Store the response of the request that owns the key"""
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Forget an in-flight key (the request failed and may be retried)"""
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """SQLite-backed idempotency store (WAL, shared by all workers on a host)"""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            " key TEXT PRIMARY KEY,"
+            " fingerprint TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " status_code INTEGER,"
+            " body TEXT,"
+            " headers TEXT,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._last_purge = 0.0
+        logger.info(f"SQLite idempotency store ready: {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["headers"] = json.loads(record["headers"]) if record["headers"] else {}
+        return record
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if now - self._last_purge > 3600:
+                self._last_purge = now
+                conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (now,))
+            row = conn.execute(
+                "SELECT * FROM idempotency_keys WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                conn.execute("COMMIT")
+                record = self._record(row)
+                if record["fingerprint"] != fingerprint:
+                    return MISMATCH, record
+                return record["state"], record
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, state, created_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint, IN_FLIGHT, now, now + self.lock_ttl)
+            )
+            conn.execute("COMMIT")
+            return STARTED, None
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def complete(self, key: str, status_code: int, body: str, headers: Dict[str, str]) -> None:
+        self._connection().execute(
+            "UPDATE idempotency_keys SET state = ?, status_code = ?, body = ?, headers = ?, expires_at = ?"
+            " WHERE key = ?",
+            (COMPLETED, status_code, body, json.dumps(headers), time.time() + self.ttl, key)
+        )
+
+    def release(self, key: str) -> None:
+        self._connection().execute(
+            "DELETE FROM idempotency_keys WHERE key = ? AND state = ?",
+            (key, IN_FLIGHT)
+        )
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """
+    Redis-backed idempotency store
+
+    Each key is a JSON string at ``{prefix}:{key}``; claims use SET NX and
+    both states expire through Redis TTLs.
+    """
+
+    def __init__(self, url: str, prefix: str = "idempotency", **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("The redis package is required for redis:// idempotency stores (pip install redis)")
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        logger.info(f"Redis idempotency store ready: {url.split('@')[-1]}")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def begin(self, key: str, fingerprint: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        record = {"fingerprint": fingerprint, "state": IN_FLIGHT, "created_at": time.time()}
+        while True:
+            if self.client.set(self._key(key), json.dumps(record), nx=True, px=int(self.lock_ttl * 1000)):
+                return STARTED, None
+            raw = self.client.get(self._key(key))
+            if raw is None:
+                # Expired between SET and GET - claim again
+                continue
+            existing = json.loads(raw)
+            if existing["fingerprint"] != fingerprint:
+                return MISMATCH, existing
+            return existing["state"], existing
+
+    def complete(self, key: str, status_code: int, body: str, headers: Dict[str, str]) -> None:
+        raw = self.client.get(self._key(key))
+        record = json.loads(raw) if raw else {"created_at": time.time()}
+        record.update({
+            "state": COMPLETED,
+            "status_code": status_code,
+            "body": body,
+            "headers": headers
+        })
+        self.client.set(self._key(key), json.dumps(record), ex=int(self.ttl))
+
+    def release(self, key: str) -> None:
+        raw = self.client.get(self._key(key))
+        if raw and json.loads(raw)["state"] == IN_FLIGHT:
+            self.client.delete(self._key(key))
+
+
+def create_idempotency_store(url: str, **kwargs) -> IdempotencyStore:
+    """
+    Create an idempotency store from a URL
+
+    Args:
+        url: sqlite:///relative/or/absolute/path.db or redis://host:port/db
+        **kwargs: ttl, lock_ttl
+
+    Returns:
+        IdempotencyStore instance
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteIdempotencyStore(url[len("sqlite:///"):], **kwargs)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisIdempotencyStore(url, **kwargs)
+    raise ValueError(f"Unsupported IDEMPOTENCY_STORE_URL: {url}")
+
+
+def _retrying(operation: str, key: str, call, attempts: int, backoff: float) -> bool:
+    for attempt in range(1, attempts + 1):
+        try:
+            call()
+            return True
+        except Exception as e:
+            if attempt == attempts:
+                logger.error(f"Idempotency {operation} for {key} failed after {attempts} attempt(s): {e}")
+                return False
+            logger.warning(f"Idempotency {operation} for {key} failed (attempt {attempt}), retrying: {e}")
+            time.sleep(backoff * 2 ** (attempt - 1))
+    return False
+
+
+def complete_key(store: IdempotencyStore, key: str, status_code: int, body: str, headers: Dict[str, str],
+                 attempts: int = 5, backoff: float = 0.2) -> bool:
+    """
+    Store the response of a request that already succeeded, retrying store
+    errors (blocking). Never raises: the publish happened, so a storage
+    failure must not turn into an error response. Returns whether it was stored.
+    """
+    return _retrying("complete", key, lambda: store.complete(key, status_code, body, headers), attempts, backoff)
+
+
+def release_key(store: IdempotencyStore, key: str, attempts: int = 3, backoff: float = 0.2) -> bool:
+    """Forget an in-flight key, retrying store errors (blocking, never raises)"""
+    return _retrying("release", key, lambda: store.release(key), attempts, backoff)
+
+
+async def request_fingerprint(request: Request, params: Dict[str, Any]) -> str:
+    """
+    Hash of what a request asks for: path, form fields and uploaded files
+    (name and size - the content is not read), or the raw JSON body
+    """
+    parts = [request.method, request.url.path]
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, Request):
+            continue
+        if isinstance(value, UploadFile):
+            parts.append(f"{name}=file:{value.filename}:{value.size}")
+        else:
+            parts.append(f"{name}={value!r}")
+    if request.headers.get("content-type", "").startswith("application/json"):
+        parts.append((await request.body()).decode("utf-8", "replace"))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def replay_response(record: Dict[str, Any]) -> Response:
+    """Rebuild a stored response (marked with Idempotent-Replayed: true)"""
+    headers = dict(record.get("headers") or {})
+    headers["Idempotent-Replayed"] = "true"
+    return Response(
+        content=record["body"],
+        status_code=record["status_code"],
+        headers=headers,
+        media_type="application/json"
+    )
+
+
+def response_record(response: Response) -> Tuple[int, str, Dict[str, str]]:
+    """(status_code, body, replayable headers) of a JSON response"""
+    headers = {name: value for name, value in response.headers.items() if name in REPLAYED_HEADERS}
+    return response.status_code, response.body.decode("utf-8"), headers
@@ -10,13 +10,26 @@ import logging
 import uuid
 import time
 import secrets
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, Optional, Any
 from fastapi import HTTPException
 from urllib.parse import urlencode
 from file_upload_service import FileUploadService
+from tracing import span
 
 logger = logging.getLogger(__name__)
 
+# Media containers expire after 24h; a checkpointed one is reused for less
+CONTAINER_CHECKPOINT_TTL = 23 * 3600
+
+# Trace span name of each publish step
+STAGE_SPANS = {"media_url": "storage_upload", "container_id": "container", "published": "publish"}
+
+
+def _run_stage(saga, name: str, fn, ttl: Optional[float] = None):
+    """Run a publish step (traced) as a checkpointed saga stage when a saga is given"""
+    with span(STAGE_SPANS.get(name, name)):
+        return saga.stage(name, fn, ttl) if saga is not None else fn()
+
 
 class InstagramGraphAPI:
     """
@@ -24,7 +37,16 @@ class InstagramGraphAPI:
     Requires: Instagram Business or Creator account with Facebook Page connection
     """
     
-    def __init__(self):
+    def __init__(self, file_uploads: Callable[[], FileUploadService] = FileUploadService):
+        """
+        Args:
+            file_uploads: Returns the FileUploadService for media uploads
+                (a shared one from the service container, or a new one per call)
+        """
+        self.file_uploads = file_uploads
+        # Keep-alive connections to graph.facebook.com, shared by all calls
+        self.http = requests.Session()
+        
         # Facebook App Configuration (required for Instagram Graph API)
         self.app_id = os.getenv("FACEBOOK_APP_ID")
         self.app_secret = os.getenv("FACEBOOK_APP_SECRET")
@@ -107,7 +129,7 @@ class InstagramGraphAPI:
         logger.info(f"Token endpoint: {token_url}")
         logger.info(f"Redirect URI: {self.redirect_uri}")
         logger.info(f"Client ID: {self.app_id}")
-        logger.info(f"Request params: {dict(params)}")
+        logger.info("Request params: %s", dict(params))
         
         # Validate code format
         if not code or len(code) < 10:
@@ -119,10 +141,10 @@ class InstagramGraphAPI:
             raise HTTPException(status_code=400, detail="Invalid verification code format.")
         
         try:
-            response = requests.post(token_url, data=params, timeout=30)
+            response = self.http.post(token_url, data=params, timeout=30)
             
             logger.info(f"Facebook response status: {response.status_code}")
-            logger.info(f"Facebook response: {response.text}")
+            logger.info("Facebook response: %s", response.text)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -167,7 +189,7 @@ class InstagramGraphAPI:
         logger.info("Validating access token with user info")
         
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -201,10 +223,10 @@ class InstagramGraphAPI:
         
         logger.info("Fetching user's Facebook Pages (Instagram Graph API)")
         logger.info(f"Request URL: {url}")
-        logger.info(f"Request params: {params}")
+        logger.info("Request params: %s", params)
         
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -214,7 +236,7 @@ class InstagramGraphAPI:
             
             data = response.json()
             logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response data: {data}")
+            logger.info("Response data: %s", data)
             
             if "error" in data:
                 error_msg = data['error'].get('message', 'Failed to get Facebook Pages')
@@ -273,7 +295,7 @@ class InstagramGraphAPI:
         logger.info(f"Fetching Instagram account for Facebook Page: {page_id}")
         
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -323,7 +345,7 @@ class InstagramGraphAPI:
         logger.info(f"Fetching Instagram user info: {ig_user_id}")
         
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -370,7 +392,7 @@ class InstagramGraphAPI:
         logger.info(f"Creating Reel container for user: {ig_user_id}")
         
         try:
-            response = requests.post(url, data=params, timeout=30)
+            response = self.http.post(url, data=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -419,7 +441,7 @@ class InstagramGraphAPI:
         logger.info(f"Publishing Reel: {creation_id}")
         
         try:
-            response = requests.post(url, data=params, timeout=30)
+            response = self.http.post(url, data=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -441,7 +463,7 @@ class InstagramGraphAPI:
             logger.error(f"Failed to publish Reel: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to publish Reel: {str(e)}")
 
-    def upload_and_publish_reel(self, ig_user_id: str, access_token: str, video_file, caption: str = "") -> Dict[str, Any]:
+    def upload_and_publish_reel(self, ig_user_id: str, access_token: str, video_file, caption: str = "", saga=None) -> Dict[str, Any]:
         """
         Upload and publish Instagram Reel
         
@@ -450,6 +472,7 @@ class InstagramGraphAPI:
             access_token: Facebook Page access token
             video_file: Video file object
             caption: Reel caption
+            saga: Optional PublishSaga - completed steps of an earlier attempt are skipped
             
         Returns:
             dict with published reel data
@@ -459,35 +482,38 @@ class InstagramGraphAPI:
             logger.info(f"Caption: {caption}")
             
             # Step 1: Upload video file to cloud storage
-            file_upload_service = FileUploadService()
-            
-            # Read file content
-            video_file.seek(0)  # Reset file pointer
-            file_content = video_file.read()
+            def upload_media():
+                file_upload_service = self.file_uploads()
+                
+                # Read file content
+                video_file.seek(0)  # Reset file pointer
+                file_content = video_file.read()
+                
+                # Upload to cloud storage and get public URL
+                return file_upload_service.upload_video(
+                    file_content=file_content,
+                    filename=f"reel_{ig_user_id}_{int(time.time())}.mp4",
+                    content_type="video/mp4"
+                )
             
-            # Upload to cloud storage and get public URL
-            media_url = file_upload_service.upload_video(
-                file_content=file_content,
-                filename=f"reel_{ig_user_id}_{int(time.time())}.mp4",
-                content_type="video/mp4"
-            )
+            media_url = _run_stage(saga, "media_url", upload_media)
             
             logger.info(f"Video uploaded to cloud storage: {media_url}")
             
             # Step 2: Create Reel container using Instagram Graph API
-            container_id = self.create_reel_container(
+            container_id = _run_stage(saga, "container_id", lambda: self.create_reel_container(
                 ig_user_id=ig_user_id,
                 access_token=access_token,
                 video_url=media_url,
                 caption=caption
-            )
+            ), CONTAINER_CHECKPOINT_TTL)
             
             # Step 3: Publish the Reel
-            published_reel = self.publish_reel(
+            published_reel = _run_stage(saga, "published", lambda: self.publish_reel(
                 ig_user_id=ig_user_id,
                 access_token=access_token,
                 creation_id=container_id
-            )
+            ))
             
             logger.info(f"Reel uploaded and published successfully: {published_reel.get('id')}")
             
@@ -530,7 +556,7 @@ class InstagramGraphAPI:
         logger.info(f"Creating Story container for user: {ig_user_id}")
         
         try:
-            response = requests.post(url, data=params, timeout=30)
+            response = self.http.post(url, data=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -579,7 +605,7 @@ class InstagramGraphAPI:
         logger.info(f"Publishing Story: {creation_id}")
         
         try:
-            response = requests.post(url, data=params, timeout=30)
+            response = self.http.post(url, data=params, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -601,7 +627,7 @@ class InstagramGraphAPI:
             logger.error(f"Failed to publish Story: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Failed to publish Story: {str(e)}")
 
-    def upload_and_publish_story(self, ig_user_id: str, access_token: str, video_file, caption: str = "") -> Dict[str, Any]:
+    def upload_and_publish_story(self, ig_user_id: str, access_token: str, video_file, caption: str = "", saga=None) -> Dict[str, Any]:
         """
         Upload and publish Instagram Story
         
@@ -610,6 +636,7 @@ class InstagramGraphAPI:
             access_token: Facebook Page access token
             video_file: Video file object
             caption: Story caption
+            saga: Optional PublishSaga - completed steps of an earlier attempt are skipped
             
         Returns:
             dict with published story data
@@ -619,36 +646,39 @@ class InstagramGraphAPI:
             logger.info(f"Caption: {caption}")
             
             # Step 1: Upload video file to cloud storage
-            file_upload_service = FileUploadService()
-            
-            # Read file content
-            video_file.seek(0)  # Reset file pointer
-            file_content = video_file.read()
+            def upload_media():
+                file_upload_service = self.file_uploads()
+                
+                # Read file content
+                video_file.seek(0)  # Reset file pointer
+                file_content = video_file.read()
+                
+                # Upload to cloud storage and get public URL
+                return file_upload_service.upload_video(
+                    file_content=file_content,
+                    filename=f"story_{ig_user_id}_{int(time.time())}.mp4",
+                    content_type="video/mp4"
+                )
             
-            # Upload to cloud storage and get public URL
-            media_url = file_upload_service.upload_video(
-                file_content=file_content,
-                filename=f"story_{ig_user_id}_{int(time.time())}.mp4",
-                content_type="video/mp4"
-            )
+            media_url = _run_stage(saga, "media_url", upload_media)
             
             logger.info(f"Video uploaded to cloud storage: {media_url}")
             
             # Step 2: Create Story container using Instagram Graph API
-            container_id = self.create_story_container(
+            container_id = _run_stage(saga, "container_id", lambda: self.create_story_container(
                 ig_user_id=ig_user_id,
                 access_token=access_token,
                 media_url=media_url,
                 media_type="VIDEO",
                 caption=caption
-            )
+            ), CONTAINER_CHECKPOINT_TTL)
             
             # Step 3: Publish the Story
-            published_story = self.publish_story(
+            published_story = _run_stage(saga, "published", lambda: self.publish_story(
                 ig_user_id=ig_user_id,
                 access_token=access_token,
                 creation_id=container_id
-            )
+            ))
             
             logger.info(f"Story uploaded and published successfully: {published_story.get('id')}")
             
@@ -675,19 +705,34 @@ class InstagramGraphAPI:
         Returns:
             A long-lived access token string.
         """
+        return self.exchange_long_lived_token(short_lived_token)["access_token"]
+
+    def exchange_long_lived_token(self, user_access_token: str) -> Dict[str, Any]:
+        """
+        Exchange a user access token for a (new) long-lived token.
+
+        Works for short-lived tokens and for long-lived tokens that have not
+        expired yet, which is how long-lived tokens are renewed.
+
+        Args:
+            user_access_token: Short- or long-lived user access token.
+
+        Returns:
+            dict with access_token and expires_in (seconds, ~60 days)
+        """
         url = f"{self.graph_base}/oauth/access_token"
         params = {
             "grant_type": "fb_exchange_token",
             "client_id": self.app_id,
             "client_secret": self.app_secret,
-            "fb_exchange_token": short_lived_token,
+            "fb_exchange_token": user_access_token,
         }
 
-        logger.info("Exchanging short-lived token for long-lived token")
+        logger.info("Exchanging user token for long-lived token")
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             logger.info(f"Long-lived token response status: {response.status_code}")
-            logger.debug(f"Long-lived token response body: {response.text}")
+            logger.debug("Long-lived token response body: %s", response.text)
 
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
@@ -705,11 +750,45 @@ class InstagramGraphAPI:
 
             expires_in = data.get("expires_in", 0)
             logger.info(f"Obtained long-lived token. Expires in {expires_in} seconds")
-            return long_lived_token
+            return {"access_token": long_lived_token, "expires_in": expires_in}
         except requests.exceptions.RequestException as exc:
             logger.error(f"Error exchanging long-lived token: {exc}")
             raise HTTPException(status_code=500, detail=f"Failed to get long-lived token: {exc}")
 
+    def get_page_access_token(self, page_id: str, user_access_token: str) -> str:
+        """
+        Get a Page access token for a Facebook Page.
+
+        Page tokens obtained with a long-lived user token do not expire.
+
+        Args:
+            page_id: Facebook Page ID
+            user_access_token: User access token of a Page admin
+
+        Returns:
+            Page access token string
+        """
+        url = f"{self.graph_base}/{page_id}"
+        params = {
+            "fields": "access_token",
+            "access_token": user_access_token,
+        }
+
+        try:
+            response = self.http.get(url, params=params, timeout=30)
+            data = response.json() if response.text else {}
+            if response.status_code != 200 or "error" in data:
+                error_msg = data.get("error", {}).get("message", "Failed to get page access token")
+                raise HTTPException(status_code=400, detail=error_msg)
+
+            page_access_token = data.get("access_token")
+            if not page_access_token:
+                raise HTTPException(status_code=400, detail="No page access token returned")
+            return page_access_token
+        except requests.exceptions.RequestException as exc:
+            logger.error(f"Error getting page access token: {exc}")
+            raise HTTPException(status_code=500, detail=f"Failed to get page access token: {exc}")
+
     def get_user_instagram_account(self, access_token: str) -> Dict[str, Any]:
         """
         Attempt to fetch the Instagram Business account directly from the user node.  
@@ -722,7 +801,7 @@ class InstagramGraphAPI:
         }
         logger.info("Fetching Instagram Business account directly from user profile")
         try:
-            response = requests.get(url, params=params, timeout=30)
+            response = self.http.get(url, params=params, timeout=30)
             if response.status_code != 200:
                 error_data = response.json() if response.text else {}
                 error_msg = error_data.get("error", {}).get("message", "Failed to get Instagram account")
@@ -19,6 +19,9 @@ class InstagramPlatformAPI:
         if not all([self.app_id, self.app_secret, self.redirect_uri]):
             raise ValueError("Missing required Instagram Platform API credentials")
         
+        # Keep-alive connections to the Instagram APIs, shared by all calls
+        self.http = requests.Session()
+        
         # Instagram Platform OAuth scopes
         self.scopes = [
             "instagram_basic",
@@ -61,9 +64,9 @@ class InstagramPlatformAPI:
         logger.info(f"Exchanging code for token: {token_url}")
         
         try:
-            response = requests.post(token_url, data=params)
+            response = self.http.post(token_url, data=params)
             logger.info(f"Token exchange response status: {response.status_code}")
-            logger.info(f"Token exchange response: {response.text}")
+            logger.info("Token exchange response: %s", response.text)
             
             if response.status_code != 200:
                 logger.error(f"Token exchange failed with status {response.status_code}: {response.text}")
@@ -93,9 +96,9 @@ class InstagramPlatformAPI:
         logger.info(f"Getting long-lived token: {url}")
         
         try:
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             logger.info(f"Long-lived token response status: {response.status_code}")
-            logger.info(f"Long-lived token response: {response.text}")
+            logger.info("Long-lived token response: %s", response.text)
             
             if response.status_code != 200:
                 logger.error(f"Long-lived token failed with status {response.status_code}: {response.text}")
@@ -124,9 +127,9 @@ class InstagramPlatformAPI:
         logger.info(f"Getting user info: {url}")
         
         try:
-            response = requests.get(url, params=params)
+            response = self.http.get(url, params=params)
             logger.info(f"User info response status: {response.status_code}")
-            logger.info(f"User info response: {response.text}")
+            logger.info("User info response: %s", response.text)
             
             if response.status_code != 200:
                 logger.error(f"Get user info failed with status {response.status_code}: {response.text}")
@@ -157,9 +160,9 @@ class InstagramPlatformAPI:
         logger.info(f"Creating media container: {create_url}")
         
         try:
-            create_response = requests.post(create_url, data=create_params)
+            create_response = self.http.post(create_url, data=create_params)
             logger.info(f"Create media response status: {create_response.status_code}")
-            logger.info(f"Create media response: {create_response.text}")
+            logger.info("Create media response: %s", create_response.text)
             
             if create_response.status_code != 200:
                 logger.error(f"Create media failed with status {create_response.status_code}: {create_response.text}")
@@ -184,9 +187,9 @@ class InstagramPlatformAPI:
             
             logger.info(f"Publishing media: {publish_url}")
             
-            publish_response = requests.post(publish_url, data=publish_params)
+            publish_response = self.http.post(publish_url, data=publish_params)
             logger.info(f"Publish media response status: {publish_response.status_code}")
-            logger.info(f"Publish media response: {publish_response.text}")
+            logger.info("Publish media response: %s", publish_response.text)
             
             if publish_response.status_code != 200:
                 logger.error(f"Publish media failed with status {publish_response.status_code}: {publish_response.text}")
@@ -0,0 +1,294 @@
+"""
+Instagrapi Process Pool
+Runs instagrapi operations in worker processes, each owning a shard of
+accounts (consistent hashing by username)
+"""
+
+import bisect
+import hashlib
+import asyncio
+import threading
+import logging
+import multiprocessing
+import queue
+from concurrent.futures import Future
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VIRTUAL_NODES_PER_SHARD = 64
+
+
+# -- operations (run inside the worker process) -----------------------------
+
+def _media_to_dict(media) -> Dict[str, Any]:
+    if isinstance(media, dict):
+        return media
+    return {
+        "pk": getattr(media, "pk", None),
+        "id": getattr(media, "id", None),
+        "code": getattr(media, "code", None)
+    }
+
+
+def _clip_upload(cl, path: str, caption: str = "") -> Dict[str, Any]:
+    return _media_to_dict(cl.clip_upload(path=path, caption=caption))
+
+
+def _account_info(cl) -> Dict[str, Any]:
+    account_info = cl.account_info()
+    if isinstance(account_info, dict):
+        return account_info
+    return account_info.model_dump(mode="json")
+
+
+OPERATIONS: Dict[str, Callable[..., Any]] = {
+    "clip_upload": _clip_upload,
+    "account_info": _account_info,
+}
+
+
+def run_operation(cl, op: str, **kwargs) -> Any:
+    """Run a named operation against a client (results are plain, picklable dicts)"""
+    return OPERATIONS[op](cl, **kwargs)
+
+
+def _settings_key(settings: Dict[str, Any]) -> str:
+    """Identity of a settings snapshot (changes on re-login or cookie rotation)"""
+    material = repr((settings.get("authorization_data"), settings.get("cookies"), settings.get("uuids")))
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _worker_main(shard: int, jobs, results, max_resident: int) -> None:
+    """
+    Worker process loop - one job at a time, so operations for any account
+    in this shard are serialized
+    """
+    from instagrapi import Client
+    from client_registry import ClientRegistry
+
+    # Clients stay warm between jobs; the parent always holds the latest
+    # settings, so evicted clients need no spill
+    clients = ClientRegistry(max_resident=max_resident, idle_ttl=0)
+    built_from: Dict[str, str] = {}
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, username, op, settings, kwargs = job
+        try:
+            key = _settings_key(settings)
+            cl = clients.get(username)
+            if cl is None or built_from.get(username) != key:
+                cl = Client()
+                cl.set_settings(settings)
+                clients.put(username, cl)
+
+            value = run_operation(cl, op, **kwargs)
+
+            updated = cl.get_settings()
+            built_from[username] = _settings_key(updated)
+            results.put((job_id, True, (value, updated)))
+        except Exception as e:
+            clients.remove(username)
+            built_from.pop(username, None)
+            results.put((job_id, False, (type(e).__name__, str(e))))
+        for evicted in set(built_from) - set(clients.accounts()):
+            built_from.pop(evicted, None)
+
+
+def _rebuild_exception(name: str, message: str) -> Exception:
+    """Re-create a worker-side exception in the parent (instagrapi types by name)"""
+    from instagrapi import exceptions as ig_exceptions
+    exc_type = getattr(ig_exceptions, name, None)
+    if isinstance(exc_type, type) and issubclass(exc_type, Exception):
+        try:
+            return exc_type(message)
+        except Exception:
+            pass
+    return RuntimeError(f"{name}: {message}")
+
+
+# -- parent side ------------------------------------------------------------
+
+class InstagrapiPool:
+    """
+    Pool of worker processes running instagrapi operations
+
+    Each username maps to one shard through a consistent-hash ring, so an
+    account's operations always run in the same process, one at a time
+    (Instagram flags parallel activity on one account), while different
+    accounts run in parallel across cores. The caller passes the account's
+    saved client settings with each job and gets the updated settings back
+    to persist.
+    """
+
+    def __init__(self, workers: int, max_resident_per_worker: int = 25, start_method: str = "spawn"):
+        self.workers = workers
+        self.max_resident_per_worker = max_resident_per_worker
+        self._context = multiprocessing.get_context(start_method)
+
+        self._ring: List[Tuple[int, int]] = sorted(
+            (self._hash(f"shard-{shard}-{vnode}"), shard)
+            for shard in range(workers)
+            for vnode in range(VIRTUAL_NODES_PER_SHARD)
+        )
+        self._ring_keys = [point for point, _ in self._ring]
+
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._job_queues: List[Any] = [None] * workers
+        self._results = None
+        self._pending: Dict[int, Tuple[int, Future]] = {}
+        self._job_ids = count(1)
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._closed = False
+
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def shard_for(self, username: str) -> int:
+        """Shard owning an account"""
+        index = bisect.bisect(self._ring_keys, self._hash(username.lower())) % len(self._ring)
+        return self._ring[index][1]
+
+    def submit(self, username: str, op: str, settings: Dict[str, Any], **kwargs) -> Future:
+        """
+        Queue an operation on the account's shard
+
+        Args:
+            username: Instagram username (selects the shard)
+            op: Operation name (see OPERATIONS)
+            settings: Saved instagrapi client settings for the account
+            **kwargs: Operation arguments (must be picklable)
+
+        Returns:
+            Future resolving to (result, updated_settings)
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown instagrapi operation: {op}")
+        shard = self.shard_for(username)
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Instagrapi pool is shut down")
+            self._ensure_started()
+            self._ensure_worker(shard)
+            job_id = next(self._job_ids)
+            self._pending[job_id] = (shard, future)
+            self._job_queues[shard].put((job_id, username, op, settings, kwargs))
+        return future
+
+    def call(self, username: str, op: str, settings: Dict[str, Any], **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """Blocking variant of submit()"""
+        return self.submit(username, op, settings, **kwargs).result()
+
+    async def run(self, username: str, op: str, settings: Dict[str, Any], **kwargs) -> Tuple[Any, Dict[str, Any]]:
+        """Async variant of submit() - awaits without holding a thread"""
+        return await asyncio.wrap_future(self.submit(username, op, settings, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters"""
+        with self._lock:
+            queued = [0] * self.workers
+            for shard, _ in self._pending.values():
+                queued[shard] += 1
+            return {
+                "workers": self.workers,
+                "alive": sum(1 for p in self._processes if p is not None and p.is_alive()),
+                "in_flight_per_worker": queued,
+                "completed": self.completed,
+                "failed": self.failed,
+                "restarts": self.restarts
+            }
+
+    def shutdown(self) -> None:
+        """Stop all workers (queued jobs are failed)"""
+        with self._lock:
+            self._closed = True
+            for job_queue in self._job_queues:
+                if job_queue is not None:
+                    job_queue.put(None)
+        for process in self._processes:
+            if process is not None:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for _, future in pending.values():
+            future.set_exception(RuntimeError("Instagrapi pool is shut down"))
+
+    # -- internals ----------------------------------------------------------
+
+    def _ensure_started(self) -> None:
+        """Create the result queue and collector thread on first use (lock held)"""
+        if self._results is not None:
+            return
+        self._results = self._context.Queue()
+        self._collector = threading.Thread(target=self._collect, name="instagrapi-pool-collector", daemon=True)
+        self._collector.start()
+
+    def _ensure_worker(self, shard: int) -> None:
+        """Start (or restart) a shard's worker process (lock held)"""
+        process = self._processes[shard]
+        if process is not None and process.is_alive():
+            return
+        if process is not None:
+            self.restarts += 1
+            self._fail_shard(shard, f"instagrapi worker {shard} exited with code {process.exitcode}")
+        self._job_queues[shard] = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(shard, self._job_queues[shard], self._results, self.max_resident_per_worker),
+            name=f"instagrapi-worker-{shard}",
+            daemon=True
+        )
+        process.start()
+        self._processes[shard] = process
+        logger.info(f"Started instagrapi worker {shard} (pid {process.pid})")
+
+    def _fail_shard(self, shard: int, reason: str) -> None:
+        """Fail every job queued on a dead shard (lock held)"""
+        for job_id in [job_id for job_id, (s, _) in self._pending.items() if s == shard]:
+            _, future = self._pending.pop(job_id)
+            self.failed += 1
+            future.set_exception(RuntimeError(reason))
+        logger.error(reason)
+
+    def _collect(self) -> None:
+        """Resolve futures from worker results; detect crashed workers"""
+        while not self._closed:
+            try:
+                job_id, ok, payload = self._results.get(timeout=1)
+            except queue.Empty:
+                with self._lock:
+                    for shard, process in enumerate(self._processes):
+                        if process is not None and not process.is_alive() and not self._closed:
+                            if any(s == shard for s, _ in self._pending.values()):
+                                self._ensure_worker(shard)
+                continue
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                entry = self._pending.pop(job_id, None)
+                if entry is not None:
+                    if ok:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+            if entry is None:
+                continue
+            _, future = entry
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(_rebuild_exception(*payload))
@@ -0,0 +1,592 @@
+"""
+Job Queue
+Durable queue for publish and transcode jobs, consumed by worker processes
+(see job_worker.py).
+
+Backends:
+    sqlite:///path/to/jobs.db  - local file, shared by all processes on a host
+    redis://host:port/db       - shared by all instances (requires the redis package)
+
+Delivery is at-least-once: a claimed job is leased for ``visibility_timeout``
+seconds and becomes claimable again when its worker neither finishes nor
+extends it in time (crash, restart, deploy). A job that fails
+``max_attempts`` times, or whose lease runs out on the last attempt, is
+moved to the dead-letter state.
+"""
+
+import os
+import json
+import time
+import uuid
+import signal
+import sqlite3
+import threading
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+DEAD = "dead"
+
+# Seconds before a failed job is retried, by attempt number (last value repeats)
+RETRY_BACKOFF = [10, 60, 300]
+
+
+def retry_delay(attempts: int) -> float:
+    return RETRY_BACKOFF[min(attempts, len(RETRY_BACKOFF)) - 1] if attempts > 0 else 0
+
+
+class JobQueue(ABC):
+    """Interface shared by the queue backends; jobs are plain dicts"""
+
+    def __init__(self, visibility_timeout: float = 300, max_attempts: int = 3, retention: float = 7 * 86400):
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retention = retention
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None,
+                delay: float = 0) -> str:
+        """
+        Add a job
+
+        Args:
+            kind: Job type (selects the worker handler)
+            payload: JSON-serializable job arguments
+            max_attempts: Deliveries before dead-lettering (queue default if None)
+            delay: Seconds before the job becomes claimable
+
+        Returns:
+            Job id
+        """
+
+    @abstractmethod
+    def claim(self, worker: str, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        """Lease the oldest claimable job of the given kinds (None if there is none)"""
+
+    @abstractmethod
+    def extend(self, job_id: str, worker: str) -> bool:
+        """Renew a lease; False if the worker no longer owns the job"""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker: str, result: Any) -> bool:
+        """Mark a leased job succeeded; False if the lease was lost meanwhile"""
+
+    @abstractmethod
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> Optional[str]:
+        """
+        Record a failed attempt
+
+        Returns:
+            New state (queued for a retry, dead when attempts are exhausted or
+            retry is False), or None if the lease was lost meanwhile
+        """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job by id, or None"""
+
+    @abstractmethod
+    def dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently dead-lettered jobs"""
+
+    @abstractmethod
+    def retry_dead(self, job_id: str) -> bool:
+        """Put a dead-lettered job back in the queue with a fresh attempt budget"""
+
+    def purge(self) -> int:
+        """Delete succeeded jobs older than the retention period"""
+        return 0
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Job counts by state"""
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    SQLite-backed job queue
+
+    WAL mode lets the API process and any number of worker processes on the
+    same host share one database file; claims use BEGIN IMMEDIATE so two
+    workers never lease the same job.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " state TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " worker TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_expires_at REAL"
+            ")"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_claimable ON jobs (state, available_at)")
+        logger.info(f"SQLite job queue ready: {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None,
+                delay: float = 0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO jobs (id, kind, payload, state, max_attempts, created_at, updated_at, available_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), QUEUED, max_attempts or self.max_attempts, now, now, now + delay)
+        )
+        return job_id
+
+    def claim(self, worker: str, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        now = time.time()
+        placeholders = ",".join("?" for _ in kinds)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases on the last attempt are dead-lettered, not re-run
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = COALESCE(error, 'Lease expired'), worker = NULL, updated_at = ?"
+                " WHERE state = ? AND lease_expires_at <= ? AND attempts >= max_attempts",
+                (DEAD, now, RUNNING, now)
+            )
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE kind IN ({placeholders}) AND ("
+                " (state = ? AND available_at <= ?) OR (state = ? AND lease_expires_at <= ?)"
+                ") ORDER BY available_at LIMIT 1",
+                (*kinds, QUEUED, now, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, worker = ?, attempts = attempts + 1, lease_expires_at = ?, updated_at = ?"
+                " WHERE id = ?",
+                (RUNNING, worker, now + self.visibility_timeout, now, row["id"])
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+            return self._job(job)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def extend(self, job_id: str, worker: str) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND state = ? AND worker = ?",
+            (now + self.visibility_timeout, now, job_id, RUNNING, worker)
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, worker: str, result: Any) -> bool:
+        cursor = self._connection().execute(
+            "UPDATE jobs SET state = ?, result = ?, error = NULL, lease_expires_at = NULL, updated_at = ?"
+            " WHERE id = ? AND state = ? AND worker = ?",
+            (SUCCEEDED, json.dumps(result), time.time(), job_id, RUNNING, worker)
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> Optional[str]:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND state = ? AND worker = ?",
+                (job_id, RUNNING, worker)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            state = QUEUED if retry and row["attempts"] < row["max_attempts"] else DEAD
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, worker = NULL, lease_expires_at = NULL,"
+                " available_at = ?, updated_at = ? WHERE id = ?",
+                (state, error, now + retry_delay(row["attempts"]), now, job_id)
+            )
+            conn.execute("COMMIT")
+            return state
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT * FROM jobs WHERE state = ? ORDER BY updated_at DESC LIMIT ?",
+            (DEAD, limit)
+        ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def retry_dead(self, job_id: str) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "UPDATE jobs SET state = ?, attempts = 0, available_at = ?, updated_at = ? WHERE id = ? AND state = ?",
+            (QUEUED, now, now, job_id, DEAD)
+        )
+        return cursor.rowcount > 0
+
+    def purge(self) -> int:
+        cursor = self._connection().execute(
+            "DELETE FROM jobs WHERE state = ? AND updated_at < ?",
+            (SUCCEEDED, time.time() - self.retention)
+        )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, DEAD: 0}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
+
+
+# Redis job queue layout ({p} = key prefix):
+#   {p}:job:{id}        hash with the job fields (payload/result JSON-encoded)
+#   {p}:ready:{kind}    sorted set of queued job ids by available_at
+#   {p}:leased          sorted set of running job ids by lease expiry
+#   {p}:dead            sorted set of dead-lettered job ids by time
+#   {p}:kinds           set of kinds ever enqueued (for stats)
+_REDIS_CLAIM = """
+local prefix, now, lease, worker = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4]
+local leased, dead = prefix .. ':leased', prefix .. ':dead'
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', leased, '-inf', now, 'LIMIT', 0, 100)) do
+  local key = prefix .. ':job:' .. id
+  redis.call('ZREM', leased, id)
+  if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(redis.call('HGET', key, 'max_attempts')) then
+    if not redis.call('HGET', key, 'error') then redis.call('HSET', key, 'error', 'Lease expired') end
+    redis.call('HSET', key, 'state', 'dead', 'worker', '', 'updated_at', now)
+    redis.call('ZADD', dead, now, id)
+  else
+    redis.call('HSET', key, 'state', 'queued', 'worker', '', 'updated_at', now)
+    redis.call('ZADD', prefix .. ':ready:' .. redis.call('HGET', key, 'kind'), now, id)
+  end
+end
+for i = 5, #ARGV do
+  local ready = prefix .. ':ready:' .. ARGV[i]
+  local ids = redis.call('ZRANGEBYSCORE', ready, '-inf', now, 'LIMIT', 0, 1)
+  if #ids > 0 then
+    local id = ids[1]
+    local key = prefix .. ':job:' .. id
+    redis.call('ZREM', ready, id)
+    redis.call('HINCRBY', key, 'attempts', 1)
+    redis.call('HSET', key, 'state', 'running', 'worker', worker, 'lease_expires_at', now + lease, 'updated_at', now)
+    redis.call('ZADD', leased, now + lease, id)
+    return id
+  end
+end
+return false
+"""
+
+# KEYS: job hash, leased set; ARGV: id, worker, now, then the fields to set.
+# Returns 0 when the worker no longer owns the job, else the attempt count.
+_REDIS_RELEASE = """
+if redis.call('HGET', KEYS[1], 'state') ~= 'running' or redis.call('HGET', KEYS[1], 'worker') ~= ARGV[2] then
+  return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+for i = 4, #ARGV, 2 do redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1]) end
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[3])
+return tonumber(redis.call('HGET', KEYS[1], 'attempts'))
+"""
+
+_REDIS_EXTEND = """
+if redis.call('HGET', KEYS[1], 'state') ~= 'running' or redis.call('HGET', KEYS[1], 'worker') ~= ARGV[2] then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'lease_expires_at', ARGV[3], 'updated_at', ARGV[4])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[1])
+return 1
+"""
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Redis-backed job queue (any Redis-protocol server with Lua scripting)
+
+    Claims, lease renewals and releases are Lua scripts, so they are atomic
+    across every API and worker process. Succeeded jobs expire after the
+    retention period.
+    """
+
+    def __init__(self, url: str, prefix: str = "jobs", **kwargs):
+        super().__init__(**kwargs)
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("The redis package is required for redis:// job queues (pip install redis)")
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._claim = self.client.register_script(_REDIS_CLAIM)
+        self._release = self.client.register_script(_REDIS_RELEASE)
+        self._extend = self.client.register_script(_REDIS_EXTEND)
+        logger.info(f"Redis job queue ready: {url.split('@')[-1]}")
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _job(self, fields: Dict[str, str]) -> Dict[str, Any]:
+        def number(name):
+            value = fields.get(name)
+            return float(value) if value else None
+        return {
+            "id": fields["id"],
+            "kind": fields["kind"],
+            "payload": json.loads(fields["payload"]),
+            "state": fields["state"],
+            "attempts": int(fields.get("attempts", 0)),
+            "max_attempts": int(fields["max_attempts"]),
+            "result": json.loads(fields["result"]) if fields.get("result") else None,
+            "error": fields.get("error") or None,
+            "worker": fields.get("worker") or None,
+            "created_at": number("created_at"),
+            "updated_at": number("updated_at"),
+            "available_at": number("available_at"),
+            "lease_expires_at": number("lease_expires_at")
+        }
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None,
+                delay: float = 0) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._key(job_id), mapping={
+            "id": job_id,
+            "kind": kind,
+            "payload": json.dumps(payload),
+            "state": QUEUED,
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "created_at": now,
+            "updated_at": now,
+            "available_at": now + delay
+        })
+        pipe.zadd(f"{self.prefix}:ready:{kind}", {job_id: now + delay})
+        pipe.sadd(f"{self.prefix}:kinds", kind)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker: str, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        job_id = self._claim(args=[self.prefix, time.time(), self.visibility_timeout, worker, *kinds])
+        return self.get(job_id) if job_id else None
+
+    def extend(self, job_id: str, worker: str) -> bool:
+        now = time.time()
+        return bool(self._extend(
+            keys=[self._key(job_id), f"{self.prefix}:leased"],
+            args=[job_id, worker, now + self.visibility_timeout, now]
+        ))
+
+    def _release_job(self, job_id: str, worker: str, **fields) -> int:
+        args = [job_id, worker, time.time()]
+        for name, value in fields.items():
+            args.extend([name, value])
+        return self._release(keys=[self._key(job_id), f"{self.prefix}:leased"], args=args)
+
+    def complete(self, job_id: str, worker: str, result: Any) -> bool:
+        if not self._release_job(job_id, worker, state=SUCCEEDED, result=json.dumps(result), error="",
+                                 lease_expires_at=""):
+            return False
+        self.client.expire(self._key(job_id), int(self.retention))
+        self.client.incr(f"{self.prefix}:succeeded")
+        return True
+
+    def fail(self, job_id: str, worker: str, error: str, retry: bool = True) -> Optional[str]:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        state = QUEUED if retry and job["attempts"] < job["max_attempts"] else DEAD
+        available_at = time.time() + retry_delay(job["attempts"])
+        if not self._release_job(job_id, worker, state=state, error=error, worker="",
+                                 lease_expires_at="", available_at=available_at):
+            return None
+        if state == QUEUED:
+            self.client.zadd(f"{self.prefix}:ready:{job['kind']}", {job_id: available_at})
+        else:
+            self.client.zadd(f"{self.prefix}:dead", {job_id: time.time()})
+        return state
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        fields = self.client.hgetall(self._key(job_id))
+        return self._job(fields) if fields else None
+
+    def dead_letters(self, limit: int = 50) -> List[Dict[str, Any]]:
+        ids = self.client.zrevrange(f"{self.prefix}:dead", 0, limit - 1)
+        return [job for job in (self.get(job_id) for job_id in ids) if job is not None]
+
+    def retry_dead(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job["state"] != DEAD:
+            return False
+        now = time.time()
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zrem(f"{self.prefix}:dead", job_id)
+        pipe.hset(self._key(job_id), mapping={"state": QUEUED, "attempts": 0, "available_at": now, "updated_at": now})
+        pipe.zadd(f"{self.prefix}:ready:{job['kind']}", {job_id: now})
+        pipe.execute()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        kinds = self.client.smembers(f"{self.prefix}:kinds")
+        return {
+            QUEUED: sum(self.client.zcard(f"{self.prefix}:ready:{kind}") for kind in kinds),
+            RUNNING: self.client.zcard(f"{self.prefix}:leased"),
+            SUCCEEDED: int(self.client.get(f"{self.prefix}:succeeded") or 0),
+            DEAD: self.client.zcard(f"{self.prefix}:dead")
+        }
+
+
+def create_job_queue(url: str, **kwargs) -> JobQueue:
+    """
+    Create a job queue from a URL
+
+    Args:
+        url: sqlite:///relative/or/absolute/path.db or redis://host:port/db
+        **kwargs: visibility_timeout, max_attempts, retention
+
+    Returns:
+        JobQueue instance
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteJobQueue(url[len("sqlite:///"):], **kwargs)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisJobQueue(url, **kwargs)
+    raise ValueError(f"Unsupported JOB_QUEUE_URL: {url}")
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed"""
+
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+class JobWorker:
+    """
+    Claims jobs and runs their handlers, one at a time
+
+    The lease is renewed in the background while a handler runs, so long
+    uploads are not re-delivered. ``is_permanent(exc)`` decides whether a
+    failure is worth retrying; ``finalize(job)`` runs once a job reaches a
+    terminal state (succeeded or dead), e.g. to delete its spooled input.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Handler], name: str,
+                 poll_interval: float = 1.0,
+                 is_permanent: Optional[Callable[[Exception], bool]] = None,
+                 finalize: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.name = name
+        self.poll_interval = poll_interval
+        self.is_permanent = is_permanent or (lambda e: isinstance(e, PermanentJobError))
+        self.finalize = finalize
+        self._stop = threading.Event()
+
+    def stop(self, *_) -> None:
+        """Finish the current job, then exit run()"""
+        self._stop.set()
+
+    def run(self) -> None:
+        """Process jobs until stop() (installs SIGTERM/SIGINT handlers in the main thread)"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        logger.info(f"Job worker {self.name} started ({', '.join(self.handlers)})")
+        last_purge = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.time() - last_purge > 3600:
+                    last_purge = time.time()
+                    self.queue.purge()
+                job = self.queue.claim(self.name, list(self.handlers))
+            except Exception as e:
+                logger.error(f"Job worker {self.name} could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            self.process(job)
+        logger.info(f"Job worker {self.name} stopped")
+
+    def process(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job and record the outcome"""
+        job_id = job["id"]
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, done), daemon=True)
+        heartbeat.start()
+        logger.info(f"Job {job_id} ({job['kind']}) attempt {job['attempts']}/{job['max_attempts']} on {self.name}")
+        try:
+            result = self.handlers[job["kind"]](job["payload"])
+        except Exception as e:
+            done.set()
+            permanent = self.is_permanent(e)
+            state = self.queue.fail(job_id, self.name, f"{type(e).__name__}: {e}", retry=not permanent)
+            logger.warning(f"Job {job_id} failed ({state}): {e}")
+            if state == DEAD:
+                self._finalize(job)
+            return
+        done.set()
+        if self.queue.complete(job_id, self.name, result):
+            logger.info(f"Job {job_id} succeeded")
+            self._finalize(job)
+        else:
+            logger.warning(f"Job {job_id} finished after its lease was lost - result discarded")
+
+    def _heartbeat(self, job_id: str, done: threading.Event) -> None:
+        interval = max(self.queue.visibility_timeout / 3, 1)
+        while not done.wait(interval):
+            try:
+                if not self.queue.extend(job_id, self.name):
+                    logger.warning(f"Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not extend lease on job {job_id}: {e}")
+
+    def _finalize(self, job: Dict[str, Any]) -> None:
+        if self.finalize is None:
+            return
+        try:
+            self.finalize(job)
+        except Exception as e:
+            logger.warning(f"Finalizing job {job['id']} failed: {e}")
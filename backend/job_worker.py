@@ -0,0 +1,28 @@
+"""
+Job Worker
+Process entry point consuming the durable job queue with the publish and
+transcode handlers defined in main.py
+
+The API starts JOB_WORKERS of these when it queues its first job (or at
+startup when unfinished jobs are waiting). More can run standalone on any
+host sharing JOB_QUEUE_URL (and JOB_SPOOL_DIR):
+    python job_worker.py
+"""
+
+import os
+import socket
+
+
+def worker_main() -> None:
+    """Import the app's handlers and process jobs until SIGTERM"""
+    # Jobs already run outside the API process: run instagrapi inline and
+    # never start nested job workers
+    os.environ.setdefault("INSTAGRAPI_WORKERS", "0")
+    os.environ["JOB_WORKERS"] = "0"
+
+    import main
+    main.create_job_worker(f"{socket.gethostname()}-{os.getpid()}").run()
+
+
+if __name__ == "__main__":
+    worker_main()
@@ -0,0 +1,119 @@
+"""
+Lazy Imports
+Platform SDKs (instagrapi, the Google client libraries, boto3) are imported
+the first time a route uses them instead of when the app starts, so a cold
+start answers /health without waiting for them. ``prewarm()`` imports them
+in a background thread once the app is up, so the first real request does
+not pay for it either.
+"""
+
+import sys
+import time
+import types
+import importlib
+import threading
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_modules: Dict[str, "LazyModule"] = {}
+_import_hooks: Dict[str, List[Callable]] = {}
+_hooks_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that imports it on first attribute access
+
+    Use qualified names (``instagrapi.Client``, ``except
+    google_errors.HttpError``) so nothing is resolved at import time.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.load_seconds: Optional[float] = None
+        self.loaded_by: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_seconds is not None
+
+    def load(self, by: str = "request") -> types.ModuleType:
+        module = sys.modules.get(self.__name__)
+        if module is not None and self.loaded:
+            return module
+        started = time.perf_counter()
+        module = importlib.import_module(self.__name__)    # Serialized by the import lock
+        if not self.loaded:
+            self.load_seconds = time.perf_counter() - started
+            self.loaded_by = by
+            logger.info(f"Imported {self.__name__} in {self.load_seconds * 1000:.0f}ms ({by})")
+            _run_import_hooks()
+        return module
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        return f"<lazy module {self.__name__!r} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Shared lazy stand-in for ``name`` (one per module name)"""
+    module = _modules.get(name)
+    if module is None:
+        module = _modules[name] = LazyModule(name)
+    return module
+
+
+def after_import(name: str, hook: Callable[[], None]) -> None:
+    """Run ``hook`` once ``name`` is imported (right away if it already is)"""
+    with _hooks_lock:
+        if name not in sys.modules:
+            _import_hooks.setdefault(name, []).append(hook)
+            return
+    hook()
+
+
+def _run_import_hooks() -> None:
+    with _hooks_lock:
+        ready = [name for name in _import_hooks if name in sys.modules]
+        hooks = [hook for name in ready for hook in _import_hooks.pop(name)]
+    for hook in hooks:
+        try:
+            hook()
+        except Exception as e:
+            logger.error(f"Import hook {hook.__name__} failed: {e}")
+
+
+def prewarm(names: Optional[Iterable[str]] = None) -> threading.Thread:
+    """Import lazy modules (default: all registered) in a background thread"""
+    pending = [lazy_module(name) for name in names] if names is not None else list(_modules.values())
+
+    def run():
+        started = time.perf_counter()
+        for module in pending:
+            try:
+                module.load(by="prewarm")
+            except Exception as e:
+                logger.error(f"Prewarm import of {module.__name__} failed: {e}")
+        logger.info(f"Prewarmed {len(pending)} module(s) in {time.perf_counter() - started:.2f}s")
+
+    thread = threading.Thread(target=run, name="import-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def import_status() -> Dict[str, Dict[str, object]]:
+    """Per lazy module: whether it is loaded, how long that took, and what triggered it"""
+    return {
+        name: {
+            "loaded": module.loaded,
+            "load_ms": round(module.load_seconds * 1000, 1) if module.loaded else None,
+            "loaded_by": module.loaded_by
+        }
+        for name, module in sorted(_modules.items())
+    }
@@ -0,0 +1,236 @@
+"""
+Load Generator
+Closed-loop virtual users driving the backend's login, upload and
+validate endpoints (Instagram Graph, YouTube, TikTok), reporting throughput
+and latency percentiles per step.
+
+Each virtual user logs in to every platform once with a unique
+authorization code, then loops over the scenario mix until the test ends:
+an upload picks a random platform and posts a generated video with a
+unique caption; a validate checks one of the user's sessions. With the
+mock upstreams every code maps to its own account, so sessions and
+publishes never collide between users.
+
+Usage:
+    python -m loadtest.loadgen --url http://127.0.0.1:8000 --users 20 --duration 60 \\
+        --mix upload=1,validate=4 --video-size 2000000 --json results.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+PLATFORMS = ("instagram", "youtube", "tiktok")
+
+LOGIN_PATHS = {
+    "instagram": "/api/instagram/graph/login",
+    "youtube": "/api/youtube/login",
+    "tiktok": "/api/tiktok/login"
+}
+VALIDATE_PATHS = {
+    "instagram": "/api/instagram/validate",
+    "youtube": "/api/youtube/validate",
+    "tiktok": "/api/tiktok/validate"
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Results:
+    """Latencies and failures per step (e.g. ``upload.tiktok``)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+
+    def record(self, step: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            if error is None:
+                self.latencies[step].append(seconds)
+            else:
+                self.errors[step][error] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.finished or time.monotonic()) - self.started
+        steps = {}
+        with self._lock:
+            for step in sorted(set(self.latencies) | set(self.errors)):
+                latencies = sorted(self.latencies.get(step, []))
+                errors = dict(self.errors.get(step, {}))
+                steps[step] = {
+                    "ok": len(latencies),
+                    "errors": sum(errors.values()),
+                    "error_kinds": errors,
+                    "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                    "latency_ms": {
+                        "p50": round(percentile(latencies, 0.5) * 1000, 1),
+                        "p90": round(percentile(latencies, 0.9) * 1000, 1),
+                        "p99": round(percentile(latencies, 0.99) * 1000, 1),
+                        "max": round((latencies[-1] if latencies else 0.0) * 1000, 1)
+                    }
+                }
+        return {"elapsed_seconds": round(elapsed, 2), "steps": steps}
+
+
+class VirtualUser:
+    """One client with its own HTTP connection pool and platform sessions"""
+
+    def __init__(self, index: int, args: argparse.Namespace, results: Results, video: bytes):
+        self.index = index
+        self.args = args
+        self.results = results
+        self.video = video
+        self.http = requests.Session()
+        self.user_ids: Dict[str, str] = {}
+
+    def call(self, step: str, method: str, path: str, **kwargs) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, f"{self.args.url}{path}", timeout=self.args.timeout, **kwargs)
+        except requests.RequestException as e:
+            self.results.record(step, time.perf_counter() - started, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            self.results.record(step, elapsed, f"HTTP {response.status_code}")
+            return None
+        body = response.json() if response.content else {}
+        if body.get("success") is False or body.get("is_valid") is False:
+            self.results.record(step, elapsed, "success=false")
+            return None
+        self.results.record(step, elapsed)
+        return body
+
+    def login(self, platform: str) -> None:
+        code = f"loadtest-{self.index}-{platform}-{uuid.uuid4().hex}"
+        body = self.call(f"login.{platform}", "POST", LOGIN_PATHS[platform], json={"code": code})
+        if body is None:
+            return
+        data = body.get("data") or body
+        user_id = data.get("user_id") or data.get("ig_user_id") or data.get("open_id")
+        if user_id:
+            self.user_ids[platform] = str(user_id)
+
+    def upload(self, platform: str) -> None:
+        user_id = self.user_ids[platform]
+        caption = f"load test {self.index} {uuid.uuid4().hex}"   # Unique, so no saga or idempotency reuse
+        video = (f"{uuid.uuid4().hex}.mp4", self.video, "video/mp4")
+        if platform == "instagram":
+            self.call("upload.instagram", "POST", "/api/instagram/graph/upload-reel",
+                      files={"file": video}, data={"caption": caption, "user_id": user_id})
+        elif platform == "youtube":
+            self.call("upload.youtube", "POST", "/api/youtube/upload-short",
+                      files={"file": video}, data={"title": caption, "description": caption, "user_id": user_id})
+        else:
+            # TikTok's saga id is the file digest - vary the bytes per upload
+            video = (video[0], self.video + uuid.uuid4().bytes, "video/mp4")
+            self.call("upload.tiktok", "POST", "/api/tiktok/upload-video",
+                      files={"video": video}, data={"description": caption, "user_id": user_id})
+
+    def validate(self, platform: str) -> None:
+        self.call(f"validate.{platform}", "POST", VALIDATE_PATHS[platform], json={"user_id": self.user_ids[platform]})
+
+    def run(self, deadline: float) -> None:
+        for platform in self.args.platforms:
+            self.login(platform)
+        scenarios = [name for name, weight in self.args.mix.items() for _ in range(weight)]
+        while time.monotonic() < deadline:
+            platforms = [platform for platform in self.args.platforms if platform in self.user_ids]
+            if not platforms:
+                return
+            scenario = random.choice(scenarios)
+            platform = random.choice(platforms)
+            if scenario == "login":
+                self.login(platform)
+            elif scenario == "upload":
+                self.upload(platform)
+            else:
+                self.validate(platform)
+            if self.args.think_time:
+                time.sleep(random.uniform(0, 2 * self.args.think_time))
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """``upload=1,validate=4`` -> {"upload": 1, "validate": 4}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("login", "upload", "validate") or not weight.isdigit():
+            raise argparse.ArgumentTypeError(f"Expected login|upload|validate=<weight>, got {part}")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one scenario needs a weight above 0")
+    return mix
+
+
+def print_report(summary: Dict[str, Any]) -> None:
+    print(f"\n{'step':<22}{'ok':>7}{'err':>6}{'req/s':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    for step, entry in summary["steps"].items():
+        latency = entry["latency_ms"]
+        print(f"{step:<22}{entry['ok']:>7}{entry['errors']:>6}{entry['throughput_per_s']:>9}"
+              f"{latency['p50']:>9}{latency['p90']:>9}{latency['p99']:>9}{latency['max']:>9}")
+        for kind, count in entry["error_kinds"].items():
+            print(f"    {kind}: {count}")
+    print(f"\nElapsed: {summary['elapsed_seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent login/upload/validate traffic at the backend")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic after ramp-up starts")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which users start")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("upload=1,validate=4"))
+    parser.add_argument("--platforms", default=",".join(PLATFORMS))
+    parser.add_argument("--video-size", type=int, default=1_000_000, help="Bytes per uploaded video")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between a user's requests (s)")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", help="Also write the summary to this file")
+    args = parser.parse_args()
+
+    args.url = args.url.rstrip("/")
+    args.platforms = [platform for platform in args.platforms.split(",") if platform]
+    unknown = set(args.platforms) - set(PLATFORMS)
+    if unknown:
+        parser.error(f"Unknown platform(s): {', '.join(sorted(unknown))}")
+
+    video = os.urandom(args.video_size)
+    results = Results()
+    deadline = time.monotonic() + args.duration
+    print(f"{args.users} users for {args.duration}s against {args.url} (mix {args.mix})", file=sys.stderr)
+
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        for index in range(args.users):
+            pool.submit(VirtualUser(index, args, results, video).run, deadline)
+            if args.ramp_up and index < args.users - 1:
+                time.sleep(args.ramp_up / args.users)
+    results.finished = time.monotonic()
+
+    summary = results.summary()
+    summary.update(users=args.users, mix=args.mix, video_size=args.video_size)
+    print_report(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
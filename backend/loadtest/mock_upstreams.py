@@ -0,0 +1,375 @@
+"""
+Mock Upstreams
+Local stand-ins for the platform APIs the backend calls, for load tests:
+
+    /graph        graph.facebook.com (OAuth code/long-lived exchange, /me,
+                  /me/accounts, page and IG user nodes, /{ig}/media, /media_publish)
+    /tiktok       open.tiktokapis.com and open-upload.tiktokapis.com (token,
+                  user info, inbox init, upload PUT)
+    /google       oauth2.googleapis.com (token, revoke)
+    /youtube      youtube.googleapis.com (channels.list, resumable videos.insert)
+    /cloudinary   api.cloudinary.com (video upload, Admin API ping)
+
+Every upstream has its own latency, jitter and error injection, set on the
+command line or changed while a test runs:
+
+    curl -X POST localhost:9100/_mock/config -d '{"graph": {"error_rate": 0.1}}'
+    curl localhost:9100/_mock/stats
+
+Account ids are derived from the authorization code, so every virtual user
+of the load generator logs in to a distinct account.
+
+Usage:
+    python -m loadtest.mock_upstreams --port 9100 --latency-ms 80 --jitter-ms 40 \\
+        --set tiktok.error_rate=0.05 --set cloudinary.latency_ms=400
+"""
+
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+import argparse
+import logging
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+logger = logging.getLogger("mock_upstreams")
+
+UPSTREAMS = ("graph", "tiktok", "google", "youtube", "cloudinary")
+
+DEFAULT_CONFIG = {
+    "latency_ms": 50.0,     # Added to every response
+    "jitter_ms": 20.0,      # Uniform 0..jitter on top of latency
+    "error_rate": 0.0,      # Share of requests answered with error_status
+    "error_status": 500
+}
+
+config: Dict[str, Dict[str, Any]] = {name: dict(DEFAULT_CONFIG) for name in UPSTREAMS}
+stats: Dict[str, Dict[str, int]] = {name: {"requests": 0, "errors_injected": 0, "bytes_received": 0} for name in UPSTREAMS}
+
+# In-progress YouTube resumable uploads: upload id -> {"title", "received"}
+youtube_uploads: Dict[str, Dict[str, Any]] = {}
+
+app = FastAPI(title="Mock upstreams")
+
+
+def account_key(secret: str) -> str:
+    """Stable per-account key derived from a code or token"""
+    if secret.startswith("mock."):
+        return secret.rsplit(".", 1)[-1]
+    return hashlib.sha1(secret.encode()).hexdigest()[:12]
+
+
+def numeric_id(prefix: str, key: str) -> str:
+    return f"{prefix}{int(key, 16) % 10 ** 13:013d}"
+
+
+def bearer(request: Request) -> str:
+    return request.headers.get("authorization", "").split(" ", 1)[-1]
+
+
+@app.middleware("http")
+async def emulate_network(request: Request, call_next):
+    """Apply the upstream's latency and error injection, and count requests"""
+    name = request.url.path.strip("/").split("/", 1)[0]
+    settings = config.get(name)
+    if settings is None:
+        return await call_next(request)
+
+    counters = stats[name]
+    counters["requests"] += 1
+    counters["bytes_received"] += int(request.headers.get("content-length") or 0)
+    delay = settings["latency_ms"] + random.uniform(0, settings["jitter_ms"])
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    if settings["error_rate"] and random.random() < settings["error_rate"]:
+        counters["errors_injected"] += 1
+        return JSONResponse(
+            {"error": {"code": "mock_injected_error", "message": f"Injected {name} error", "type": "MockError"}},
+            status_code=int(settings["error_status"])
+        )
+    return await call_next(request)
+
+
+@app.get("/_mock/config")
+async def get_config():
+    return config
+
+
+@app.post("/_mock/config")
+async def update_config(request: Request):
+    """Merge ``{"<upstream>|*": {"latency_ms": ..., ...}}`` into the running config"""
+    changes = await request.json()
+    for name, settings in changes.items():
+        for target in (UPSTREAMS if name == "*" else [name]):
+            if target in config:
+                config[target].update({key: value for key, value in settings.items() if key in DEFAULT_CONFIG})
+    return config
+
+
+@app.get("/_mock/stats")
+async def get_stats():
+    return stats
+
+
+@app.post("/_mock/reset")
+async def reset_stats():
+    for counters in stats.values():
+        for key in counters:
+            counters[key] = 0
+    youtube_uploads.clear()
+    return stats
+
+
+# ----------------------------------------------------------------------------
+# Graph API
+# ----------------------------------------------------------------------------
+@app.post("/graph/{version}/oauth/access_token")
+async def graph_code_exchange(request: Request):
+    form = await request.form()
+    key = account_key(form.get("code", ""))
+    return {"access_token": f"mock.graph-user.{key}", "token_type": "bearer", "expires_in": 3600}
+
+
+@app.get("/graph/{version}/oauth/access_token")
+async def graph_long_lived_token(fb_exchange_token: str = ""):
+    key = account_key(fb_exchange_token)
+    return {"access_token": f"mock.graph-long.{key}", "token_type": "bearer", "expires_in": 5184000}
+
+
+@app.get("/graph/{version}/me")
+async def graph_me(access_token: str = ""):
+    # No instagram_business_account here, so the backend goes through the Page
+    key = account_key(access_token)
+    return {"id": numeric_id("12", key), "name": f"Load Test {key}"}
+
+
+@app.get("/graph/{version}/me/accounts")
+async def graph_pages(access_token: str = ""):
+    key = account_key(access_token)
+    return {"data": [{
+        "id": numeric_id("10", key),
+        "name": f"Load Test Page {key}",
+        "access_token": f"mock.graph-page.{key}",
+        "instagram_business_account": {"id": numeric_id("17", key)}
+    }]}
+
+
+@app.get("/graph/{version}/{node_id}")
+async def graph_node(node_id: str, access_token: str = ""):
+    key = account_key(access_token)
+    if node_id.startswith("10"):
+        return {
+            "id": node_id,
+            "access_token": f"mock.graph-page.{key}",
+            "instagram_business_account": {"id": numeric_id("17", key), "username": f"loadtest_{key}"}
+        }
+    if node_id.startswith("17"):
+        return {"id": node_id, "username": f"loadtest_{key}", "followers_count": 1000, "media_count": 10}
+    return {"id": node_id, "status_code": "FINISHED"}
+
+
+@app.post("/graph/{version}/{ig_user_id}/media")
+async def graph_create_container(ig_user_id: str):
+    return {"id": f"18{uuid.uuid4().int % 10 ** 15:015d}"}
+
+
+@app.post("/graph/{version}/{ig_user_id}/media_publish")
+async def graph_publish(ig_user_id: str):
+    return {"id": f"17{uuid.uuid4().int % 10 ** 15:015d}"}
+
+
+# ----------------------------------------------------------------------------
+# TikTok
+# ----------------------------------------------------------------------------
+@app.post("/tiktok/v2/oauth/token/")
+async def tiktok_token(request: Request):
+    form = await request.form()
+    key = account_key(form.get("code") or form.get("refresh_token") or "")
+    return {
+        "access_token": f"mock.tiktok-access.{key}",
+        "refresh_token": f"mock.tiktok-refresh.{key}",
+        "open_id": f"open-{key}",
+        "expires_in": 86400,
+        "refresh_expires_in": 31536000,
+        "scope": "user.info.basic,video.upload",
+        "token_type": "Bearer"
+    }
+
+
+@app.post("/tiktok/v2/oauth/revoke/")
+async def tiktok_revoke():
+    return {}
+
+
+@app.get("/tiktok/v2/user/info/")
+async def tiktok_user_info(request: Request):
+    key = account_key(bearer(request))
+    return {
+        "data": {"user": {
+            "open_id": f"open-{key}",
+            "display_name": f"Load Test {key}",
+            "avatar_url": f"https://example.com/avatars/{key}.jpg",
+            "follower_count": 100,
+            "following_count": 10,
+            "likes_count": 1000,
+            "video_count": 5
+        }},
+        "error": {"code": "ok", "message": ""}
+    }
+
+
+@app.post("/tiktok/v2/post/publish/inbox/video/init/")
+async def tiktok_inbox_init():
+    upload_id = uuid.uuid4().hex
+    return {
+        "data": {
+            "publish_id": f"v_inbox_file~v2.{upload_id}",
+            "upload_url": f"https://open-upload.tiktokapis.com/video/?upload_id={upload_id}"
+        },
+        "error": {"code": "ok", "message": ""}
+    }
+
+
+@app.put("/tiktok/video/")
+async def tiktok_upload(request: Request):
+    async for _ in request.stream():
+        pass
+    return Response(status_code=201)
+
+
+# ----------------------------------------------------------------------------
+# Google OAuth and YouTube Data API
+# ----------------------------------------------------------------------------
+@app.post("/google/token")
+async def google_token(request: Request):
+    form = await request.form()
+    key = account_key(form.get("code") or form.get("refresh_token") or "")
+    # No "scope" in the reply: oauthlib then keeps the requested scopes
+    return {
+        "access_token": f"mock.google-access.{key}",
+        "refresh_token": f"mock.google-refresh.{key}",
+        "expires_in": 3599,
+        "token_type": "Bearer"
+    }
+
+
+@app.post("/google/revoke")
+async def google_revoke():
+    return {}
+
+
+@app.get("/youtube/youtube/v3/channels")
+async def youtube_channels(request: Request):
+    key = account_key(bearer(request))
+    return {
+        "kind": "youtube#channelListResponse",
+        "items": [{
+            "id": f"UC{key}",
+            "snippet": {
+                "title": f"Load Test {key}",
+                "description": "",
+                "customUrl": f"@loadtest{key}",
+                "publishedAt": "2024-01-01T00:00:00Z",
+                "thumbnails": {"high": {"url": f"https://example.com/thumbnails/{key}.jpg"}}
+            },
+            "statistics": {"subscriberCount": "100", "videoCount": "5", "viewCount": "1000", "hiddenSubscriberCount": False},
+            "contentDetails": {"relatedPlaylists": {"uploads": f"UU{key}"}}
+        }]
+    }
+
+
+@app.post("/youtube/upload/youtube/v3/videos")
+async def youtube_start_upload(request: Request):
+    """Open a resumable upload session (uploadType=resumable)"""
+    metadata = await request.json() if int(request.headers.get("content-length") or 0) else {}
+    upload_id = uuid.uuid4().hex
+    youtube_uploads[upload_id] = {"title": metadata.get("snippet", {}).get("title", ""), "received": 0}
+    location = f"https://youtube.googleapis.com/upload/youtube/v3/videos?uploadType=resumable&upload_id={upload_id}"
+    return Response(status_code=200, headers={"Location": location})
+
+
+@app.put("/youtube/upload/youtube/v3/videos")
+async def youtube_upload_chunk(request: Request, upload_id: str = ""):
+    upload = youtube_uploads.get(upload_id)
+    if upload is None:
+        return JSONResponse({"error": {"code": 404, "message": "Upload session not found"}}, status_code=404)
+
+    async for chunk in request.stream():
+        upload["received"] += len(chunk)
+
+    # "bytes 0-8388607/20000000" for a chunk, "bytes */20000000" for a status query
+    total = request.headers.get("content-range", "").rsplit("/", 1)[-1]
+    if not total.isdigit() or upload["received"] < int(total):
+        headers = {"Range": f"bytes=0-{upload['received'] - 1}"} if upload["received"] else {}
+        return Response(status_code=308, headers=headers)
+
+    del youtube_uploads[upload_id]
+    return {
+        "kind": "youtube#video",
+        "id": uuid.uuid4().hex[:11],
+        "snippet": {"title": upload["title"]},
+        "status": {"uploadStatus": "uploaded", "privacyStatus": "public"}
+    }
+
+
+# ----------------------------------------------------------------------------
+# Cloudinary
+# ----------------------------------------------------------------------------
+@app.post("/cloudinary/v1_1/{cloud_name}/video/upload")
+async def cloudinary_upload(cloud_name: str, request: Request):
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+    public_id = f"instagram-uploads/{uuid.uuid4().hex}"
+    return {
+        "public_id": public_id,
+        "resource_type": "video",
+        "bytes": received,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "secure_url": f"https://res.cloudinary.com/{cloud_name}/video/upload/v1/{public_id}.mp4"
+    }
+
+
+@app.get("/cloudinary/v1_1/{cloud_name}/ping")
+async def cloudinary_ping(cloud_name: str):
+    return {"status": "ok"}
+
+
+def parse_setting(value: str):
+    """``graph.latency_ms=300`` -> ("graph", "latency_ms", 300.0)"""
+    target, _, number = value.partition("=")
+    name, _, key = target.partition(".")
+    if name not in UPSTREAMS and name != "*" or key not in DEFAULT_CONFIG:
+        raise argparse.ArgumentTypeError(f"Expected <upstream>.<{'|'.join(DEFAULT_CONFIG)}>=<number>, got {value}")
+    return name, key, float(number)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock Graph, TikTok, Google/YouTube and Cloudinary APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_CONFIG["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=DEFAULT_CONFIG["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_CONFIG["error_rate"])
+    parser.add_argument("--error-status", type=int, default=DEFAULT_CONFIG["error_status"])
+    parser.add_argument("--set", dest="settings", type=parse_setting, action="append", default=[],
+                        metavar="UPSTREAM.KEY=VALUE", help="Per-upstream override, e.g. tiktok.error_rate=0.05")
+    args = parser.parse_args()
+
+    for settings in config.values():
+        settings.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                        error_rate=args.error_rate, error_status=args.error_status)
+    for name, key, value in args.settings:
+        for target in (UPSTREAMS if name == "*" else [name]):
+            config[target][key] = value
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
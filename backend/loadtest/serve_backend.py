@@ -0,0 +1,121 @@
+"""
+Serve the backend against the mock upstreams
+
+Outgoing requests (requests and httplib2) to the platform hosts are
+rewritten to the mock server, so the real handlers, executors, session
+store and upstream clients are exercised end to end. Fake app credentials
+and a throwaway session store are set unless already in the environment.
+
+The rewrite only exists in this process, so queued jobs (``Prefer:
+respond-async``) need JOB_WORKERS=0 here and are not load-tested; S3 and
+the instagrapi (username/password) endpoints are not mocked.
+
+Usage:
+    python -m loadtest.serve_backend --mock-url http://127.0.0.1:9100 --port 8000
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import logging
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("serve_backend")
+
+# Platform host -> path prefix on the mock server
+UPSTREAM_HOSTS = {
+    "graph.facebook.com": "/graph",
+    "open.tiktokapis.com": "/tiktok",
+    "open-upload.tiktokapis.com": "/tiktok",
+    "oauth2.googleapis.com": "/google",
+    "youtube.googleapis.com": "/youtube",
+    "www.googleapis.com": "/youtube",
+    "api.cloudinary.com": "/cloudinary"
+}
+
+
+def rewrite_url(url: str, mock_url: str) -> str:
+    """https://graph.facebook.com/v18.0/me -> http://127.0.0.1:9100/graph/v18.0/me"""
+    parts = urlsplit(url)
+    prefix = UPSTREAM_HOSTS.get(parts.hostname or "")
+    if prefix is None:
+        return url
+    rewritten = f"{mock_url.rstrip('/')}{prefix}{parts.path}"
+    return f"{rewritten}?{parts.query}" if parts.query else rewritten
+
+
+def install_rewrite(mock_url: str) -> None:
+    """
+    Point requests and httplib2 at the mock server
+
+    Must run before main is imported: metrics instrumentation then wraps the
+    rewritten transports and still labels calls with the platform host.
+    """
+    from requests.adapters import HTTPAdapter
+
+    send = HTTPAdapter.send
+
+    def send_to_mock(self, request, *args, **kwargs):
+        request.url = rewrite_url(request.url, mock_url)
+        return send(self, request, *args, **kwargs)
+    HTTPAdapter.send = send_to_mock
+
+    try:
+        import httplib2
+    except ImportError:
+        return
+    http_request = httplib2.Http.request
+
+    def request_to_mock(self, uri, *args, **kwargs):
+        return http_request(self, rewrite_url(uri, mock_url), *args, **kwargs)
+    httplib2.Http.request = request_to_mock
+
+
+def configure_environment() -> None:
+    """Fake credentials and a scratch session store (existing values win)"""
+    state_dir = tempfile.mkdtemp(prefix="cast-loadtest-")
+    defaults = {
+        "BASE_URL": "http://127.0.0.1:8000",
+        "FRONTEND_URL": "http://127.0.0.1:3000",
+        "INSTAGRAM_REDIRECT_URI": "http://127.0.0.1:3000/auth/instagram/callback",
+        "FACEBOOK_APP_ID": "loadtest-app",
+        "FACEBOOK_APP_SECRET": "loadtest-secret",
+        "YOUTUBE_CLIENT_ID": "loadtest-client.apps.googleusercontent.com",
+        "YOUTUBE_CLIENT_SECRET": "loadtest-secret",
+        "TIKTOK_CLIENT_KEY": "loadtest-client-key",
+        "TIKTOK_CLIENT_SECRET": "loadtest-secret",
+        "CLOUDINARY_CLOUD_NAME": "loadtest",
+        "CLOUDINARY_API_KEY": "loadtest-key",
+        "CLOUDINARY_API_SECRET": "loadtest-secret",
+        "SESSION_STORE_URL": f"sqlite:///{state_dir}/sessions.db",
+        "IDEMPOTENCY_STORE_URL": f"sqlite:///{state_dir}/idempotency.db",
+        "JOB_QUEUE_URL": f"sqlite:///{state_dir}/jobs.db",
+        "JOB_SPOOL_DIR": f"{state_dir}/spool",
+        "JOB_WORKERS": "0"
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    logger.info(f"Load-test state in {state_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend with platform APIs served by the mock upstreams")
+    parser.add_argument("--mock-url", default="http://127.0.0.1:9100")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    configure_environment()
+    install_rewrite(args.mock_url)
+
+    # The backend modules import each other by top-level name
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import main as backend
+    import uvicorn
+    uvicorn.run(backend.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Log Pipeline
+Non-blocking logging: a logging call only filters the record and puts it on
+a bounded queue; a background thread formats (text or JSON), redacts
+secrets and writes it. When the queue is full the record is dropped and
+counted instead of blocking the caller.
+
+Cheap filters run in the calling thread before a record is queued:
+- per-category sampling of noisy loggers (warnings and errors are always kept)
+- access-log suppression by route (e.g. /health), from uvicorn's record args
+- the current trace id, so JSON records can be joined with traces
+"""
+
+import re
+import sys
+import json
+import queue
+import random
+import logging
+import logging.handlers
+from typing import Dict, Iterable, Optional
+
+from tracing import current_trace
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# key=value, "key": "value" and 'key': 'value' forms of secret fields
+_SECRET_FIELDS = re.compile(
+    r"""(\b(?:access_token|refresh_token|id_token|page_access_token|user_access_token|fb_exchange_token|"""
+    r"""client_secret|app_secret|api_secret|password|signature|upload_token|sessionid|token)\b"""
+    r"""["']?\s*[:=]\s*["']?)(?:(?<=")[^"]*|(?<=')[^']*|[^\s"',&}]+)""",
+    re.IGNORECASE
+)
+# Bearer headers and bare Facebook / Google access tokens
+_SECRET_VALUES = re.compile(r"(Bearer\s+)[\w.~+/=-]+|\bEAA[A-Za-z0-9]{20,}|\bya29\.[\w-]+")
+
+REDACTED = "[REDACTED]"
+
+# Record attributes that are not user-supplied ``extra`` fields
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "trace_id", "color_message"}
+
+
+def redact(text: str) -> str:
+    """Mask tokens, secrets and passwords in a log line"""
+    text = _SECRET_FIELDS.sub(lambda match: match.group(1) + REDACTED, text)
+    return _SECRET_VALUES.sub(lambda match: (match.group(1) or "") + REDACTED, text)
+
+
+class RedactingFormatter(logging.Formatter):
+    """Text format with secrets masked"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, trace_id, extra fields, exception"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage())
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = redact(value) if isinstance(value, str) else value
+        if record.exc_info:
+            entry["exception"] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a share of INFO/DEBUG records per logger (longest matching name prefix wins)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: Dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        if name not in self._cache:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            self._cache[name] = self.rates[max(matches, key=len)] if matches else None
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+
+class RouteSuppressionFilter(logging.Filter):
+    """Drop uvicorn access records for the given paths (query strings ignored)"""
+
+    def __init__(self, paths: Iterable[str]):
+        super().__init__()
+        self.paths = frozenset(paths)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: (client, method, path, http_version, status)
+        args = record.args
+        if isinstance(args, tuple) and len(args) >= 3 and isinstance(args[2], str):
+            return args[2].split("?", 1)[0] not in self.paths
+        return True
+
+
+class TraceContextFilter(logging.Filter):
+    """Stamp the current trace id on the record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = current_trace()
+        record.trace_id = trace.trace_id if trace is not None else None
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records without formatting them; formatting and I/O happen on
+    the listener thread. Records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stdlib version formats here, in the caller's thread; only
+        # freeze the stack text, which cannot be rebuilt later
+        if record.stack_info:
+            record.stack_info = str(record.stack_info)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """The installed queue handler and its writer thread"""
+
+    def __init__(self, handler: NonBlockingQueueHandler, listener: logging.handlers.QueueListener):
+        self.handler = handler
+        self.listener = listener
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self.handler.queue.qsize(), "dropped": self.handler.dropped}
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+
+def configure_logging(level: str = "WARNING", fmt: str = "text", sample_rates: Optional[Dict[str, float]] = None,
+                      suppress_paths: Iterable[str] = ("/health",), access_log: bool = False,
+                      queue_size: int = 10000, stream=None) -> LogPipeline:
+    """
+    Route all logging (including uvicorn's) through the non-blocking pipeline
+
+    Args:
+        level: Root log level
+        fmt: "text" or "json"
+        sample_rates: Logger name prefix -> share of INFO/DEBUG records kept
+        suppress_paths: Routes left out of the access log
+        access_log: Whether uvicorn access records are logged at all
+        queue_size: Records buffered before new ones are dropped
+        stream: Where the writer thread writes (default stderr)
+    """
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter() if fmt == "json" else RedactingFormatter(TEXT_FORMAT))
+
+    log_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(TraceContextFilter())
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    # uvicorn installs its own (blocking) handlers - send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        for existing in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(existing)
+        uvicorn_logger.propagate = True
+    access = logging.getLogger("uvicorn.access")
+    access.setLevel(logging.INFO if access_log else logging.WARNING)
+    if suppress_paths:
+        access.addFilter(RouteSuppressionFilter(suppress_paths))
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    return LogPipeline(handler, listener)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """``uvicorn.access=0.01,social_media=0.5`` -> {"uvicorn.access": 0.01, "social_media": 0.5}"""
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.strip().partition("=")
+        if name and rate:
+            rates[name] = float(rate)
+    return rates
@@ -0,0 +1,174 @@
+"""
+Event Loop Monitor
+Measures event-loop lag continuously and records where the loop was stuck
+when it stalls (a blocking call made from an async handler)
+
+A heartbeat task on the loop sleeps ``interval`` seconds and records how
+late it wakes up (the lag). A watchdog thread notices when the heartbeat
+has been missing for longer than ``threshold`` and samples the loop
+thread's stack, so each stall is attributed to the call site that blocked.
+Unlike asyncio's slow-callback warnings this works without debug mode.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+loop_lag = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay of the event loop heartbeat past its schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+loop_stalls = REGISTRY.counter(
+    "event_loop_stalls_total", "Times the event loop was blocked past the stall threshold")
+
+# Frames from these directories are library code; the blocking call site is
+# the innermost frame outside them
+_LIBRARY_DIRS = tuple({os.path.dirname(os.__file__), os.path.dirname(asyncio.__file__)} |
+                      {path for path in sys.path if path.endswith(("site-packages", "dist-packages"))})
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoopMonitor:
+    """
+    Event-loop lag percentiles and the top blocking call sites
+
+    Usage:
+        monitor = LoopMonitor(threshold=0.1)
+        monitor.start()        # from a coroutine running on the loop
+        monitor.stats()
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, window: int = 3000, max_sites: int = 100):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_sites = max_sites
+
+        self._lags: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, Any]] = {}
+        self._stall_site: Optional[str] = None
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+        self.stalls = 0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Start the heartbeat on the running loop and the watchdog thread"""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True).start()
+        logger.info(f"Event loop monitor started (stall threshold {self.threshold * 1000:.0f}ms)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._lock:
+                self._last_beat = now
+                self._lags.append(lag)
+                self.max_lag = max(self.max_lag, lag)
+                site, self._stall_site = self._stall_site, None
+                if site is not None:
+                    # The watchdog saw this stall - charge its duration to the call site
+                    entry = self._sites[site]
+                    entry["blocked_seconds"] += lag
+                    entry["max_seconds"] = max(entry["max_seconds"], lag)
+            loop_lag.observe(lag)
+            if lag >= self.threshold:
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms" + (f" at {site}" if site else ""))
+
+    def _watchdog(self) -> None:
+        check_every = max(self.threshold / 2, 0.01)
+        while not self._stop.wait(check_every):
+            with self._lock:
+                blocked_for = time.monotonic() - self._last_beat - self.interval
+                if blocked_for < self.threshold or self._stall_site is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._record_stall(traceback.extract_stack(frame))
+
+    def _record_stall(self, stack: traceback.StackSummary) -> None:
+        app_frames = [f for f in stack if not f.filename.startswith(_LIBRARY_DIRS)]
+        blocking = stack[-1]
+        caller = app_frames[-1] if app_frames else blocking
+        site = f"{os.path.basename(caller.filename)}:{caller.lineno} in {caller.name}"
+        if caller is not blocking:
+            site += f" -> {os.path.basename(blocking.filename)}:{blocking.lineno} in {blocking.name}"
+
+        with self._lock:
+            self.stalls += 1
+            self._stall_site = site
+            entry = self._sites.get(site)
+            if entry is None:
+                if len(self._sites) >= self.max_sites:
+                    # Forget the least frequent site to bound memory
+                    del self._sites[min(self._sites, key=lambda key: self._sites[key]["count"])]
+                entry = self._sites[site] = {"count": 0, "blocked_seconds": 0.0, "max_seconds": 0.0}
+            entry["count"] += 1
+            entry["last_seen"] = time.time()
+            entry["stack"] = [f"{f.filename}:{f.lineno} in {f.name}" for f in stack[-12:]]
+        loop_stalls.inc()
+
+    def stats(self, top: int = 10) -> Dict[str, Any]:
+        """Lag percentiles over the recent window and the call sites that blocked the loop most"""
+        with self._lock:
+            lags = sorted(self._lags)
+            sites = sorted(self._sites.items(), key=lambda item: item[1]["blocked_seconds"], reverse=True)[:top]
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "window_samples": len(lags),
+                "lag_ms": {
+                    "p50": round(_percentile(lags, 0.5) * 1000, 2),
+                    "p90": round(_percentile(lags, 0.9) * 1000, 2),
+                    "p99": round(_percentile(lags, 0.99) * 1000, 2),
+                    "max_window": round((lags[-1] if lags else 0.0) * 1000, 2),
+                    "max_since_start": round(self.max_lag * 1000, 2)
+                },
+                "stalls": self.stalls,
+                "top_blocking_sites": [
+                    {
+                        "site": site,
+                        "count": entry["count"],
+                        "blocked_ms": round(entry["blocked_seconds"] * 1000, 1),
+                        "max_ms": round(entry["max_seconds"] * 1000, 1),
+                        "last_seen": entry.get("last_seen"),
+                        "stack": entry.get("stack", [])
+                    }
+                    for site, entry in sites
+                ]
+            }
+
+    def reset(self) -> None:
+        """Forget recorded call sites (e.g. after deploying a fix)"""
+        with self._lock:
+            self._sites.clear()
+            self.stalls = 0
+            self.max_lag = 0.0
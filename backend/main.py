@@ -1,63 +1,108 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import functools
 import subprocess
+import shutil
 import tempfile
 import os
 import time
 import requests
 from pydantic import BaseModel
-from instagrapi import Client
-from instagrapi.exceptions import LoginRequired, BadPassword
+from lazy_imports import lazy_module, after_import, prewarm, import_status
 from instagram_graph_api import InstagramGraphAPI
 from instagram_platform_api import InstagramPlatformAPI
+from file_upload_service import FileUploadService
+from services import ServiceContainer
+from profile_cache import ProfileCache
+from single_flight import SingleFlight
+from executors import Executors, ExecutorSaturated
+from metrics import (
+    REGISTRY as metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware,
+    instrument_requests, instrument_httplib2, record_ffmpeg
+)
+from tracing import tracer, TracingMiddleware, create_exporter, span, traceparent
+from log_pipeline import configure_logging, parse_sample_rates
+from loop_monitor import LoopMonitor
+from sampling_profiler import SamplingProfiler
+from capabilities import Capabilities, available_cpus, NOT_READY
+from token_state import TokenStateCache, is_auth_failure
+from token_refresh import TokenRefreshScheduler
+from session_store import create_session_store, JournalSessionStore
+from job_queue import create_job_queue, JobWorker, PermanentJobError, QUEUED, RUNNING
+from publish_saga import PublishSagas, file_digest, saga_id
+from publish_events import create_publish_event_log, EVENTS, CONNECTED, UPLOAD_START, UPLOAD_SUCCESS, UPLOAD_FAILED
+from idempotency import (
+    create_idempotency_store, request_fingerprint, replay_response, response_record, complete_key, release_key,
+    STARTED, COMPLETED, MISMATCH
+)
+from client_registry import ClientRegistry
+from instagrapi_pool import InstagrapiPool, run_operation as run_instagrapi_operation
 import os
 import json
 import pickle
+import hashlib
+import hmac
+import secrets
+import uuid
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Optional
+import atexit
 import logging
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request as GoogleRequest
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+from youtube_service import YouTubeServiceCache, build_youtube_service
 from dotenv import load_dotenv
-import logging.config
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging with health check filter
-class HealthCheckFilter(logging.Filter):
-    def filter(self, record):
-        # Filter out health check requests - more comprehensive filtering
-        message = str(record.getMessage()) if hasattr(record, 'getMessage') else str(record)
-        return not any([
-            'GET /health HTTP/1.1' in message,
-            '/health HTTP/1.1' in message,
-            'GET /health' in message,
-            'health HTTP' in message
-        ])
-
-# Set up logging configuration
-logging.basicConfig(
-    level=logging.WARNING,  # Change to WARNING to reduce noise
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Logging goes through a bounded queue to a background writer thread:
+# records are formatted (text or JSON) and redacted off the request path,
+# /health is left out of the access log and noisy loggers can be sampled
+log_pipeline = configure_logging(
+    level=os.getenv('LOG_LEVEL', 'WARNING'),
+    fmt=os.getenv('LOG_FORMAT', 'text'),
+    sample_rates=parse_sample_rates(os.getenv('LOG_SAMPLE_RATES', '')),
+    suppress_paths=[path for path in os.getenv('LOG_SUPPRESS_PATHS', '/health,/ready').split(',') if path],
+    access_log=os.getenv('LOG_ACCESS', 'false').lower() == 'true',
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', '10000'))
 )
+atexit.register(log_pipeline.stop)    # Flushes what is still queued
 logger = logging.getLogger(__name__)
 
-# Configure uvicorn access logger to be silent for health checks
-uvicorn_access = logging.getLogger("uvicorn.access")
-uvicorn_access.setLevel(logging.WARNING)
-uvicorn_access.addFilter(HealthCheckFilter())
-
 # Social Media Event Logger
 social_logger = logging.getLogger("social_media")
 social_logger.setLevel(logging.INFO)
 
 app = FastAPI(title="Social Media API", version="1.0.0")
 
+# Platform SDKs are imported on first use (and prewarmed after startup), so a
+# cold start answers /health without waiting for them
+instagrapi = lazy_module("instagrapi")
+instagrapi_exceptions = lazy_module("instagrapi.exceptions")
+google_credentials = lazy_module("google.oauth2.credentials")
+google_transport = lazy_module("google.auth.transport.requests")
+google_auth_exceptions = lazy_module("google.auth.exceptions")
+google_oauth_flow = lazy_module("google_auth_oauthlib.flow")
+googleapiclient_http = lazy_module("googleapiclient.http")
+googleapiclient_errors = lazy_module("googleapiclient.errors")
+
+# Route latency/bytes and upstream call metrics, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+instrument_requests()
+after_import("httplib2", instrument_httplib2)
+
+# A trace per request/job with stage spans, summarized in Server-Timing and
+# exported to TRACE_EXPORT_URL (file:///traces.jsonl or an OTLP/HTTP collector)
+tracer.configure(
+    create_exporter(os.getenv('TRACE_EXPORT_URL', ''), service_name=os.getenv('TRACE_SERVICE_NAME', 'cast-backend')),
+    sample_rate=float(os.getenv('TRACE_SAMPLE_RATE', '1.0'))
+)
+app.add_middleware(TracingMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -74,158 +119,331 @@ app.add_middleware(
 # Mount static files to serve demo.mp4
 app.mount("/static", StaticFiles(directory="."), name="static")
 
-# Video processing endpoint for Instagram Reels
-@app.post("/api/instagram/graph/process-video")
-async def process_video_for_reels(request: Request):
+def executor_limits(name: str, workers: int, queue: int) -> tuple:
+    """(max_workers, max_queue) for a named executor, overridable via EXECUTOR_<NAME>_WORKERS/_QUEUE"""
+    prefix = f"EXECUTOR_{name.upper()}"
+    return (int(os.getenv(f"{prefix}_WORKERS", str(workers))), int(os.getenv(f"{prefix}_QUEUE", str(queue))))
+
+CPU_COUNT = available_cpus()
+
+# Transcodes are CPU-bound: each ffmpeg gets up to 4 threads and only as many
+# run at once as the cores can carry; the rest wait in a short queue and
+# further requests get 429 with Retry-After, so accepted encodes finish in time
+FFMPEG_DEFAULT_WORKERS = max(1, CPU_COUNT // min(4, CPU_COUNT))
+FFMPEG_WORKERS, FFMPEG_QUEUE = executor_limits("ffmpeg", FFMPEG_DEFAULT_WORKERS, 2 * FFMPEG_DEFAULT_WORKERS)
+FFMPEG_THREADS = int(os.getenv('FFMPEG_THREADS', str(max(1, CPU_COUNT // FFMPEG_WORKERS))))
+FFMPEG_NICE = int(os.getenv('FFMPEG_NICE', '10'))
+
+# Blocking work from async endpoints runs on named, bounded executors so the
+# event loop stays responsive; a full queue answers 503 with Retry-After
+executors = Executors({
+    "instagram": executor_limits("instagram", 4, 32),
+    "youtube": executor_limits("youtube", 8, 64),
+    "tiktok": executor_limits("tiktok", 8, 64),
+    "storage": executor_limits("storage", 8, 64),
+    "ffmpeg": (FFMPEG_WORKERS, FFMPEG_QUEUE, 429),
+})
+
+def ffmpeg_command(*args: str) -> list:
     """
-    Process video to meet Instagram Reels requirements (9:16 aspect ratio)
+    ffmpeg command line run at FFMPEG_NICE priority so the API stays responsive,
+    with decoding and filtering limited to FFMPEG_THREADS (encoders take their own -threads)
+    and -benchmark so run_ffmpeg can record its CPU time
     """
-    try:
-        request_data = await request.json()
-        video_url = request_data.get("video_url")
-        target_width = request_data.get("target_width", 720)
-        target_height = request_data.get("target_height", 1280)
-        target_ratio = request_data.get("target_ratio", 9/16)
-        center_crop = request_data.get("center_crop", True)
+    cmd = ['ffmpeg', '-benchmark', '-threads', str(FFMPEG_THREADS), '-filter_threads', str(FFMPEG_THREADS), *args]
+    if FFMPEG_NICE > 0 and shutil.which('nice'):
+        cmd = ['nice', '-n', str(FFMPEG_NICE), *cmd]
+    return cmd
+
+def run_ffmpeg(operation: str, cmd: list, timeout: float) -> subprocess.CompletedProcess:
+    """
+    Run an ffmpeg command line as the ``operation`` span, recording wall/CPU
+    time and realtime factor under that name
+    """
+    with span(operation, threads=FFMPEG_THREADS) as ffmpeg_span:
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            stderr = e.stderr.decode("utf-8", "replace") if isinstance(e.stderr, bytes) else (e.stderr or "")
+            record_ffmpeg(operation, "timeout", time.perf_counter() - started, stderr)
+            raise
+        record_ffmpeg(operation, "ok" if result.returncode == 0 else "failed", time.perf_counter() - started, result.stderr)
+        if ffmpeg_span is not None:
+            ffmpeg_span.set(returncode=result.returncode)
+        return result
+
+def write_file(path: str, content: bytes, fsync: bool = False):
+    """Write bytes to a file (run on the storage executor)"""
+    with span("spool", bytes=len(content)), open(path, "wb") as f:
+        f.write(content)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+# Idempotency-Key records for publish endpoints (shared by all workers)
+idempotency_store = create_idempotency_store(
+    os.getenv('IDEMPOTENCY_STORE_URL', 'sqlite:///sessions/idempotency.db'),
+    ttl=float(os.getenv('IDEMPOTENCY_TTL', '86400')),
+    lock_ttl=float(os.getenv('IDEMPOTENCY_LOCK_TTL', '900'))
+)
+IDEMPOTENCY_WAIT = float(os.getenv('IDEMPOTENCY_WAIT', '25'))
+# Completing and releasing keys runs on its own threads: after a publish
+# succeeded it must not be rejected by a saturated storage executor
+idempotency_bookkeeping = ThreadPoolExecutor(max_workers=2, thread_name_prefix="idempotency")
+
+def idempotent(endpoint):
+    """
+    Honor an Idempotency-Key header on a publish endpoint
+    
+    The first request with a key runs normally and a 2xx response is stored;
+    retries with the same key get it replayed (for a queued upload: the same
+    202 and job id). A retry arriving while the first request is still
+    running waits for it for up to IDEMPOTENCY_WAIT seconds, then gets 409.
+    Reusing a key for a different request is rejected with 422.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs):
+        request = kwargs["request"]
+        key = request.headers.get("idempotency-key")
+        if not key:
+            return await endpoint(**kwargs)
+        if len(key) > 255:
+            raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+        
+        record_key = f"{request.url.path}:{key}"
+        fingerprint = await request_fingerprint(request, kwargs)
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT
+        while True:
+            outcome, record = await executors.run("storage", idempotency_store.begin, record_key, fingerprint)
+            if outcome == STARTED:
+                break
+            if outcome == COMPLETED:
+                logger.info(f"Replaying stored response for Idempotency-Key {key} on {request.url.path}")
+                return replay_response(record)
+            if outcome == MISMATCH:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=409,
+                    detail="A request with this Idempotency-Key is still in progress",
+                    headers={"Retry-After": "5"}
+                )
+            await asyncio.sleep(0.5)
         
-        if not video_url:
-            raise HTTPException(status_code=400, detail="Video URL is required")
+        try:
+            response = await endpoint(**kwargs)
+        except BaseException:
+            # Scheduled, not awaited - the request may be cancelled
+            idempotency_bookkeeping.submit(release_key, idempotency_store, record_key)
+            raise
+        if 200 <= response.status_code < 300:
+            # Awaited so an immediate retry finds the stored response; a store
+            # failure is retried and logged, never returned as a publish failure
+            await asyncio.get_running_loop().run_in_executor(
+                idempotency_bookkeeping, functools.partial(complete_key, idempotency_store, record_key, *response_record(response))
+            )
+        else:
+            idempotency_bookkeeping.submit(release_key, idempotency_store, record_key)
+        return response
+    return wrapper
+
+class TranscodeFailed(Exception):
+    """ffmpeg could not produce the video - carries the HTTP status and JSON error body"""
+    
+    def __init__(self, status_code: int, body: dict):
+        super().__init__(body.get("error", "Video processing failed"))
+        self.status_code = status_code
+        self.body = body
+
+# Encoder-specific options for the H.264 encoder the capability probe picked
+VIDEO_ENCODER_OPTIONS = {
+    "libx264": ['-preset', 'veryfast', '-profile:v', 'high', '-level', '4.0'],
+    "libopenh264": []
+}
+
+def transcode_video_for_reels(video_url: str, target_width: int = 720, target_height: int = 1280,
+                              target_ratio: float = 9/16, center_crop: bool = True) -> dict:
+    """
+    Crop and re-encode a video to Instagram Reels requirements (blocking)
+    
+    Returns:
+        dict with the processed video and thumbnail URLs
+    
+    Raises:
+        TranscodeFailed: ffmpeg is unusable here, failed or timed out
+    """
+    # Job worker processes have no background probe - probe once on first use
+    if capabilities.snapshot() is None:
+        capabilities.probe()
+    video_encoder, audio_encoder = capabilities.video_encoder, capabilities.audio_encoder
+    if video_encoder is None or audio_encoder is None:
+        raise TranscodeFailed(503, {
+            "success": False,
+            "error": "Video processing is not available on this server",
+            "details": "ffmpeg with an H.264 and an AAC encoder is required (see /ready)"
+        })
+    
+    logger.info(f"Processing video for Instagram Reels: {video_url}")
+    
+    # Download video
+    response = requests.get(video_url, timeout=30)
+    if response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Could not download video")
+    
+    # Create temporary files
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as input_file:
+        input_path = input_file.name
+    write_file(input_path, response.content)
+    
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as output_file:
+        output_path = output_file.name
+    
+    try:
+        # Use ffmpeg to crop video to 9:16 aspect ratio with Instagram-compatible encoding
+        # Based on: https://developers.facebook.com/docs/instagram-platform/instagram-graph-api/reference/ig-user/media#creating
+        # Determine max duration and file size based on content type
+        max_duration = 900 if target_ratio >= 0.5 else 60  # 15 mins for Reels, 60 secs for Stories
+        max_file_size = 300 if target_ratio >= 0.5 else 100  # 300MB for Reels, 100MB for Stories
+        
+        cmd = ffmpeg_command(
+            '-i', input_path,
+            '-vf', f'scale={target_width}:{target_height}:force_original_aspect_ratio=increase,crop={target_width}:{target_height}:(iw-{target_width})/2:(ih-{target_height})/2' if center_crop else f'scale={target_width}:{target_height}:force_original_aspect_ratio=increase,crop={target_width}:{target_height}',
+            '-c:v', video_encoder,
+            '-threads', str(FFMPEG_THREADS),
+            *VIDEO_ENCODER_OPTIONS[video_encoder],
+            '-pix_fmt', 'yuv420p',  # 4:2:0 chroma subsampling
+            '-g', '30',  # GOP size for closed GOP
+            '-keyint_min', '30',  # Minimum keyframe interval
+            '-sc_threshold', '0',  # Disable scene change detection for closed GOP
+            '-b:v', '3000k',  # lighter bitrate to speed up processing
+            '-maxrate', '8000k',  # lower maxrate to reduce spikes
+            '-bufsize', '16000k',  # proportional buffer size
+            '-c:a', audio_encoder,
+            '-ar', '48000',  # 48khz sample rate maximum
+            '-ac', '2',  # Stereo (2 channels)
+            '-b:a', '128k',  # 128kbps audio bitrate
+            '-movflags', '+faststart',  # moov atom at front
+            '-t', str(max_duration),  # Max duration (15 mins for Reels, 60 secs for Stories)
+            '-fs', f'{max_file_size}M',  # Max file size (300MB for Reels, 100MB for Stories)
+            '-y',  # Overwrite output file
+            output_path
+        )
         
-        logger.info(f"Processing video for Instagram Reels: {video_url}")
+        try:
+            result = run_ffmpeg("transcode", cmd, timeout=180)
+        except subprocess.TimeoutExpired as te:
+            logger.error(f"FFmpeg timeout: {te}")
+            raise TranscodeFailed(504, {
+                "success": False,
+                "error": "FFmpeg processing timed out",
+                "details": str(te)
+            })
         
-        # Download video
-        response = requests.get(video_url, timeout=30)
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Could not download video")
+        if result.returncode != 0:
+            logger.error(f"FFmpeg error: {result.stderr}")
+            raise TranscodeFailed(500, {
+                "success": False,
+                "error": "Video processing failed",
+                "ffmpeg_stderr": result.stderr,
+                "ffmpeg_stdout": result.stdout
+            })
         
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as input_file:
-            input_file.write(response.content)
-            input_path = input_file.name
+        # Save processed video to static directory
+        processed_filename = f"processed_reels_{int(time.time())}.mp4"
+        processed_path = f"static/{processed_filename}"
         
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as output_file:
-            output_path = output_file.name
+        shutil.copyfile(output_path, processed_path)
         
-        try:
-            # Use ffmpeg to crop video to 9:16 aspect ratio with Instagram-compatible encoding
-            # Based on: https://developers.facebook.com/docs/instagram-platform/instagram-graph-api/reference/ig-user/media#creating
-            # Determine max duration and file size based on content type
-            max_duration = 900 if target_ratio >= 0.5 else 60  # 15 mins for Reels, 60 secs for Stories
-            max_file_size = 300 if target_ratio >= 0.5 else 100  # 300MB for Reels, 100MB for Stories
-            
-            cmd = [
-                'ffmpeg', '-i', input_path,
-                '-vf', f'scale={target_width}:{target_height}:force_original_aspect_ratio=increase,crop={target_width}:{target_height}:(iw-{target_width})/2:(ih-{target_height})/2' if center_crop else f'scale={target_width}:{target_height}:force_original_aspect_ratio=increase,crop={target_width}:{target_height}',
-                '-c:v', 'libx264',
-                '-preset', 'veryfast',
-                '-profile:v', 'high',
-                '-level', '4.0',
-                '-pix_fmt', 'yuv420p',  # 4:2:0 chroma subsampling
-                '-g', '30',  # GOP size for closed GOP
-                '-keyint_min', '30',  # Minimum keyframe interval
-                '-sc_threshold', '0',  # Disable scene change detection for closed GOP
-                '-b:v', '3000k',  # lighter bitrate to speed up processing
-                '-maxrate', '8000k',  # lower maxrate to reduce spikes
-                '-bufsize', '16000k',  # proportional buffer size
-                '-c:a', 'aac',
-                '-ar', '48000',  # 48khz sample rate maximum
-                '-ac', '2',  # Stereo (2 channels)
-                '-b:a', '128k',  # 128kbps audio bitrate
-                '-movflags', '+faststart',  # moov atom at front
-                '-t', str(max_duration),  # Max duration (15 mins for Reels, 60 secs for Stories)
-                '-fs', f'{max_file_size}M',  # Max file size (300MB for Reels, 100MB for Stories)
-                '-y',  # Overwrite output file
-                output_path
-            ]
-            
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=180)
-            except subprocess.TimeoutExpired as te:
-                logger.error(f"FFmpeg timeout: {te}")
-                return JSONResponse({
-                    "success": False,
-                    "error": "FFmpeg processing timed out",
-                    "details": str(te)
-                }, status_code=504)
-            
-            if result.returncode != 0:
-                logger.error(f"FFmpeg error: {result.stderr}")
-                return JSONResponse({
-                    "success": False,
-                    "error": "Video processing failed",
-                    "ffmpeg_stderr": result.stderr,
-                    "ffmpeg_stdout": result.stdout
-                }, status_code=500)
-            
-            # Read processed video
-            with open(output_path, 'rb') as f:
-                processed_video = f.read()
-            
-            # Save processed video to static directory
-            processed_filename = f"processed_reels_{int(time.time())}.mp4"
-            processed_path = f"static/{processed_filename}"
-            
-            with open(processed_path, 'wb') as f:
-                f.write(processed_video)
-            
-            # Return URL to processed video
-            processed_url = f"https://backrooms-e8nm.onrender.com/static/{processed_filename}"
+        # Return URL to processed video
+        processed_url = f"https://backrooms-e8nm.onrender.com/static/{processed_filename}"
 
-            # Generate a JPEG thumbnail (cover) from the processed video (at 1s)
-            thumbnail_filename = f"processed_reels_{int(time.time())}.jpg"
-            thumbnail_path = f"static/{thumbnail_filename}"
-            try:
-                thumb_cmd = [
-                    'ffmpeg', '-ss', '00:00:01', '-i', output_path,
-                    '-frames:v', '1',
-                    '-vf', f'scale={target_width}:-2',
-                    '-q:v', '2',
-                    '-y', thumbnail_path
-                ]
-                thumb_result = subprocess.run(thumb_cmd, capture_output=True, text=True, timeout=60)
-                if thumb_result.returncode != 0:
-                    logger.warning(f"FFmpeg thumbnail error: {thumb_result.stderr}")
-                    thumbnail_url = None
-                else:
-                    thumbnail_url = f"https://backrooms-e8nm.onrender.com/static/{thumbnail_filename}"
-            except Exception as thumb_err:
-                logger.warning(f"Thumbnail generation failed: {thumb_err}")
+        # Generate a JPEG thumbnail (cover) from the processed video (at 1s)
+        thumbnail_filename = f"processed_reels_{int(time.time())}.jpg"
+        thumbnail_path = f"static/{thumbnail_filename}"
+        try:
+            thumb_cmd = ffmpeg_command(
+                '-ss', '00:00:01', '-i', output_path,
+                '-frames:v', '1',
+                '-vf', f'scale={target_width}:-2',
+                '-q:v', '2',
+                '-y', thumbnail_path
+            )
+            thumb_result = run_ffmpeg("thumbnail", thumb_cmd, timeout=60)
+            if thumb_result.returncode != 0:
+                logger.warning(f"FFmpeg thumbnail error: {thumb_result.stderr}")
                 thumbnail_url = None
+            else:
+                thumbnail_url = f"https://backrooms-e8nm.onrender.com/static/{thumbnail_filename}"
+        except Exception as thumb_err:
+            logger.warning(f"Thumbnail generation failed: {thumb_err}")
+            thumbnail_url = None
 
-            logger.info(f"Video processed successfully: {processed_url}; thumbnail: {thumbnail_url}")
+        logger.info(f"Video processed successfully: {processed_url}; thumbnail: {thumbnail_url}")
 
-            return JSONResponse({
-                        "success": True,
-                        "processed_video_url": processed_url,
-                        "processed_thumbnail_url": thumbnail_url,
-                        "original_dimensions": "analyzed",
-                        "processed_dimensions": f"{target_width}x{target_height}",
-                        "aspect_ratio": f"{target_ratio:.3f}",
-                        "center_crop": center_crop,
-                        "instagram_compliance": {
-                            "container": "MP4 (MPEG-4 Part 14)",
-                            "video_codec": "H.264",
-                            "audio_codec": "AAC",
-                            "chroma_subsampling": "4:2:0",
-                            "closed_gop": True,
-                            "max_duration_seconds": max_duration,
-                            "max_file_size_mb": max_file_size,
-                            "video_bitrate": "5Mbps (VBR, max 25Mbps)",
-                            "audio_bitrate": "128kbps",
-                            "sample_rate": "48kHz",
-                            "channels": "Stereo (2)",
-                            "moov_atom_front": True
-                        }
-                    })
-            
-        finally:
-            # Clean up temporary files
-            try:
-                os.unlink(input_path)
-                os.unlink(output_path)
-            except:
-                pass
+        return {
+            "success": True,
+            "processed_video_url": processed_url,
+            "processed_thumbnail_url": thumbnail_url,
+            "original_dimensions": "analyzed",
+            "processed_dimensions": f"{target_width}x{target_height}",
+            "aspect_ratio": f"{target_ratio:.3f}",
+            "center_crop": center_crop,
+            "instagram_compliance": {
+                "container": "MP4 (MPEG-4 Part 14)",
+                "video_codec": "H.264",
+                "audio_codec": "AAC",
+                "chroma_subsampling": "4:2:0",
+                "closed_gop": True,
+                "max_duration_seconds": max_duration,
+                "max_file_size_mb": max_file_size,
+                "video_bitrate": "5Mbps (VBR, max 25Mbps)",
+                "audio_bitrate": "128kbps",
+                "sample_rate": "48kHz",
+                "channels": "Stereo (2)",
+                "moov_atom_front": True
+            }
+        }
+        
+    finally:
+        # Clean up temporary files
+        try:
+            os.unlink(input_path)
+            os.unlink(output_path)
+        except:
+            pass
+
+# Video processing endpoint for Instagram Reels
+@app.post("/api/instagram/graph/process-video")
+@idempotent
+async def process_video_for_reels(request: Request):
+    """
+    Process video to meet Instagram Reels requirements (9:16 aspect ratio)
+    
+    Send ``Prefer: respond-async`` to queue the job and get 202 with a job id.
+    """
+    try:
+        request_data = await request.json()
+        options = {
+            "video_url": request_data.get("video_url"),
+            "target_width": request_data.get("target_width", 720),
+            "target_height": request_data.get("target_height", 1280),
+            "target_ratio": request_data.get("target_ratio", 9/16),
+            "center_crop": request_data.get("center_crop", True)
+        }
+        
+        if not options["video_url"]:
+            raise HTTPException(status_code=400, detail="Video URL is required")
+        
+        if prefers_async(request):
+            return await accept_job("reels_transcode", options)
+        
+        return JSONResponse(await executors.run("ffmpeg", transcode_video_for_reels, **options))
                 
+    except TranscodeFailed as e:
+        return JSONResponse(e.body, status_code=e.status_code)
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Video processing error: {str(e)}")
         return JSONResponse({
@@ -233,15 +451,69 @@ async def process_video_for_reels(request: Request):
             "error": str(e)
         }, status_code=500)
 
-# Store active sessions (in production, use Redis or database)
-active_sessions = {}  # Store Instagram (instagrapi) sessions
-youtube_sessions = {}  # Store YouTube credentials
-tiktok_sessions = {}  # Store TikTok credentials
-instagram_meta_sessions = {}  # Store Instagram Meta API credentials
-instagram_graph_sessions = {}  # Store Instagram Graph API credentials
+# Persistent session store shared by all workers (SQLite locally, Redis across instances)
+SESSION_STORE_URL = os.getenv('SESSION_STORE_URL', 'sqlite:///sessions/sessions.db')
+session_store = create_session_store(SESSION_STORE_URL)
+
+youtube_sessions = session_store.platform("youtube")  # Store YouTube credentials
+tiktok_sessions = session_store.platform("tiktok")  # Store TikTok credentials
+instagram_meta_sessions = session_store.platform("instagram_meta")  # Store Instagram Meta API credentials
+instagram_graph_sessions = session_store.platform("instagram_graph")  # Store Instagram Graph API credentials
+
+# Stage checkpoints of unfinished publishes, so a retry resumes where the last attempt stopped
+publish_sagas = PublishSagas(
+    session_store.platform("publish_sagas"),
+    max_age=float(os.getenv('PUBLISH_CHECKPOINT_MAX_AGE', str(7 * 86400)))
+)
+
+# Connections and uploads per account (GET /api/publish-events), kept for PUBLISH_EVENTS_RETENTION_DAYS
+publish_events = create_publish_event_log(
+    os.getenv('PUBLISH_EVENTS_URL', 'sqlite:///sessions/publish_events.db'),
+    retention=float(os.getenv('PUBLISH_EVENTS_RETENTION_DAYS', '90')) * 86400
+)
+
+# API wrappers and clients built once per process and shared by all requests
+# (rebuilt on next use when one of their environment variables changes)
+services = ServiceContainer()
+services.register("file_uploads", FileUploadService, config=(
+    "AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_BUCKET_NAME", "AWS_REGION",
+    "CLOUDINARY_CLOUD_NAME", "CLOUDINARY_API_KEY", "CLOUDINARY_API_SECRET"
+))
+services.register("instagram_graph", lambda: InstagramGraphAPI(file_uploads=lambda: services.file_uploads),
+                  config=("FACEBOOK_APP_ID", "FACEBOOK_APP_SECRET", "INSTAGRAM_REDIRECT_URI"))
+services.register("instagram_platform", InstagramPlatformAPI,
+                  config=("FACEBOOK_APP_ID", "FACEBOOK_APP_SECRET", "INSTAGRAM_REDIRECT_URI"))
+services.get("instagram_graph")  # Fails fast when INSTAGRAM_REDIRECT_URI is missing
+
+# Coalesces concurrent identical upstream calls keyed by (platform, account, operation)
+upstream_flight = SingleFlight()
+
+# Token validity verdicts - upload and validate paths go upstream only when stale
+token_states = TokenStateCache(
+    valid_ttl=float(os.getenv('TOKEN_STATE_VALID_TTL', '300')),
+    invalid_ttl=float(os.getenv('TOKEN_STATE_INVALID_TTL', '3600'))
+)
+
+# YouTube API services reused per channel while its access token is unchanged
+youtube_services = YouTubeServiceCache(max_entries=int(os.getenv('YOUTUBE_SERVICE_CACHE_SIZE', '256')))
+
+# Resumable uploads go in chunks so an interrupted upload can continue from
+# the last chunk the session received (upload sessions last about a week)
+YOUTUBE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+YOUTUBE_UPLOAD_SESSION_TTL = 24 * 3600
+
+# Background refresh of stored tokens shortly before they expire
+token_refresher = TokenRefreshScheduler(
+    lead_time=float(os.getenv('TOKEN_REFRESH_LEAD_TIME', '600')),
+    min_interval=float(os.getenv('TOKEN_REFRESH_MIN_INTERVAL', '1'))
+)
 
-# Initialize Instagram Graph API for posting capabilities
-instagram_graph_api = InstagramGraphAPI()
+# Profile data cache (Instagram account info, YouTube channels, TikTok users)
+profile_cache = ProfileCache(
+    ttl=float(os.getenv('PROFILE_CACHE_TTL', '300')),
+    stale_ttl=float(os.getenv('PROFILE_CACHE_STALE_TTL', '3600')),
+    max_entries=int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '1024'))
+)
 
 # Session persistence
 SESSIONS_DIR = "sessions"
@@ -253,74 +525,98 @@ def ensure_sessions_dir():
     if not os.path.exists(SESSIONS_DIR):
         os.makedirs(SESSIONS_DIR)
 
+# instagrapi session records: append-only journal with periodic compaction
+# (legacy instagram_sessions.json is imported once on first start)
+instagram_session_journal = JournalSessionStore(
+    os.path.join(SESSIONS_DIR, "instagram_sessions"),
+    compact_after=int(os.getenv('SESSION_JOURNAL_COMPACT_AFTER', '1000')),
+    legacy_json=INSTAGRAM_SESSIONS_FILE
+)
+
+# Durable queue for publish/transcode jobs (requests sent with Prefer: respond-async)
+job_queue = create_job_queue(
+    os.getenv('JOB_QUEUE_URL', 'sqlite:///sessions/jobs.db'),
+    visibility_timeout=float(os.getenv('JOB_VISIBILITY_TIMEOUT', '300')),
+    max_attempts=int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+)
+JOB_SPOOL_DIR = os.getenv('JOB_SPOOL_DIR', os.path.join(SESSIONS_DIR, "job_spool"))
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '1'))
+JOB_TRACEPARENT = "_traceparent"  # payload field carrying the enqueuing request's trace
+job_worker_processes = []
+
+def prefers_async(request: Request) -> bool:
+    """
+    True when the client asked for asynchronous processing (Prefer: respond-async);
+    uploads stay synchronous by default for clients that read the published media
+    """
+    preferences = request.headers.get("prefer", "")
+    return any(p.split(";")[0].strip().lower() == "respond-async" for p in preferences.split(","))
+
+async def spool_upload(file: UploadFile) -> str:
+    """Persist an uploaded file where a queued job can still read it after a restart"""
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    extension = os.path.splitext(file.filename or "")[1] or ".mp4"
+    path = os.path.join(JOB_SPOOL_DIR, f"{uuid.uuid4().hex}{extension}")
+    await executors.run("storage", write_file, path, await file.read(), True)
+    return path
+
+async def accept_job(kind: str, payload: dict) -> JSONResponse:
+    """Queue a job and answer 202 Accepted with its status URL"""
+    # The job's trace continues this request's
+    job_id = await executors.run("storage", job_queue.enqueue, kind, {**payload, JOB_TRACEPARENT: traceparent()})
+    logger.info(f"Queued {kind} job {job_id}")
+    start_job_workers()
+    status_url = f"/api/jobs/{job_id}"
+    return JSONResponse({
+        "success": True,
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": status_url
+    }, status_code=202, headers={"Location": status_url, "Preference-Applied": "respond-async"})
+
+def job_status(job: dict) -> dict:
+    """Public view of a job (payload and lease details omitted)"""
+    return {key: job.get(key) for key in (
+        "id", "kind", "state", "attempts", "max_attempts", "result", "error", "created_at", "updated_at"
+    )}
+
 def save_instagram_session(username: str, session_data: dict):
-    """Save Instagram session data to file"""
+    """Save Instagram session data to the session journal"""
     try:
-        ensure_sessions_dir()
-        
-        # Load existing sessions
-        sessions = {}
-        if os.path.exists(INSTAGRAM_SESSIONS_FILE):
-            with open(INSTAGRAM_SESSIONS_FILE, 'r') as f:
-                sessions = json.load(f)
-        
-        # Update with new session
-        sessions[username] = session_data
-        
-        # Save back to file
-        with open(INSTAGRAM_SESSIONS_FILE, 'w') as f:
-            json.dump(sessions, f, indent=2)
-            
+        instagram_session_journal.put("instagram", username, session_data)
         logger.info(f"Saved Instagram session for {username}")
     except Exception as e:
         logger.error(f"Failed to save Instagram session: {e}")
 
 def load_instagram_sessions():
-    """Load Instagram sessions from file"""
+    """Load Instagram sessions from the session journal"""
     try:
-        if not os.path.exists(INSTAGRAM_SESSIONS_FILE):
-            return {}
-            
-        with open(INSTAGRAM_SESSIONS_FILE, 'r') as f:
-            sessions = json.load(f)
-            
-        logger.info(f"Loaded {len(sessions)} Instagram sessions from file")
+        sessions = dict(instagram_session_journal.items("instagram"))
+        logger.info(f"Loaded {len(sessions)} Instagram sessions from journal")
         return sessions
     except Exception as e:
         logger.error(f"Failed to load Instagram sessions: {e}")
         return {}
 
 def remove_instagram_session(username: str):
-    """Remove Instagram session from file"""
+    """Remove Instagram session from the session journal"""
     try:
-        if not os.path.exists(INSTAGRAM_SESSIONS_FILE):
-            return
-            
-        sessions = {}
-        with open(INSTAGRAM_SESSIONS_FILE, 'r') as f:
-            sessions = json.load(f)
-            
-        if username in sessions:
-            del sessions[username]
-            
-            with open(INSTAGRAM_SESSIONS_FILE, 'w') as f:
-                json.dump(sessions, f, indent=2)
-                
+        instagram_session_journal.delete("instagram", username)
         logger.info(f"Removed Instagram session for {username}")
     except Exception as e:
         logger.error(f"Failed to remove Instagram session: {e}")
 
 def save_instagram_graph_session(user_id: str, session_data: dict):
-    """Save Instagram Graph session data to memory only"""
-    # Session is already stored in instagram_graph_sessions dictionary
-    logger.info(f"Session stored in memory for user: {user_id}")
+    """Save Instagram Graph session data to the session store"""
+    # Session is already stored through the instagram_graph_sessions view
+    logger.info(f"Session stored for user: {user_id}")
 
 def load_instagram_graph_sessions():
-    """Load Instagram Graph sessions from memory"""
-    return instagram_graph_sessions
+    """Load Instagram Graph sessions from the session store"""
+    return dict(instagram_graph_sessions.items())
 
 def remove_instagram_graph_session(user_id: str):
-    """Remove Instagram Graph session from memory"""
+    """Remove Instagram Graph session from the session store"""
     if user_id in instagram_graph_sessions:
         del instagram_graph_sessions[user_id]
         logger.info(f"Removed Instagram Graph session for user: {user_id}")
@@ -404,24 +700,183 @@ class TikTokValidateRequest(BaseModel):
     user_id: str
 
 
-@app.post("/api/instagram/login")
-async def login(request: LoginRequest):
+INSTAGRAM_PASSWORD_HASH_ITERATIONS = 100_000
+
+def instagram_password_verifier(password: str, salt: Optional[str] = None) -> dict:
+    """Salted hash of the password, so a stored session is only reused by its owner"""
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), bytes.fromhex(salt), INSTAGRAM_PASSWORD_HASH_ITERATIONS)
+    return {'salt': salt, 'hash': digest.hex()}
+
+def instagram_password_matches(password: str, verifier: Optional[dict]) -> bool:
+    """Check a password against a stored verifier"""
+    if not verifier or not verifier.get('salt') or not verifier.get('hash'):
+        return False
+    candidate = instagram_password_verifier(password, verifier['salt'])['hash']
+    return hmac.compare_digest(candidate, verifier['hash'])
+
+def instagram_client_from_settings(settings: dict) -> "instagrapi.Client":
+    """Rebuild an instagrapi client from get_settings() output (no network)"""
+    cl = instagrapi.Client()
+    cl.set_settings(settings)
+    return cl
+
+def restore_instagram_client(username: str) -> Optional["instagrapi.Client"]:
+    """Rebuild a spilled or pre-restart client from its persisted settings"""
+    session = instagram_session_journal.get("instagram", username)
+    if not session or not session.get('settings'):
+        return None
+    
+    cl = instagram_client_from_settings(session['settings'])
+    logger.info(f"Restored Instagram client for {username} from saved settings")
+    return cl
+
+def save_instagram_client_settings(username: str, settings: dict):
+    """Store a client's latest settings on its saved session (cookies may have rotated)"""
+    def patch(session):
+        if session is None:
+            return None  # Logged out meanwhile
+        session['settings'] = settings
+        return session
+    instagram_session_journal.update("instagram", username, patch)
+
+def spill_instagram_client(username: str, cl: "instagrapi.Client"):
+    """Persist an evicted client's latest settings"""
+    save_instagram_client_settings(username, cl.get_settings())
+
+# Live instagrapi Client objects: bounded LRU, idle clients spill to their
+# saved settings and are restored on demand; pending 2FA clients expire
+instagram_clients = ClientRegistry(
+    max_resident=int(os.getenv('INSTAGRAM_MAX_RESIDENT_CLIENTS', '50')),
+    idle_ttl=float(os.getenv('INSTAGRAM_CLIENT_IDLE_TTL', '1800')),
+    pending_ttl=float(os.getenv('INSTAGRAM_PENDING_2FA_TTL', '600')),
+    spill=spill_instagram_client,
+    restore=restore_instagram_client,
+    sweep_interval=float(os.getenv('INSTAGRAM_CLIENT_SWEEP_INTERVAL', '60'))
+)
+
+@app.on_event("startup")
+async def start_instagram_client_sweep():
+    instagram_clients.start()
+
+@app.on_event("shutdown")
+async def stop_instagram_client_sweep():
+    instagram_clients.stop()
+
+def get_instagram_client(username: str) -> Optional["instagrapi.Client"]:
     """
-    Login to Instagram using instagrapi
+    Get the instagrapi client for a user, lazily restoring it from the
+    persisted client settings after a restart or eviction
+
+    Returns:
+        Client, or None if the user has no live or persisted session
+    """
+    return instagram_clients.get(username)
+
+# instagrapi operations run in worker processes sharded by username
+# (INSTAGRAPI_WORKERS=0 runs them on threads in this process instead)
+INSTAGRAPI_WORKERS = int(os.getenv('INSTAGRAPI_WORKERS', str(min(4, os.cpu_count() or 1))))
+instagrapi_pool = InstagrapiPool(
+    INSTAGRAPI_WORKERS,
+    max_resident_per_worker=int(os.getenv('INSTAGRAM_MAX_RESIDENT_CLIENTS', '50'))
+) if INSTAGRAPI_WORKERS > 0 else None
+
+def call_instagrapi(username: str, op: str, **kwargs):
+    """
+    Run an instagrapi operation for a logged-in account (blocking)
+
+    Args:
+        username: Instagram username
+        op: Operation name (clip_upload, account_info)
+        **kwargs: Operation arguments
+
+    Returns:
+        Operation result as a plain dict
+    """
+    if instagrapi_pool is None:
+        cl = get_instagram_client(username)
+        if cl is None:
+            raise instagrapi_exceptions.LoginRequired("Not logged in")
+        return run_instagrapi_operation(cl, op, **kwargs)
+    
+    session = instagram_session_journal.get("instagram", username)
+    if not session or not session.get('settings'):
+        raise instagrapi_exceptions.LoginRequired("Not logged in")
+    
+    result, settings = instagrapi_pool.call(username, op, session['settings'], **kwargs)
+    if settings != session['settings']:
+        save_instagram_client_settings(username, settings)
+    return result
+
+def drop_instagram_client_settings(username: str):
+    """Forget persisted client settings after Instagram rejected them"""
+    def drop(session):
+        if session is None:
+            return None
+        session.pop('settings', None)
+        return session
+    try:
+        instagram_session_journal.update("instagram", username, drop)
+    except Exception as e:
+        logger.error(f"Failed to drop Instagram client settings for {username}: {e}")
+
+def resume_instagram_client(username: str, password: str) -> Optional["instagrapi.Client"]:
+    """
+    Reconnect with the persisted client settings instead of a full login
+
+    The saved cookies are only reused when the password matches the one they
+    were created with, and are checked with one cheap timeline request.
+
+    Returns:
+        Logged-in Client, or None if a full login is needed
     """
+    session = instagram_session_journal.get("instagram", username)
+    if not session or not session.get('settings'):
+        return None
+    if not instagram_password_matches(password, session.get('password_verifier')):
+        return None
+    
+    cl = instagram_client_from_settings(session['settings'])
+    try:
+        cl.get_timeline_feed()
+    except instagrapi_exceptions.LoginRequired:
+        logger.info("Saved Instagram session for %s expired, falling back to full login", username)
+        return None
+    except Exception as e:
+        logger.warning("Saved Instagram session check failed for %s: %s", username, e)
+        return None
+    
+    logger.info("Resumed saved Instagram session for %s", username)
+    return cl
+
+
+def perform_instagram_login(request: LoginRequest):
+    """Login to Instagram using instagrapi (blocking - runs on the instagram executor)"""
     try:
-        logger.info(f"Instagram login attempt for user: {request.username}, has_verification_code: {bool(request.verification_code)}")
+        logger.info("Instagram login attempt for user: %s, has_verification_code: %s", request.username, bool(request.verification_code))
         
+        cl = None
+        pending_client = instagram_clients.get_pending(request.username) if request.verification_code else None
+        if not request.verification_code:
+            # Reuse the saved client settings when they are still accepted
+            cl = resume_instagram_client(request.username, request.password)
+        
+        if cl is not None:
+            logger.info("Skipped full login for user: %s", request.username)
         # Check if we have an existing client session for 2FA
-        if request.verification_code and request.username in active_sessions:
+        elif pending_client is not None:
             # Use existing client for 2FA completion
-            logger.info(f"Using existing client for 2FA completion for user: {request.username}")
-            cl = active_sessions[request.username]
+            logger.info("Using existing client for 2FA completion for user: %s", request.username)
+            cl = pending_client
             # Complete the 2FA login
             cl.login(request.username, request.password, verification_code=request.verification_code)
         else:
-            # Create new client for initial login
-            cl = Client()
+            # Create new client for initial login, keeping the saved device
+            # identity (if any) so Instagram sees a known device
+            cl = instagrapi.Client()
+            saved = instagram_session_journal.get("instagram", request.username)
+            if saved and saved.get('settings', {}).get('uuids'):
+                cl.set_uuids(saved['settings']['uuids'])
             
             # Attempt login
             if request.verification_code:
@@ -434,8 +889,8 @@ async def login(request: LoginRequest):
                 except Exception as e:
                     # If this is a 2FA challenge, store the client and re-raise
                     if "Two-factor authentication" in str(e) or "verification_code" in str(e) or "challenge_required" in str(e):
-                        logger.info(f"2FA challenge detected for user: {request.username}, storing client")
-                        active_sessions[request.username] = cl
+                        logger.info("2FA challenge detected for user: %s, storing client", request.username)
+                        instagram_clients.put_pending(request.username, cl)
                         raise e
                     else:
                         raise e
@@ -463,15 +918,25 @@ async def login(request: LoginRequest):
             'account_type': account_type,
         }
         
-        # Store client instance (in production, use proper session management)
-        active_sessions[request.username] = cl
-        
-        # Save session data to file for persistence
-        save_instagram_session(request.username, session_data)
+        # Store client instance (replaces any pending 2FA client); with the
+        # process pool the workers own live clients, built from the saved settings
+        if instagrapi_pool is None:
+            instagram_clients.put(request.username, cl)
+        else:
+            instagram_clients.remove(request.username)
+        profile_cache.put("instagram", request.username, instagram_profile_from_account_info(account_info, request.username))
+        
+        # Persist client settings (cookies, device) so reconnects skip the full login
+        save_instagram_session(request.username, {
+            **session_data,
+            'settings': cl.get_settings(),
+            'password_verifier': instagram_password_verifier(request.password)
+        })
         
         # Log Instagram connection event
         social_logger.info(f"INSTAGRAM_CONNECTED - User: {username} | ID: {user_id} | Type: {account_type} | Followers: {follower_count}")
-        logger.info(f"Successfully logged in user: {request.username}")
+        publish_events.record("instagram", request.username, CONNECTED, user_id=user_id, account_type=account_type)
+        logger.info("Successfully logged in user: %s", request.username)
         
         return JSONResponse({
             "success": True,
@@ -479,22 +944,22 @@ async def login(request: LoginRequest):
             "message": "Successfully connected to Instagram"
         })
         
-    except BadPassword:
+    except instagrapi_exceptions.BadPassword:
         logger.error("Invalid password")
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
     except Exception as e:
-        logger.error(f"Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         error_msg = str(e)
         
         # Check for 2FA requirement
         if "Two-factor authentication" in error_msg or "verification_code" in error_msg or "challenge_required" in error_msg:
-            logger.info(f"2FA required for user: {request.username}, error: {error_msg}")
+            logger.info("2FA required for user: %s, error: %s", request.username, error_msg)
             # Store the client for 2FA completion (if not already stored)
-            if request.username not in active_sessions:
-                cl = Client()
-                active_sessions[request.username] = cl
-                logger.info(f"Stored new client for 2FA completion for user: {request.username}")
+            if not instagram_clients.has_pending(request.username):
+                cl = instagrapi.Client()
+                instagram_clients.put_pending(request.username, cl)
+                logger.info("Stored new client for 2FA completion for user: %s", request.username)
                 
             raise HTTPException(
                 status_code=202,  # Accepted - pending 2FA verification
@@ -508,78 +973,108 @@ async def login(request: LoginRequest):
             raise HTTPException(status_code=404, detail="User not found")
         
         # Clean up failed session
-        if request.username in active_sessions:
-            del active_sessions[request.username]
+        instagram_clients.remove(request.username)
             
         raise HTTPException(status_code=500, detail=f"Login failed: {error_msg}")
 
 
+@app.post("/api/instagram/login")
+async def login(request: LoginRequest):
+    """
+    Login to Instagram using instagrapi
+    """
+    return await executors.run("instagram", perform_instagram_login, request)
+
+
+def publish_instagram_reel(username: str, path: str, caption: str = "", share_to_feed: bool = True) -> dict:
+    """Upload a local video as a Reel with instagrapi (blocking - also run by job workers)"""
+    social_logger.info(f"INSTAGRAM_UPLOAD_START - User: {username} | File: {os.path.basename(path)} | Caption: {caption[:50]}...")
+    publish_events.record("instagram", username, UPLOAD_START, file=os.path.basename(path), caption=caption[:100])
+    try:
+        with span("instagram_upload"):
+            result = call_instagrapi(username, "clip_upload", path=path, caption=caption)
+    except instagrapi_exceptions.LoginRequired as e:
+        # Saved cookies are no longer accepted - next login must be a full one
+        social_logger.error(f"INSTAGRAM_UPLOAD_FAILED - Username: {username} | File: {os.path.basename(path)} | Error: Login required ({e})")
+        publish_events.record("instagram", username, UPLOAD_FAILED, file=os.path.basename(path), error=f"Login required: {e}")
+        instagram_clients.remove(username)
+        drop_instagram_client_settings(username)
+        raise HTTPException(status_code=401, detail="Session expired. Please login again.")
+    except Exception as e:
+        social_logger.error(f"INSTAGRAM_UPLOAD_FAILED - Username: {username} | File: {os.path.basename(path)} | Error: {str(e)}")
+        publish_events.record("instagram", username, UPLOAD_FAILED, file=os.path.basename(path), error=str(e))
+        raise
+    
+    # Handle both dict and object responses
+    if isinstance(result, dict):
+        media_id = result.get('pk')
+        code = result.get('code', 'unknown')
+    else:
+        # If it's an object, access attributes directly
+        media_id = getattr(result, 'pk', getattr(result, 'id', None))
+        code = getattr(result, 'code', 'unknown')
+    
+    # Media count changed - drop cached profile
+    profile_cache.invalidate("instagram", username)
+    
+    # Log successful upload
+    social_logger.info(f"INSTAGRAM_UPLOAD_SUCCESS - User: {username} | Media ID: {media_id} | Code: {code} | Share to Feed: {share_to_feed}")
+    publish_events.record("instagram", username, UPLOAD_SUCCESS, media_id, code=code, share_to_feed=share_to_feed)
+    logger.info("Successfully uploaded reel: %s", code)
+    
+    return {
+        "media_id": media_id,
+        "code": code,
+        "share_to_feed": share_to_feed
+    }
+
 @app.post("/api/instagram/upload-reel")
-async def upload_reel(file: UploadFile = File(...), caption: str = Form(""), share_to_feed: bool = Form(True)):
+@idempotent
+async def upload_reel(request: Request, file: UploadFile = File(...), caption: str = Form(""), share_to_feed: bool = Form(True)):
     """
     Upload a Reel video to Instagram
+    
+    Send ``Prefer: respond-async`` to queue the upload and get 202 with a job id.
     """
     temp_path = None  # Initialize temp_path
     try:
         # In a real implementation, you'd get the username from the session
         # For now, we'll use the first active session
-        if not active_sessions:
+        username = next(iter(instagram_clients.accounts()), None) or next(iter(instagram_session_journal.accounts("instagram")), None)
+        if username is None:
             raise HTTPException(status_code=401, detail="Not logged in")
         
-        username = list(active_sessions.keys())[0]
-        cl = active_sessions[username]
+        if prefers_async(request):
+            return await accept_job("instagram_reel", {
+                "username": username,
+                "path": await spool_upload(file),
+                "caption": caption,
+                "share_to_feed": share_to_feed
+            })
         
         # Save uploaded file temporarily
         temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+        content = await file.read()
+        await executors.run("storage", write_file, temp_path, content)
         
         # Upload video as reel
-        social_logger.info(f"INSTAGRAM_UPLOAD_START - User: {username} | File: {file.filename} | Caption: {caption[:50]}...")
-        result = cl.clip_upload(
-            path=temp_path,
-            caption=caption
-        )
-        
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-        
-        # Handle both dict and object responses
-        if isinstance(result, dict):
-            media_id = result.get('pk')
-            code = result.get('code', 'unknown')
-        else:
-            # If it's an object, access attributes directly
-            media_id = getattr(result, 'pk', getattr(result, 'id', None))
-            code = getattr(result, 'code', 'unknown')
-        
-        # Log successful upload
-        social_logger.info(f"INSTAGRAM_UPLOAD_SUCCESS - User: {username} | Media ID: {media_id} | Code: {code} | Share to Feed: {share_to_feed}")
-        logger.info(f"Successfully uploaded reel: {code}")
+        data = await executors.run("instagram", publish_instagram_reel, username, temp_path, caption, share_to_feed)
         
         return JSONResponse({
             "success": True,
-            "data": {
-                "media_id": media_id,
-                "code": code,
-                "share_to_feed": share_to_feed
-            },
+            "data": data,
             "message": "Reel uploaded successfully"
         })
         
-    except LoginRequired:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-        raise HTTPException(status_code=401, detail="Session expired. Please login again.")
-    
+    except HTTPException:
+        raise
     except Exception as e:
-        social_logger.error(f"INSTAGRAM_UPLOAD_FAILED - Username: {username} | File: {file.filename} | Error: {str(e)}")
-        logger.error(f"Upload error: {str(e)}")
+        logger.error("Upload error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        # Clean up temp file
         if temp_path and os.path.exists(temp_path):
             os.remove(temp_path)
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
 @app.post("/api/instagram/logout")
@@ -588,9 +1083,9 @@ async def logout(request: LogoutRequest):
     Logout from Instagram
     """
     try:
-        if request.username in active_sessions:
-            del active_sessions[request.username]
+        if instagram_clients.remove(request.username):
             logger.info(f"Logged out user: {request.username}")
+        profile_cache.invalidate("instagram", request.username)
         
         # Remove session from file
         remove_instagram_session(request.username)
@@ -604,51 +1099,53 @@ async def logout(request: LogoutRequest):
         raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
 
 
+def instagram_profile_from_account_info(account_info, username: str) -> dict:
+    """Normalize instagrapi account_info() output into a profile dict"""
+    # Handle both dict and object responses
+    if isinstance(account_info, dict):
+        return {
+            "username": account_info.get('username'),
+            "full_name": account_info.get('full_name'),
+            "biography": account_info.get('biography'),
+            "follower_count": account_info.get('follower_count'),
+            "following_count": account_info.get('following_count'),
+            "media_count": account_info.get('media_count'),
+            "profile_pic_url": account_info.get('profile_pic_url'),
+        }
+    
+    # If it's an object, access attributes directly
+    # Convert HttpUrl objects to strings
+    profile_pic_url = getattr(account_info, 'profile_pic_url', None)
+    if profile_pic_url is not None:
+        profile_pic_url = str(profile_pic_url)
+    
+    return {
+        "username": getattr(account_info, 'username', None),
+        "full_name": getattr(account_info, 'full_name', None),
+        "biography": getattr(account_info, 'biography', None),
+        "follower_count": getattr(account_info, 'follower_count', 0),
+        "following_count": getattr(account_info, 'following_count', 0),
+        "media_count": getattr(account_info, 'media_count', 0),
+        "profile_pic_url": profile_pic_url,
+    }
+
+
 @app.get("/api/instagram/account-info")
 async def get_account_info(username: str):
     """
-    Get Instagram account information
+    Get Instagram account information (served from the profile cache)
     """
     try:
-        if username not in active_sessions:
-            raise HTTPException(status_code=401, detail="Not logged in")
-        
-        cl = active_sessions[username]
-        account_info = cl.account_info()
+        profile = await executors.run(
+            "instagram", profile_cache.get_or_load,
+            "instagram", username,
+            lambda: instagram_profile_from_account_info(call_instagrapi(username, "account_info"), username)
+        )
         
-        # Handle both dict and object responses
-        if isinstance(account_info, dict):
-            return JSONResponse({
-                "success": True,
-                "data": {
-                    "username": account_info.get('username'),
-                    "full_name": account_info.get('full_name'),
-                    "biography": account_info.get('biography'),
-                    "follower_count": account_info.get('follower_count'),
-                    "following_count": account_info.get('following_count'),
-                    "media_count": account_info.get('media_count'),
-                    "profile_pic_url": account_info.get('profile_pic_url'),
-                }
-            })
-        else:
-            # If it's an object, access attributes directly
-            # Convert HttpUrl objects to strings
-            profile_pic_url = getattr(account_info, 'profile_pic_url', None)
-            if profile_pic_url is not None:
-                profile_pic_url = str(profile_pic_url)
-            
-            return JSONResponse({
-                "success": True,
-                "data": {
-                    "username": getattr(account_info, 'username', None),
-                    "full_name": getattr(account_info, 'full_name', None),
-                    "biography": getattr(account_info, 'biography', None),
-                    "follower_count": getattr(account_info, 'follower_count', 0),
-                    "following_count": getattr(account_info, 'following_count', 0),
-                    "media_count": getattr(account_info, 'media_count', 0),
-                    "profile_pic_url": profile_pic_url,
-                }
-            })
+        return JSONResponse({
+            "success": True,
+            "data": profile
+        })
     except Exception as e:
         logger.error(f"Get account info error: {str(e)}")
         # Return a simpler response if there's an error
@@ -677,10 +1174,10 @@ async def get_instagram_graph_auth_url():
     Uses Instagram Graph API for posting capabilities (Reels, Stories, Posts)
     """
     try:
-        if not instagram_graph_api.validate_credentials():
+        if not services.instagram_graph.validate_credentials():
             raise HTTPException(status_code=500, detail="Instagram Graph API credentials not configured")
         
-        auth_url, state = instagram_graph_api.get_auth_url()
+        auth_url, state = services.instagram_graph.get_auth_url()
         
         return JSONResponse({
             "success": True,
@@ -707,7 +1204,7 @@ async def instagram_meta_oauth_callback(code: str = None, state: str = None, err
         if error:
             error_msg = error_description or error
             social_logger.error(f"INSTAGRAM_META_OAUTH_ERROR - Error: {error_msg}")
-            logger.error(f"Instagram Meta OAuth error: {error_msg}")
+            logger.error("Instagram Meta OAuth error: %s", error_msg)
             return RedirectResponse(url=f"{frontend_url}/?instagram_error={error}")
         
         if not code:
@@ -727,7 +1224,7 @@ async def instagram_meta_oauth_callback(code: str = None, state: str = None, err
         
     except Exception as e:
         social_logger.error(f"INSTAGRAM_META_OAUTH_CALLBACK_ERROR - Error: {str(e)}")
-        logger.error(f"Instagram Meta OAuth callback error: {str(e)}")
+        logger.error("Instagram Meta OAuth callback error: %s", e)
         frontend_url = os.getenv('FRONTEND_URL')
         if not frontend_url:
             raise ValueError('FRONTEND_URL environment variable is required')
@@ -736,11 +1233,8 @@ async def instagram_meta_oauth_callback(code: str = None, state: str = None, err
 
 # Old duplicate endpoint removed - using the one at line 764 instead
 
-@app.get("/api/instagram/basic/user-info")
-async def get_instagram_basic_user_info(request: Request):
-    """
-    Get Instagram user information
-    """
+def perform_instagram_basic_user_info(request: Request):
+    """Get Instagram user information (blocking - runs on the instagram executor)"""
     try:
         user_id = request.query_params.get('user_id')
         if not user_id:
@@ -753,7 +1247,7 @@ async def get_instagram_basic_user_info(request: Request):
         access_token = session['access_token']
         ig_user_id = session['ig_user_id']
         
-        user_info = instagram_graph_api.get_instagram_user_info(ig_user_id, access_token)
+        user_info = services.instagram_graph.get_instagram_user_info(ig_user_id, access_token)
         
         return JSONResponse({
             "success": True,
@@ -767,6 +1261,14 @@ async def get_instagram_basic_user_info(request: Request):
         raise HTTPException(status_code=500, detail=f"Failed to get user info: {str(e)}")
 
 
+@app.get("/api/instagram/basic/user-info")
+async def get_instagram_basic_user_info(request: Request):
+    """
+    Get Instagram user information
+    """
+    return await executors.run("instagram", perform_instagram_basic_user_info, request)
+
+
 @app.get("/api/instagram/basic/media")
 async def get_instagram_basic_media(request: Request):
     """
@@ -802,35 +1304,88 @@ async def get_instagram_basic_media(request: Request):
 
 
 
-@app.post("/api/instagram/graph/upload-story")
-async def instagram_graph_upload_story(file: UploadFile = File(...), caption: str = Form(""), user_id: str = Form(...)):
+def publish_instagram_graph_media(user_id: str, path: str, caption: str = "", media_type: str = "reel") -> dict:
     """
-    Upload and publish Instagram Story using Graph API
+    Publish a local video as a Reel or Story through the Graph API
+    (blocking - also run by job workers)
     """
+    if user_id not in instagram_graph_sessions:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    
+    session = instagram_graph_sessions[user_id]
+    access_token = session['access_token']
+    publish = services.instagram_graph.upload_and_publish_story if media_type == "story" else services.instagram_graph.upload_and_publish_reel
+    
+    # A retry of the same media skips the storage upload / container already done
+    saga = publish_sagas.saga(
+        saga_id("instagram_graph", user_id, media_type, file_digest(path), caption),
+        f"instagram_graph {media_type} for {user_id}"
+    )
+    social_logger.info(f"INSTAGRAM_GRAPH_UPLOAD_START - User: {user_id} | File: {os.path.basename(path)} | Type: {media_type}")
+    publish_events.record("instagram_graph", user_id, UPLOAD_START, file=os.path.basename(path), media_type=media_type,
+                          caption=caption[:100])
     try:
-        if user_id not in instagram_graph_sessions:
-            raise HTTPException(status_code=401, detail="User not authenticated")
-            
-        session = instagram_graph_sessions[user_id]
-        ig_user_id = session['ig_user_id']
-        access_token = session['access_token']
-        
-        # Upload and publish story
-        result = instagram_graph_api.upload_and_publish_story(
-            ig_user_id=ig_user_id,
-            access_token=access_token,
-            video_file=file,
-            caption=caption
-        )
-        
-        logger.info(f"Instagram Story published successfully for user: {session['username']}")
-        
-        return JSONResponse({
-            "success": True,
-            "data": result,
-            "message": "Story published successfully"
+        with open(path, "rb") as video_file:
+            result = publish(
+                ig_user_id=session['ig_user_id'],
+                access_token=access_token,
+                video_file=video_file,
+                caption=caption,
+                saga=saga
+            )
+    except Exception as e:
+        social_logger.error(f"INSTAGRAM_GRAPH_UPLOAD_FAILED - User: {user_id} | File: {os.path.basename(path)} | Error: {str(e)}")
+        publish_events.record("instagram_graph", user_id, UPLOAD_FAILED, file=os.path.basename(path), media_type=media_type,
+                              error=str(e))
+        raise
+    saga.finish()
+    social_logger.info(f"INSTAGRAM_GRAPH_UPLOAD_SUCCESS - User: {user_id} | Media ID: {result['media_id']} | Type: {media_type}")
+    publish_events.record("instagram_graph", user_id, UPLOAD_SUCCESS, result['media_id'], media_type=media_type)
+    
+    profile_cache.invalidate("instagram_graph", user_id)
+    token_states.record_valid("instagram_graph", access_token)
+    logger.info("Instagram %s published successfully for user: %s", media_type.title(), session['username'])
+    return result
+
+async def instagram_graph_upload(request: Request, file: UploadFile, caption: str, user_id: str, media_type: str):
+    """Queue (Prefer: respond-async) or run a Graph API Reel/Story upload"""
+    if user_id not in instagram_graph_sessions:
+        raise HTTPException(status_code=401, detail="User not authenticated")
+    
+    if prefers_async(request):
+        return await accept_job("instagram_graph_media", {
+            "user_id": user_id,
+            "path": await spool_upload(file),
+            "caption": caption,
+            "media_type": media_type
         })
-        
+    
+    temp_path = f"/tmp/graph_{media_type}_{uuid.uuid4().hex}.mp4"
+    try:
+        await executors.run("storage", write_file, temp_path, await file.read())
+        result = await executors.run("instagram", publish_instagram_graph_media, user_id, temp_path, caption, media_type)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    
+    return JSONResponse({
+        "success": True,
+        "data": result,
+        "message": f"{media_type.title()} published successfully"
+    })
+
+@app.post("/api/instagram/graph/upload-story")
+@idempotent
+async def instagram_graph_upload_story(request: Request, file: UploadFile = File(...), caption: str = Form(""), user_id: str = Form(...)):
+    """
+    Upload and publish Instagram Story using Graph API
+    
+    Send ``Prefer: respond-async`` to queue the upload and get 202 with a job id.
+    """
+    try:
+        return await instagram_graph_upload(request, file, caption, user_id, "story")
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Instagram Graph story upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Story upload failed: {str(e)}")
@@ -863,10 +1418,10 @@ async def instagram_graph_auth_url():
     Get Instagram Graph API authorization URL
     """
     try:
-        if not instagram_graph_api.validate_credentials():
+        if not services.instagram_graph.validate_credentials():
             raise HTTPException(status_code=500, detail="Instagram Graph API credentials not configured")
             
-        auth_url = instagram_graph_api.get_auth_url()
+        auth_url = services.instagram_graph.get_auth_url()
         
         return JSONResponse({
             "success": True,
@@ -877,67 +1432,65 @@ async def instagram_graph_auth_url():
         raise HTTPException(status_code=500, detail=f"Failed to generate auth URL: {str(e)}")
 
 
-@app.post("/api/instagram/graph/login")
-async def instagram_graph_login(request: dict):
-    """
-    Complete Instagram Graph API OAuth flow
-    """
+def perform_instagram_graph_login(request: dict):
+    """Complete Instagram Graph API OAuth flow (blocking - runs on the instagram executor)"""
     try:
         code = request.get('code')
         if not code:
             raise HTTPException(status_code=400, detail="Authorization code required")
             
-        logger.info(f"Instagram Graph login attempt with code: {code[:10]}...")
+        logger.info("Instagram Graph login attempt")
         
         # Step 1: Exchange code for access token
         try:
-            token_data = instagram_graph_api.exchange_code_for_token(code)
+            token_data = services.instagram_graph.exchange_code_for_token(code)
             access_token = token_data['access_token']
-            logger.info(f"Successfully exchanged code for access token")
-            logger.info(f"Token data: {token_data}")
+            logger.info("Successfully exchanged code for access token")
+            logger.info("Token data: %s", token_data)
             
             # Check if we have granted_scopes in the response
             if 'granted_scopes' in token_data:
-                logger.info(f"Granted scopes: {token_data['granted_scopes']}")
+                logger.info("Granted scopes: %s", token_data['granted_scopes'])
             else:
                 logger.warning("No granted_scopes in token response")
                 
         except Exception as e:
-            logger.error(f"Token exchange failed: {str(e)}")
+            logger.error("Token exchange failed: %s", e)
             raise HTTPException(status_code=400, detail=f"Token exchange failed: {str(e)}")
         
         # Step 2: Get long-lived token
         try:
-            long_lived_token = instagram_graph_api.get_long_lived_token(access_token)
-            logger.info(f"Successfully got long-lived token")
+            long_lived = services.instagram_graph.exchange_long_lived_token(access_token)
+            long_lived_token = long_lived['access_token']
+            logger.info("Successfully got long-lived token")
         except Exception as e:
-            logger.error(f"Long-lived token failed: {str(e)}")
+            logger.error("Long-lived token failed: %s", e)
             raise HTTPException(status_code=400, detail=f"Long-lived token failed: {str(e)}")
         
         # Step 3: Get user's Facebook pages
         # Try with the original access token first, then long-lived token
         try:
-            logger.info(f"Trying to get pages with original access token: {access_token[:20]}...")
-            pages_data = instagram_graph_api.get_user_pages(access_token)
-            logger.info(f"Got pages data with original token: {pages_data}")
+            logger.info("Trying to get pages with the original access token")
+            pages_data = services.instagram_graph.get_user_pages(access_token)
+            logger.info("Got pages data with original token: %s", pages_data)
         except Exception as e:
-            logger.warning(f"Failed to get pages with original token: {str(e)}")
-            logger.info(f"Trying with long-lived token: {long_lived_token[:20]}...")
-            pages_data = instagram_graph_api.get_user_pages(long_lived_token)
-            logger.info(f"Got pages data: {pages_data}")
-            logger.info(f"Pages data type: {type(pages_data)}")
-            logger.info(f"Pages data keys: {pages_data.keys() if isinstance(pages_data, dict) else 'Not a dict'}")
+            logger.warning("Failed to get pages with original token: %s", e)
+            logger.info("Trying with the long-lived token")
+            pages_data = services.instagram_graph.get_user_pages(long_lived_token)
+            logger.info("Got pages data: %s", pages_data)
+            logger.info("Pages data type: %s", type(pages_data))
+            logger.info("Pages data keys: %s", pages_data.keys() if isinstance(pages_data, dict) else 'Not a dict')
             if isinstance(pages_data, dict) and 'data' in pages_data:
-                logger.info(f"Pages data array length: {len(pages_data['data']) if pages_data['data'] else 0}")
+                logger.info("Pages data array length: %s", len(pages_data['data']) if pages_data['data'] else 0)
                 if pages_data['data']:
-                    logger.info(f"First page data: {pages_data['data'][0]}")
+                    logger.info("First page data: %s", pages_data['data'][0])
         except Exception as e:
-            logger.error(f"Get pages failed: {str(e)}")
+            logger.error("Get pages failed: %s", e)
             raise HTTPException(status_code=400, detail=f"Get pages failed: {str(e)}")
         
         if not pages_data.get('data'):
             logger.error("No Facebook pages found for user")
-            logger.error(f"Full pages response: {pages_data}")
+            logger.error("Full pages response: %s", pages_data)
             
             # Check if it's an empty array vs no data key
             if pages_data.get('data') == []:
@@ -992,31 +1545,32 @@ async def instagram_graph_login(request: dict):
         # First, try to get Instagram account directly from user with original token
         try:
             logger.info("Trying to get Instagram account directly from user with original token...")
-            user_ig_data = instagram_graph_api.get_user_instagram_account(access_token)
+            user_ig_data = services.instagram_graph.get_user_instagram_account(access_token)
             if user_ig_data and user_ig_data.get('instagram_business_account'):
                 ig_user_id = user_ig_data['instagram_business_account']['id']
-                logger.info(f"Found Instagram account directly: {ig_user_id}")
+                logger.info("Found Instagram account directly: %s", ig_user_id)
             else:
                 logger.info("No direct Instagram account found with original token, trying long-lived token...")
                 try:
-                    user_ig_data = instagram_graph_api.get_user_instagram_account(long_lived_token)
+                    user_ig_data = services.instagram_graph.get_user_instagram_account(long_lived_token)
                     if user_ig_data and user_ig_data.get('instagram_business_account'):
                         ig_user_id = user_ig_data['instagram_business_account']['id']
-                        logger.info(f"Found Instagram account with long-lived token: {ig_user_id}")
+                        logger.info("Found Instagram account with long-lived token: %s", ig_user_id)
                     else:
                         logger.info("No direct Instagram account found, checking pages...")
                 except Exception as e2:
-                    logger.warning(f"Failed to get Instagram account with long-lived token: {str(e2)}")
+                    logger.warning("Failed to get Instagram account with long-lived token: %s", e2)
         except Exception as e:
-            logger.warning(f"Failed to get direct Instagram account: {str(e)}")
+            logger.warning("Failed to get direct Instagram account: %s", e)
         
         # If no direct Instagram account, check pages
         if not ig_user_id:
             for page in pages_data['data']:
                 try:
-                    ig_data = instagram_graph_api.get_instagram_account(page['id'], page['access_token'])
-                    if ig_data.get('instagram_business_account'):
-                        ig_user_id = ig_data['instagram_business_account']['id']
+                    # Returns the page's instagram_business_account node itself
+                    ig_data = services.instagram_graph.get_instagram_account(page['id'], page['access_token'])
+                    if ig_data.get('id'):
+                        ig_user_id = ig_data['id']
                         page_id = page['id']
                         page_access_token = page['access_token']
                         break
@@ -1043,7 +1597,7 @@ async def instagram_graph_login(request: dict):
         # Step 4: Get Instagram user info
         # Use page_access_token if available, otherwise fall back to long-lived token
         user_info_token = page_access_token or long_lived_token
-        ig_user_info = instagram_graph_api.get_instagram_user_info(ig_user_id, user_info_token)
+        ig_user_info = services.instagram_graph.get_instagram_user_info(ig_user_id, user_info_token)
         
         # Store session in memory and on disk
         session_data = {
@@ -1053,16 +1607,31 @@ async def instagram_graph_login(request: dict):
             'page_id': page_id,
             'followers_count': ig_user_info.get('followers_count', 0),
             'media_count': ig_user_info.get('media_count', 0),
-            'account_type': 'BUSINESS'  # Graph API only works with business accounts
+            'account_type': 'BUSINESS',  # Graph API only works with business accounts
+            # Long-lived user token - renewed in the background, and used to
+            # re-derive a non-expiring page token
+            'user_access_token': long_lived_token,
+            'user_token_expires_at': time.time() + long_lived['expires_in'] if long_lived.get('expires_in') else None
         }
         instagram_graph_sessions[ig_user_id] = session_data
         save_instagram_graph_session(ig_user_id, session_data)
+        profile_cache.put("instagram_graph", ig_user_id, ig_user_info)
+        social_logger.info(f"INSTAGRAM_GRAPH_CONNECTED - User: {ig_user_info.get('username')} | ID: {ig_user_id} | Page: {page_id}")
+        publish_events.record("instagram_graph", ig_user_id, CONNECTED, username=ig_user_info.get('username'), page_id=page_id)
+        # Run once right away: the page token above may come from the short-lived user token
+        token_refresher.schedule("instagram_graph", ig_user_id, time.time())
+        token_states.record_valid("instagram_graph", page_access_token, scopes=token_data.get('granted_scopes'), details={
+            "success": True,
+            "is_valid": True,
+            "user": {
+                "id": ig_user_id,
+                "username": ig_user_info.get('username'),
+            }
+        })
         
         # Debug logging
-        logger.info(f"Instagram Graph login successful for user: {ig_user_info.get('username')}")
-        logger.info(f"[DEBUG] Stored session for user_id: {ig_user_id}")
-        logger.info(f"[DEBUG] Total sessions now: {len(instagram_graph_sessions)}")
-        logger.info(f"[DEBUG] Session keys: {list(instagram_graph_sessions.keys())}")
+        logger.info("Instagram Graph login successful for user: %s", ig_user_info.get('username'))
+        logger.info("[DEBUG] Stored session for user_id: %s", ig_user_id)
         
         # Return session and auth info for debugging
         return JSONResponse({
@@ -1080,7 +1649,6 @@ async def instagram_graph_login(request: dict):
                 "username": ig_user_info.get('username'),
                 "page_id": page_id,
                 "has_access_token": bool(page_access_token),
-                "access_token_preview": f"{page_access_token[:20]}..." if page_access_token else None,
                 "account_type": "BUSINESS",
                 "followers": ig_user_info.get('followers_count', 0),
                 "media_count": ig_user_info.get('media_count', 0)
@@ -1095,10 +1663,18 @@ async def instagram_graph_login(request: dict):
         })
         
     except Exception as e:
-        logger.error(f"Instagram Graph login error: {str(e)}")
+        logger.error("Instagram Graph login error: %s", e)
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 
+@app.post("/api/instagram/graph/login")
+async def instagram_graph_login(request: dict):
+    """
+    Complete Instagram Graph API OAuth flow
+    """
+    return await executors.run("instagram", perform_instagram_graph_login, request)
+
+
 @app.post("/api/instagram/graph/logout")
 async def instagram_graph_logout(request: dict):
     """
@@ -1107,8 +1683,11 @@ async def instagram_graph_logout(request: dict):
     try:
         user_id = request.get('user_id')
         if user_id and user_id in instagram_graph_sessions:
+            token_states.forget(instagram_graph_sessions[user_id].get('access_token'))
             del instagram_graph_sessions[user_id]
             remove_instagram_graph_session(user_id)
+            token_refresher.cancel("instagram_graph", user_id)
+            profile_cache.invalidate("instagram_graph", user_id)
             logger.info(f"Instagram Graph logout successful for user: {user_id}")
             
         return JSONResponse({
@@ -1121,34 +1700,17 @@ async def instagram_graph_logout(request: dict):
 
 
 @app.post("/api/instagram/graph/upload-reel")
-async def instagram_graph_upload_reel(file: UploadFile = File(...), caption: str = Form(""), user_id: str = Form(...)):
+@idempotent
+async def instagram_graph_upload_reel(request: Request, file: UploadFile = File(...), caption: str = Form(""), user_id: str = Form(...)):
     """
     Upload and publish Instagram Reel using Graph API
+    
+    Send ``Prefer: respond-async`` to queue the upload and get 202 with a job id.
     """
     try:
-        if user_id not in instagram_graph_sessions:
-            raise HTTPException(status_code=401, detail="User not authenticated")
-            
-        session = instagram_graph_sessions[user_id]
-        ig_user_id = session['ig_user_id']
-        access_token = session['access_token']
-        
-        # Upload and publish reel
-        result = instagram_graph_api.upload_and_publish_reel(
-            ig_user_id=ig_user_id,
-            access_token=access_token,
-            video_file=file,
-            caption=caption
-        )
-        
-        logger.info(f"Instagram Reel published successfully for user: {session['username']}")
-        
-        return JSONResponse({
-            "success": True,
-            "data": result,
-            "message": "Reel published successfully"
-        })
-        
+        return await instagram_graph_upload(request, file, caption, user_id, "reel")
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Instagram Graph upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
@@ -1160,7 +1722,7 @@ async def get_youtube_auth_url():
     Get YouTube OAuth authorization URL
     """
     try:
-        flow = Flow.from_client_config(
+        flow = google_oauth_flow.Flow.from_client_config(
             {
                 "web": {
                     "client_id": YOUTUBE_CLIENT_ID,
@@ -1205,7 +1767,7 @@ async def youtube_oauth_callback(code: str = None, state: str = None, error: str
         
         if error:
             social_logger.error(f"YOUTUBE_OAUTH_ERROR - Error: {error}")
-            logger.error(f"YouTube OAuth error: {error}")
+            logger.error("YouTube OAuth error: %s", error)
             # Redirect to frontend with error
             return RedirectResponse(url=f"{frontend_url}/?youtube_error={error}")
         
@@ -1227,7 +1789,7 @@ async def youtube_oauth_callback(code: str = None, state: str = None, error: str
         
     except Exception as e:
         social_logger.error(f"YOUTUBE_OAUTH_CALLBACK_ERROR - Error: {str(e)}")
-        logger.error(f"YouTube OAuth callback error: {str(e)}")
+        logger.error("YouTube OAuth callback error: %s", e)
         # Redirect to frontend with error
         frontend_url = os.getenv('FRONTEND_URL')
         if not frontend_url:
@@ -1235,16 +1797,113 @@ async def youtube_oauth_callback(code: str = None, state: str = None, error: str
         return RedirectResponse(url=f"{frontend_url}/?youtube_error=callback_failed")
 
 
-@app.post("/api/youtube/login")
-async def youtube_login(request: YouTubeAuthRequest):
+def youtube_credentials_from_dict(creds_dict: dict) -> "google_credentials.Credentials":
+    """Recreate a google Credentials object from stored session data"""
+    credentials = google_credentials.Credentials(
+        token=creds_dict.get('token'),
+        refresh_token=creds_dict.get('refresh_token'),
+        token_uri=creds_dict.get('token_uri'),
+        client_id=creds_dict.get('client_id'),
+        client_secret=creds_dict.get('client_secret'),
+        scopes=creds_dict.get('scopes')
+    )
+    if creds_dict.get('expiry'):
+        # google-auth expects a naive UTC datetime
+        credentials.expiry = datetime.fromisoformat(creds_dict['expiry'])
+    return credentials
+
+
+def youtube_credentials_to_dict(credentials: "google_credentials.Credentials") -> dict:
+    """Serialize google Credentials into session data"""
+    return {
+        'token': credentials.token,
+        'refresh_token': credentials.refresh_token,
+        'token_uri': credentials.token_uri,
+        'client_id': credentials.client_id,
+        'client_secret': credentials.client_secret,
+        'scopes': credentials.scopes,
+        'expiry': credentials.expiry.isoformat() if credentials.expiry else None
+    }
+
+
+def youtube_token_expires_at(credentials: "google_credentials.Credentials") -> Optional[float]:
+    """Unix expiry time of google credentials, if known"""
+    if not credentials.expiry:
+        return None
+    return credentials.expiry.replace(tzinfo=timezone.utc).timestamp()
+
+
+def refresh_youtube_credentials(user_id: str, credentials: "google_credentials.Credentials") -> "google_credentials.Credentials":
     """
-    Exchange authorization code for YouTube access token
+    Refresh YouTube credentials and store the new token
+    
+    Concurrent refreshes for the same user share a single token request.
     """
+    def refresh():
+        credentials.refresh(google_transport.Request())
+        token_states.record_valid("youtube", credentials.token, scopes=credentials.scopes,
+                                  expires_at=youtube_token_expires_at(credentials))
+        creds_dict = youtube_credentials_to_dict(credentials)
+        youtube_sessions.patch(user_id, {'credentials': creds_dict})
+        token_refresher.schedule("youtube", user_id, youtube_token_expires_at(credentials))
+        return creds_dict
+    
+    return youtube_credentials_from_dict(upstream_flight.do(("youtube", user_id, "refresh"), refresh))
+
+
+def refresh_youtube_token(user_id: str) -> Optional[float]:
+    """
+    Background refresh of stored YouTube credentials
+    
+    Returns:
+        New expiry (unix time), or None if the session can no longer be refreshed
+    """
+    session = youtube_sessions.get(user_id)
+    if not session:
+        return None
+    credentials = youtube_credentials_from_dict(session['credentials'])
+    if not credentials.refresh_token:
+        return None
+    expires_at = youtube_token_expires_at(credentials)
+    if expires_at and expires_at - time.time() > token_refresher.lead_time:
+        return expires_at  # Already refreshed (e.g. by an upload or another worker)
+    
+    try:
+        credentials = refresh_youtube_credentials(user_id, credentials)
+    except google_auth_exceptions.RefreshError as e:
+        token_states.record_invalid("youtube", credentials.token, f"refresh rejected: {e}")
+        logger.warning(f"YouTube refresh token rejected for user {user_id}: {e}")
+        return None
+    logger.info(f"Refreshed YouTube access token for user: {user_id}")
+    return youtube_token_expires_at(credentials)
+
+
+def youtube_channel_from_response(channel: dict) -> dict:
+    """Normalize a channels().list item into the stored channel dict"""
+    snippet = channel['snippet']
+    statistics = channel.get('statistics', {})
+    return {
+        'id': channel['id'],
+        'title': snippet['title'],
+        'description': snippet.get('description', ''),
+        'custom_url': snippet.get('customUrl', ''),
+        'published_at': snippet.get('publishedAt', ''),
+        'country': snippet.get('country', ''),
+        'thumbnail_url': snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
+        'subscriber_count': statistics.get('subscriberCount', '0'),
+        'video_count': statistics.get('videoCount', '0'),
+        'view_count': statistics.get('viewCount', '0'),
+        'hidden_subscriber_count': statistics.get('hiddenSubscriberCount', False)
+    }
+
+
+def perform_youtube_login(request: YouTubeAuthRequest):
+    """Exchange authorization code for YouTube access token (blocking - runs on the youtube executor)"""
     try:
         if not request.code:
             raise HTTPException(status_code=400, detail="Authorization code required")
         
-        flow = Flow.from_client_config(
+        flow = google_oauth_flow.Flow.from_client_config(
             {
                 "web": {
                     "client_id": YOUTUBE_CLIENT_ID,
@@ -1263,7 +1922,7 @@ async def youtube_login(request: YouTubeAuthRequest):
         credentials = flow.credentials
         
         # Build YouTube service
-        youtube = build('youtube', 'v3', credentials=credentials)
+        youtube = build_youtube_service(credentials)
         
         # Get channel info with comprehensive data
         channel_response = youtube.channels().list(part='snippet,statistics,contentDetails', mine=True).execute()
@@ -1277,33 +1936,21 @@ async def youtube_login(request: YouTubeAuthRequest):
         statistics = channel['statistics']
         
         # Store credentials with comprehensive channel data
+        channel_data = youtube_channel_from_response(channel)
         youtube_sessions[user_id] = {
-            'credentials': {
-                'token': credentials.token,
-                'refresh_token': credentials.refresh_token,
-                'token_uri': credentials.token_uri,
-                'client_id': credentials.client_id,
-                'client_secret': credentials.client_secret,
-                'scopes': credentials.scopes
-            },
-            'channel': {
-                'id': user_id,
-                'title': snippet['title'],
-                'description': snippet.get('description', ''),
-                'custom_url': snippet.get('customUrl', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'country': snippet.get('country', ''),
-                'thumbnail_url': snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
-                'subscriber_count': statistics.get('subscriberCount', '0'),
-                'video_count': statistics.get('videoCount', '0'),
-                'view_count': statistics.get('viewCount', '0'),
-                'hidden_subscriber_count': statistics.get('hiddenSubscriberCount', False)
-            }
+            'credentials': youtube_credentials_to_dict(credentials),
+            'channel': channel_data
         }
+        profile_cache.put("youtube", user_id, channel_data)
+        token_states.record_valid("youtube", credentials.token, scopes=credentials.scopes,
+                                  expires_at=youtube_token_expires_at(credentials))
+        if credentials.refresh_token:
+            token_refresher.schedule("youtube", user_id, youtube_token_expires_at(credentials))
         
         # Log YouTube connection event
         social_logger.info(f"YOUTUBE_CONNECTED - Channel: {channel['snippet']['title']} | ID: {user_id} | Subscribers: {channel['statistics'].get('subscriberCount', 0)}")
-        logger.info(f"YouTube login successful for user: {user_id}")
+        publish_events.record("youtube", user_id, CONNECTED, channel=channel['snippet']['title'])
+        logger.info("YouTube login successful for user: %s", user_id)
         
         return JSONResponse({
             "success": True,
@@ -1324,12 +1971,150 @@ async def youtube_login(request: YouTubeAuthRequest):
         })
         
     except Exception as e:
-        logger.error(f"YouTube login error: {str(e)}")
+        logger.error("YouTube login error: %s", e)
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 
+@app.post("/api/youtube/login")
+async def youtube_login(request: YouTubeAuthRequest):
+    """
+    Exchange authorization code for YouTube access token
+    """
+    return await executors.run("youtube", perform_youtube_login, request)
+
+
+def youtube_upload_session_state(session_uri: str, size: int, token: str) -> Optional[tuple]:
+    """
+    Ask a resumable upload session how much of the file it holds: (offset, None)
+    while incomplete, (size, video) once the upload finished, None when expired
+    """
+    response = requests.put(
+        session_uri,
+        headers={"Authorization": f"Bearer {token}", "Content-Range": f"bytes */{size}", "Content-Length": "0"},
+        timeout=30
+    )
+    if response.status_code in (404, 410):
+        return None
+    if response.status_code in (200, 201):
+        return size, response.json()
+    if response.status_code != 308:
+        response.raise_for_status()
+    # "Range: bytes=0-<last byte received>", absent when nothing arrived yet
+    received = response.headers.get("Range")
+    return (int(received.rsplit("-", 1)[1]) + 1 if received else 0), None
+
+
+def publish_youtube_short(user_id: str, path: str, title: str = "", description: str = "") -> dict:
+    """Upload a local video as a YouTube Short (blocking - also run by job workers)"""
+    if not user_id or user_id not in youtube_sessions:
+        raise HTTPException(status_code=401, detail="Not logged in")
+    
+    session = youtube_sessions[user_id]
+    creds_dict = session['credentials']
+    
+    # Recreate credentials object
+    credentials = youtube_credentials_from_dict(creds_dict)
+    
+    # Refresh token if expired or already known to be rejected (stored credentials are updated)
+    verdict = token_states.verdict(credentials.token)
+    if credentials.expired or (verdict is not None and not verdict['valid']):
+        credentials = refresh_youtube_credentials(user_id, credentials)
+    
+    # Ensure title includes #Shorts for proper classification
+    if title and "#Shorts" not in title:
+        title = f"{title} #Shorts"
+    elif not title:
+        title = "My YouTube Short #Shorts"
+    
+    body = {
+        'snippet': {
+            'title': title,
+            'description': description,
+            'categoryId': '24'  # Entertainment category
+        },
+        'status': {
+            'privacyStatus': 'public'
+        }
+    }
+    
+    # A retry of the same video continues the earlier resumable upload session
+    saga = publish_sagas.saga(
+        saga_id("youtube", user_id, file_digest(path), title, description),
+        f"youtube short for {user_id}"
+    )
+    
+    def upload_video():
+        media = googleapiclient_http.MediaFileUpload(path, chunksize=YOUTUBE_UPLOAD_CHUNK_SIZE, resumable=True)
+        with youtube_services.service(user_id, credentials) as youtube:
+            insert_request = youtube.videos().insert(
+                part='snippet,status',
+                body=body,
+                media_body=media
+            )
+            session_uri = saga.get("resumable_uri", ttl=YOUTUBE_UPLOAD_SESSION_TTL)
+            if session_uri:
+                state = youtube_upload_session_state(session_uri, os.path.getsize(path), credentials.token)
+                if state is None:
+                    # Upload session expired - start a new one
+                    saga.discard("resumable_uri")
+                    session_uri = None
+                elif state[1] is not None:
+                    return state[1]
+                else:
+                    # Send the rest from where the session left off
+                    insert_request.resumable_uri = session_uri
+                    insert_request.resumable_progress = state[0]
+            
+            response = None
+            try:
+                while response is None:
+                    _, response = insert_request.next_chunk()
+                    if insert_request.resumable_uri != session_uri:
+                        session_uri = insert_request.resumable_uri
+                        saga.record("resumable_uri", session_uri)
+            except Exception as e:
+                if insert_request.resumable_uri and insert_request.resumable_uri != session_uri:
+                    # Session opened but the first chunk failed - keep it for the retry
+                    saga.record("resumable_uri", insert_request.resumable_uri)
+                elif session_uri and isinstance(e, googleapiclient_errors.HttpError) and e.resp.status in (404, 410):
+                    # Upload session expired - the next attempt starts a new one
+                    saga.discard("resumable_uri")
+                raise
+            return response
+    
+    # Upload video
+    social_logger.info(f"YOUTUBE_UPLOAD_START - User: {user_id} | File: {os.path.basename(path)} | Title: {title}")
+    publish_events.record("youtube", user_id, UPLOAD_START, file=os.path.basename(path), title=title)
+    try:
+        with span("youtube_upload"):
+            response = saga.stage("video", upload_video)
+    except Exception as e:
+        if isinstance(e, googleapiclient_errors.HttpError) and e.resp.status == 401:
+            token_states.record_invalid("youtube", credentials.token, f"videos.insert: {e.resp.status}")
+        social_logger.error(f"YOUTUBE_UPLOAD_FAILED - User: {user_id} | File: {os.path.basename(path)} | Error: {str(e)}")
+        publish_events.record("youtube", user_id, UPLOAD_FAILED, file=os.path.basename(path), error=str(e))
+        raise
+    token_states.record_valid("youtube", credentials.token)
+    saga.finish()
+    
+    # Video count changed - drop cached channel
+    profile_cache.invalidate("youtube", user_id)
+    
+    # Log successful upload
+    social_logger.info(f"YOUTUBE_UPLOAD_SUCCESS - User: {user_id} | Video ID: {response['id']} | Title: {title} | URL: https://www.youtube.com/watch?v={response['id']}")
+    publish_events.record("youtube", user_id, UPLOAD_SUCCESS, response['id'], title=title)
+    logger.info("YouTube Short uploaded successfully: %s", response['id'])
+    
+    return {
+        "video_id": response['id'],
+        "title": response['snippet']['title'],
+        "url": f"https://www.youtube.com/watch?v={response['id']}"
+    }
+
 @app.post("/api/youtube/upload-short")
+@idempotent
 async def upload_youtube_short(
+    request: Request,
     file: UploadFile = File(...),
     title: str = Form(""),
     description: str = Form(""),
@@ -1337,116 +2122,51 @@ async def upload_youtube_short(
 ):
     """
     Upload a video as YouTube Short
+    
+    Send ``Prefer: respond-async`` to queue the upload and get 202 with a job id.
     """
     temp_path = None  # Initialize temp_path
     try:
-        logger.info(f"YouTube upload attempt for user_id: {user_id}")
-        logger.info(f"Available sessions: {list(youtube_sessions.keys())}")
+        logger.info("YouTube upload attempt for user_id: %s", user_id)
         
         if not user_id or user_id not in youtube_sessions:
             raise HTTPException(status_code=401, detail="Not logged in")
         
-        session = youtube_sessions[user_id]
-        creds_dict = session['credentials']
-        
-        # Recreate credentials object
-        credentials = Credentials(
-            token=creds_dict['token'],
-            refresh_token=creds_dict['refresh_token'],
-            token_uri=creds_dict['token_uri'],
-            client_id=creds_dict['client_id'],
-            client_secret=creds_dict['client_secret'],
-            scopes=creds_dict['scopes']
-        )
-        
-        # Refresh token if expired
-        if credentials.expired:
-            credentials.refresh(GoogleRequest())
-            # Update stored credentials
-            youtube_sessions[user_id]['credentials'] = {
-                'token': credentials.token,
-                'refresh_token': credentials.refresh_token,
-                'token_uri': credentials.token_uri,
-                'client_id': credentials.client_id,
-                'client_secret': credentials.client_secret,
-                'scopes': credentials.scopes
-            }
-        
-        # Build YouTube service
-        youtube = build('youtube', 'v3', credentials=credentials)
+        if prefers_async(request):
+            return await accept_job("youtube_short", {
+                "user_id": user_id,
+                "path": await spool_upload(file),
+                "title": title,
+                "description": description
+            })
         
         # Save uploaded file temporarily
         temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
-        # Ensure title includes #Shorts for proper classification
-        if title and "#Shorts" not in title:
-            title = f"{title} #Shorts"
-        elif not title:
-            title = "My YouTube Short #Shorts"
-        
-        # Upload video
-        social_logger.info(f"YOUTUBE_UPLOAD_START - User: {user_id} | File: {file.filename} | Title: {title}")
-        
-        body = {
-            'snippet': {
-                'title': title,
-                'description': description,
-                'categoryId': '24'  # Entertainment category
-            },
-            'status': {
-                'privacyStatus': 'public'
-            }
-        }
-        
-        media = MediaFileUpload(temp_path, chunksize=-1, resumable=True)
-        
-        insert_request = youtube.videos().insert(
-            part='snippet,status',
-            body=body,
-            media_body=media
-        )
-        
-        response = insert_request.execute()
+        content = await file.read()
+        await executors.run("storage", write_file, temp_path, content)
         
-        # Clean up temp file
-        os.remove(temp_path)
-        
-        # Log successful upload
-        social_logger.info(f"YOUTUBE_UPLOAD_SUCCESS - User: {user_id} | Video ID: {response['id']} | Title: {title} | URL: https://www.youtube.com/watch?v={response['id']}")
-        logger.info(f"YouTube Short uploaded successfully: {response['id']}")
+        data = await executors.run("youtube", publish_youtube_short, user_id, temp_path, title, description)
         
         return JSONResponse({
             "success": True,
-            "data": {
-                "video_id": response['id'],
-                "title": response['snippet']['title'],
-                "url": f"https://www.youtube.com/watch?v={response['id']}"
-            },
+            "data": data,
             "message": "YouTube Short uploaded successfully"
         })
         
+    except ExecutorSaturated:
+        raise
     except Exception as e:
-        social_logger.error(f"YOUTUBE_UPLOAD_FAILED - User: {user_id} | File: {file.filename} | Error: {str(e)}")
-        logger.error(f"YouTube upload error: {str(e)}")
+        logger.error("YouTube upload error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        # Clean up temp file
         if temp_path and os.path.exists(temp_path):
             os.remove(temp_path)
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
-@app.post("/api/youtube/logout")
-async def youtube_logout(request: YouTubeLogoutRequest):
-    """
-    Logout from YouTube - validates token first, then calls official Google OAuth revoke endpoint
-    """
+def perform_youtube_logout(request: YouTubeLogoutRequest):
+    """Logout from YouTube (blocking - runs on the youtube executor)"""
     try:
-        import requests
-        from google.auth.transport.requests import Request as GoogleRequest
-        from google.oauth2.credentials import Credentials
-        from googleapiclient.discovery import build
-        
         token_valid = None
         access_token = None
         
@@ -1455,31 +2175,28 @@ async def youtube_logout(request: YouTubeLogoutRequest):
             creds_dict = session.get('credentials', {})
             access_token = creds_dict.get('token')
             
-            # Step 1: Validate token by attempting to fetch channel info
+            # Step 1: Validate token (cached verdict, else fetch channel info)
             token_valid = False
-            if access_token:
+            verdict = token_states.verdict(access_token)
+            if verdict is not None:
+                token_valid = verdict['valid']
+                logger.info(f"Using cached YouTube token verdict for user: {request.user_id}")
+            elif access_token:
                 try:
                     # Recreate credentials object for validation
-                    credentials = Credentials(
-                        token=creds_dict.get('token'),
-                        refresh_token=creds_dict.get('refresh_token'),
-                        token_uri=creds_dict.get('token_uri'),
-                        client_id=creds_dict.get('client_id'),
-                        client_secret=creds_dict.get('client_secret'),
-                        scopes=creds_dict.get('scopes')
-                    )
+                    credentials = youtube_credentials_from_dict(creds_dict)
                     
                     # Refresh token if expired
                     if credentials.expired:
                         try:
-                            credentials.refresh(GoogleRequest())
+                            credentials = refresh_youtube_credentials(request.user_id, credentials)
                         except Exception as refresh_err:
                             logger.info(f"YouTube token expired and refresh failed: {str(refresh_err)}")
                     
                     # Try to validate by fetching channel info (lightweight check)
-                    youtube = build('youtube', 'v3', credentials=credentials)
                     try:
-                        channel_response = youtube.channels().list(part='id', mine=True).execute()
+                        with youtube_services.service(request.user_id, credentials) as youtube:
+                            channel_response = youtube.channels().list(part='id', mine=True).execute()
                         if channel_response.get('items'):
                             token_valid = True
                             logger.info(f"YouTube token validated successfully for user: {request.user_id}")
@@ -1512,6 +2229,10 @@ async def youtube_logout(request: YouTubeLogoutRequest):
             
             # Delete local session
             del youtube_sessions[request.user_id]
+            token_refresher.cancel("youtube", request.user_id)
+            youtube_services.invalidate(request.user_id)
+            profile_cache.invalidate("youtube", request.user_id)
+            token_states.forget(access_token)
             logger.info(f"YouTube logout successful for user: {request.user_id}")
         
         return JSONResponse({
@@ -1524,16 +2245,109 @@ async def youtube_logout(request: YouTubeLogoutRequest):
         raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
 
 
+@app.post("/api/youtube/logout")
+async def youtube_logout(request: YouTubeLogoutRequest):
+    """
+    Logout from YouTube - validates token first, then calls official Google OAuth revoke endpoint
+    """
+    return await executors.run("youtube", perform_youtube_logout, request)
+
+
+def validate_youtube_session(user_id: str) -> dict:
+    """
+    Validate stored YouTube credentials with channels().list() (blocking)
+    
+    Returns:
+        Validate endpoint response payload
+    """
+    session = youtube_sessions[user_id]
+    creds_dict = session.get('credentials', {})
+    
+    # Validate token by attempting to fetch channel info
+    try:
+        # Recreate credentials object for validation
+        credentials = youtube_credentials_from_dict(creds_dict)
+        
+        # Refresh token if expired
+        if credentials.expired:
+            try:
+                credentials = refresh_youtube_credentials(user_id, credentials)
+                logger.info(f"YouTube token refreshed for user: {user_id}")
+            except Exception as refresh_err:
+                logger.info(f"YouTube token expired and refresh failed: {str(refresh_err)}")
+                return {
+                    "success": False,
+                    "is_valid": False,
+                    "error": f"Token expired and refresh failed: {str(refresh_err)}"
+                }
+        
+        # Try to validate by fetching channel info (lightweight check)
+        try:
+            try:
+                with youtube_services.service(user_id, credentials) as youtube:
+                    channel_response = youtube.channels().list(part='id,snippet', mine=True).execute()
+            except googleapiclient_errors.HttpError as http_err:
+                if http_err.resp.status != 401 or not credentials.refresh_token:
+                    raise
+                # Token rejected before its recorded expiry - refresh once and retry
+                token_states.record_invalid("youtube", credentials.token, "channels.list: 401")
+                credentials = refresh_youtube_credentials(user_id, credentials)
+                with youtube_services.service(user_id, credentials) as youtube:
+                    channel_response = youtube.channels().list(part='id,snippet', mine=True).execute()
+            if channel_response.get('items'):
+                channel_info = channel_response['items'][0]
+                channel_id = channel_info.get('id')
+                channel_title = channel_info.get('snippet', {}).get('title')
+                channel_description = channel_info.get('snippet', {}).get('description')
+                thumbnails = channel_info.get('snippet', {}).get('thumbnails', {})
+                thumbnail_url = thumbnails.get('default', {}).get('url') if thumbnails else None
+                
+                logger.info(f"YouTube token validated successfully for user: {user_id}")
+                result = {
+                    "success": True,
+                    "is_valid": True,
+                    "channel": {
+                        "id": channel_id,
+                        "title": channel_title,
+                        "description": channel_description,
+                        "thumbnail_url": thumbnail_url
+                    }
+                }
+                token_states.record_valid("youtube", credentials.token, details=result)
+                return result
+            else:
+                logger.info(f"YouTube token validation failed: No channel found for user: {user_id}")
+                return {
+                    "success": False,
+                    "is_valid": False,
+                    "error": "No channel found"
+                }
+        except Exception as validate_err:
+            logger.info(f"YouTube token validation failed: {str(validate_err)}")
+            if isinstance(validate_err, googleapiclient_errors.HttpError) and validate_err.resp.status == 401:
+                token_states.record_invalid("youtube", credentials.token, f"Token validation failed: {str(validate_err)}")
+            return {
+                "success": False,
+                "is_valid": False,
+                "error": f"Token validation failed: {str(validate_err)}"
+            }
+            
+    except Exception as validation_error:
+        logger.error(f"YouTube token validation error: {str(validation_error)}")
+        return {
+            "success": False,
+            "is_valid": False,
+            "error": f"Validation error: {str(validation_error)}"
+        }
+
+
 @app.post("/api/youtube/validate")
 async def youtube_validate(request: YouTubeValidateRequest):
     """
     Validate YouTube access token using YouTube API channels().list()
+    Concurrent validations for the same user share one upstream request.
     """
     try:
-        from google.auth.transport.requests import Request as GoogleRequest
-        from google.oauth2.credentials import Credentials
-        from googleapiclient.discovery import build
-        
         if request.user_id not in youtube_sessions:
             return JSONResponse({
                 "success": False,
@@ -1552,89 +2366,123 @@ async def youtube_validate(request: YouTubeValidateRequest):
                 "error": "No access token found"
             })
         
-        # Validate token by attempting to fetch channel info
-        try:
-            # Recreate credentials object for validation
-            credentials = Credentials(
-                token=creds_dict.get('token'),
-                refresh_token=creds_dict.get('refresh_token'),
-                token_uri=creds_dict.get('token_uri'),
-                client_id=creds_dict.get('client_id'),
-                client_secret=creds_dict.get('client_secret'),
-                scopes=creds_dict.get('scopes')
-            )
-            
-            # Refresh token if expired
-            if credentials.expired:
-                try:
-                    credentials.refresh(GoogleRequest())
-                    logger.info(f"YouTube token refreshed for user: {request.user_id}")
-                except Exception as refresh_err:
-                    logger.info(f"YouTube token expired and refresh failed: {str(refresh_err)}")
-                    return JSONResponse({
-                        "success": False,
-                        "is_valid": False,
-                        "error": f"Token expired and refresh failed: {str(refresh_err)}"
-                    })
-            
-            # Try to validate by fetching channel info (lightweight check)
-            youtube = build('youtube', 'v3', credentials=credentials)
-            try:
-                channel_response = youtube.channels().list(part='id,snippet', mine=True).execute()
-                if channel_response.get('items'):
-                    channel_info = channel_response['items'][0]
-                    channel_id = channel_info.get('id')
-                    channel_title = channel_info.get('snippet', {}).get('title')
-                    channel_description = channel_info.get('snippet', {}).get('description')
-                    thumbnails = channel_info.get('snippet', {}).get('thumbnails', {})
-                    thumbnail_url = thumbnails.get('default', {}).get('url') if thumbnails else None
-                    
-                    logger.info(f"YouTube token validated successfully for user: {request.user_id}")
-                    return JSONResponse({
-                        "success": True,
-                        "is_valid": True,
-                        "channel": {
-                            "id": channel_id,
-                            "title": channel_title,
-                            "description": channel_description,
-                            "thumbnail_url": thumbnail_url
-                        }
-                    })
-                else:
-                    logger.info(f"YouTube token validation failed: No channel found for user: {request.user_id}")
-                    return JSONResponse({
-                        "success": False,
-                        "is_valid": False,
-                        "error": "No channel found"
-                    })
-            except Exception as validate_err:
-                logger.info(f"YouTube token validation failed: {str(validate_err)}")
-                return JSONResponse({
-                    "success": False,
-                    "is_valid": False,
-                    "error": f"Token validation failed: {str(validate_err)}"
-                })
-                
-        except Exception as validation_error:
-            logger.error(f"YouTube token validation error: {str(validation_error)}")
+        # Serve a fresh cached verdict without going upstream
+        verdict = token_states.verdict(access_token)
+        if verdict is not None and verdict['valid'] and verdict.get('details'):
+            return JSONResponse(verdict['details'])
+        if verdict is not None and not verdict['valid'] and not creds_dict.get('refresh_token'):
             return JSONResponse({
                 "success": False,
                 "is_valid": False,
-                "error": f"Validation error: {str(validation_error)}"
+                "error": verdict['reason']
             })
+        
+        result = await executors.run(
+            "youtube",
+            upstream_flight.do,
+            ("youtube", request.user_id, "validate"),
+            lambda: validate_youtube_session(request.user_id)
+        )
+        return JSONResponse(result)
     except Exception as e:
         logger.error(f"YouTube validate error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
 
 
+@app.get("/api/youtube/channel-info")
+async def youtube_channel_info(user_id: str):
+    """
+    Get YouTube channel information (served from the profile cache)
+    """
+    try:
+        if user_id not in youtube_sessions:
+            raise HTTPException(status_code=401, detail="Not logged in")
+        
+        def load_channel():
+            credentials = youtube_credentials_from_dict(youtube_sessions[user_id]['credentials'])
+            if credentials.expired:
+                credentials = refresh_youtube_credentials(user_id, credentials)
+            with youtube_services.service(user_id, credentials) as youtube:
+                channel_response = youtube.channels().list(part='snippet,statistics,contentDetails', mine=True).execute()
+            if not channel_response.get('items'):
+                raise HTTPException(status_code=404, detail="No YouTube channel found")
+            return youtube_channel_from_response(channel_response['items'][0])
+        
+        channel = await executors.run("youtube", profile_cache.get_or_load, "youtube", user_id, load_channel)
+        
+        return JSONResponse({
+            "success": True,
+            "data": channel
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"YouTube channel info error: {str(e)}")
+        # Fall back to the channel data captured at login
+        return JSONResponse({
+            "success": True,
+            "data": youtube_sessions.get(user_id, {}).get('channel', {})
+        })
+
+
 # ============================================================================
 # Instagram Graph API - Validation Endpoint
 # ============================================================================
+def validate_instagram_graph_session(ig_user_id: str, access_token: str) -> dict:
+    """
+    Validate an Instagram Graph token via GET /{ig_user_id}?fields=id,username (blocking)
+    
+    Returns:
+        Validate endpoint response payload
+    """
+    try:
+        url = f"https://graph.facebook.com/v17.0/{ig_user_id}"
+        params = {
+            "fields": "id,username",
+            "access_token": access_token,
+        }
+        resp = requests.get(url, params=params, timeout=30)
+        if resp.status_code == 200:
+            data = resp.json()
+            result = {
+                "success": True,
+                "is_valid": True,
+                "user": {
+                    "id": data.get("id"),
+                    "username": data.get("username"),
+                }
+            }
+            token_states.record_valid("instagram_graph", access_token, details=result)
+            return result
+        else:
+            try:
+                err = resp.json()
+            except Exception:
+                err = {"message": resp.text}
+            logger.info(f"Instagram token validation failed: {resp.status_code} - {resp.text}")
+            error_msg = err.get('error', {}).get('message') if isinstance(err, dict) else 'Validation failed'
+            if is_auth_failure(resp.status_code, err):
+                token_states.record_invalid("instagram_graph", access_token, error_msg or f"HTTP {resp.status_code}")
+            return {
+                "success": False,
+                "is_valid": False,
+                "error": error_msg
+            }
+    except Exception as e:
+        logger.error(f"Instagram token validation error: {str(e)}")
+        return {
+            "success": False,
+            "is_valid": False,
+            "error": f"Validation error: {str(e)}"
+        }
+
+
 @app.post("/api/instagram/validate")
 async def instagram_validate(request: InstagramValidateRequest):
     """
     Validate Instagram (Graph) session using stored access token.
     Attempts a lightweight Graph call to fetch IG user id and username.
+    Concurrent validations for the same user share one upstream request.
     """
     try:
         if request.user_id not in instagram_graph_sessions:
@@ -1655,42 +2503,24 @@ async def instagram_validate(request: InstagramValidateRequest):
                 "error": "Missing access token or IG user id"
             })
 
-        # Validate via Graph API: GET /{ig_user_id}?fields=id,username
-        try:
-            url = f"https://graph.facebook.com/v17.0/{ig_user_id}"
-            params = {
-                "fields": "id,username",
-                "access_token": access_token,
-            }
-            resp = requests.get(url, params=params, timeout=30)
-            if resp.status_code == 200:
-                data = resp.json()
-                return JSONResponse({
-                    "success": True,
-                    "is_valid": True,
-                    "user": {
-                        "id": data.get("id"),
-                        "username": data.get("username"),
-                    }
-                })
-            else:
-                try:
-                    err = resp.json()
-                except Exception:
-                    err = {"message": resp.text}
-                logger.info(f"Instagram token validation failed: {resp.status_code} - {resp.text}")
-                return JSONResponse({
-                    "success": False,
-                    "is_valid": False,
-                    "error": err.get('error', {}).get('message') if isinstance(err, dict) else 'Validation failed'
-                })
-        except Exception as e:
-            logger.error(f"Instagram token validation error: {str(e)}")
+        # Serve a fresh cached verdict without going upstream
+        verdict = token_states.verdict(access_token)
+        if verdict is not None and verdict['valid'] and verdict.get('details'):
+            return JSONResponse(verdict['details'])
+        if verdict is not None and not verdict['valid']:
             return JSONResponse({
                 "success": False,
                 "is_valid": False,
-                "error": f"Validation error: {str(e)}"
+                "error": verdict['reason']
             })
+
+        result = await executors.run(
+            "instagram",
+            upstream_flight.do,
+            ("instagram_graph", request.user_id, "validate"),
+            lambda: validate_instagram_graph_session(ig_user_id, access_token)
+        )
+        return JSONResponse(result)
     except Exception as e:
         logger.error(f"Instagram validate error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
@@ -1738,7 +2568,7 @@ async def tiktok_oauth_callback(code: str = None, state: str = None, error: str
         
         if error:
             social_logger.error(f"TIKTOK_OAUTH_ERROR - Error: {error}")
-            logger.error(f"TikTok OAuth error: {error}")
+            logger.error("TikTok OAuth error: %s", error)
             # Redirect to frontend with error
             return RedirectResponse(url=f"{frontend_url}/?tiktok_error={error}")
         
@@ -1760,7 +2590,7 @@ async def tiktok_oauth_callback(code: str = None, state: str = None, error: str
         
     except Exception as e:
         social_logger.error(f"TIKTOK_OAUTH_CALLBACK_ERROR - Error: {str(e)}")
-        logger.error(f"TikTok OAuth callback error: {str(e)}")
+        logger.error("TikTok OAuth callback error: %s", e)
         # Redirect to frontend with error
         frontend_url = os.getenv('FRONTEND_URL')
         if not frontend_url:
@@ -1768,11 +2598,90 @@ async def tiktok_oauth_callback(code: str = None, state: str = None, error: str
         return RedirectResponse(url=f"{frontend_url}/?tiktok_error=callback_failed")
 
 
-@app.post("/api/tiktok/login")
-async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request model
+TIKTOK_USER_INFO_FIELDS = "open_id,union_id,avatar_url,display_name,follower_count,following_count,likes_count,video_count"
+
+
+def tiktok_profile_from_user_data(open_id: str, user_data: dict) -> dict:
+    """Normalize a TikTok user/info payload into the stored profile dict"""
+    return {
+        "open_id": open_id,
+        "display_name": user_data.get("display_name", "TikTok User"),
+        "avatar_url": user_data.get("avatar_url", ""),
+        "follower_count": str(user_data.get("follower_count", 0)),
+        "following_count": str(user_data.get("following_count", 0)),
+        "likes_count": str(user_data.get("likes_count", 0)),
+        "video_count": str(user_data.get("video_count", 0))
+    }
+
+
+TIKTOK_TOKEN_URL = "https://open.tiktokapis.com/v2/oauth/token/"
+
+
+def tiktok_token_fields(refresh_token: Optional[str], expires_in, refresh_expires_in) -> dict:
+    """Token bookkeeping stored on a TikTok session (for background refresh)"""
+    now = time.time()
+    return {
+        "refresh_token": refresh_token,
+        "expires_at": now + float(expires_in) if expires_in else None,
+        "refresh_expires_at": now + float(refresh_expires_in) if refresh_expires_in else None
+    }
+
+
+def refresh_tiktok_token(open_id: str) -> Optional[float]:
     """
-    Exchange TikTok authorization code for access token
+    Refresh a TikTok access token with the stored refresh_token grant
+    
+    Returns:
+        New expiry (unix time), or None if the session can no longer be refreshed
     """
+    session = tiktok_sessions.get(open_id)
+    if not session or not session.get("refresh_token"):
+        return None
+    if session.get("expires_at") and session["expires_at"] - time.time() > token_refresher.lead_time:
+        return session["expires_at"]  # Already refreshed (e.g. by another worker)
+    
+    def refresh():
+        response = requests.post(
+            TIKTOK_TOKEN_URL,
+            data={
+                "client_key": TIKTOK_CLIENT_KEY,
+                "client_secret": TIKTOK_CLIENT_SECRET,
+                "grant_type": "refresh_token",
+                "refresh_token": session["refresh_token"]
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=30
+        )
+        result = response.json() if response.text else {}
+        data = result.get("data", result) if isinstance(result, dict) else {}
+        if response.status_code != 200 or not data.get("access_token"):
+            if response.status_code in (400, 401) or is_auth_failure(response.status_code, result):
+                token_states.record_invalid("tiktok", session.get("access_token"), f"refresh rejected: {result}")
+                logger.warning(f"TikTok refresh token rejected for user {open_id}: {result}")
+                return None
+            raise RuntimeError(f"TikTok token refresh failed ({response.status_code}): {result}")
+        
+        fields = {
+            "access_token": data["access_token"],
+            **tiktok_token_fields(
+                data.get("refresh_token") or session["refresh_token"],
+                data.get("expires_in"),
+                data.get("refresh_expires_in")
+            )
+        }
+        if not data.get("refresh_expires_in"):
+            fields["refresh_expires_at"] = session.get("refresh_expires_at")
+        tiktok_sessions.patch(open_id, fields)
+        token_states.forget(session.get("access_token"))
+        token_states.record_valid("tiktok", data["access_token"], expires_at=fields["expires_at"])
+        logger.info(f"Refreshed TikTok access token for user: {open_id}")
+        return fields["expires_at"]
+    
+    return upstream_flight.do(("tiktok", open_id, "refresh"), refresh)
+
+
+def perform_tiktok_login(request: YouTubeAuthRequest):
+    """Exchange TikTok authorization code for access token (blocking - runs on the tiktok executor)"""
     try:
         import requests
         
@@ -1780,7 +2689,7 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
             raise HTTPException(status_code=400, detail="Authorization code is required")
         
         # Exchange code for access token
-        token_url = "https://open.tiktokapis.com/v2/oauth/token/"
+        token_url = TIKTOK_TOKEN_URL
         token_data = {
             "client_key": TIKTOK_CLIENT_KEY,
             "client_secret": TIKTOK_CLIENT_SECRET,
@@ -1790,23 +2699,23 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
         }
         
         # Log request details (without exposing secrets)
-        logger.info(f"TikTok token exchange request: client_key={TIKTOK_CLIENT_KEY[:8]}..., redirect_uri={TIKTOK_REDIRECT_URI}, code_length={len(request.code)}")
+        logger.info("TikTok token exchange request: redirect_uri=%s, code_length=%d", TIKTOK_REDIRECT_URI, len(request.code))
         
         # TikTok API requires application/x-www-form-urlencoded, not JSON
         token_response = requests.post(token_url, data=token_data, headers={"Content-Type": "application/x-www-form-urlencoded"})
         
         # Log the full response for debugging
-        logger.info(f"TikTok token exchange response status: {token_response.status_code}")
-        logger.info(f"TikTok token exchange response headers: {dict(token_response.headers)}")
+        logger.info("TikTok token exchange response status: %s", token_response.status_code)
+        logger.info("TikTok token exchange response headers: %s", dict(token_response.headers))
         
         try:
             token_result = token_response.json()
         except Exception as e:
-            logger.error(f"Failed to parse TikTok token response as JSON: {e}")
-            logger.error(f"Raw response text: {token_response.text[:500]}")
+            logger.error("Failed to parse TikTok token response as JSON: %s", e)
+            logger.error("Raw response text: %s", token_response.text[:500])
             raise HTTPException(status_code=400, detail=f"Invalid JSON response from TikTok: {str(e)}")
         
-        logger.info(f"TikTok token exchange response body: {token_result}")
+        logger.info("TikTok token exchange response body: %s", token_result)
         
         # Check for TikTok API errors first (TikTok may return 200 with error object)
         if isinstance(token_result, dict) and "error" in token_result:
@@ -1814,7 +2723,7 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
             error_description = token_result.get("error_description", "No error description provided")
             log_id = token_result.get("log_id", "N/A")
             
-            logger.error(f"TikTok API returned error: {error_code} - {error_description} | Log ID: {log_id} | Full response: {token_result}")
+            logger.error("TikTok API returned error: %s - %s | Log ID: %s | Full response: %s", error_code, error_description, log_id, token_result)
             
             # Provide helpful error messages based on common TikTok API errors
             user_friendly_error = error_description
@@ -1829,7 +2738,7 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
         
         if token_response.status_code != 200:
             error_msg = token_result.get("message") or token_result.get("error_description") or token_result.get("error") or str(token_result)
-            logger.error(f"TikTok token exchange failed: {error_msg} | Full response: {token_result}")
+            logger.error("TikTok token exchange failed: %s | Full response: %s", error_msg, token_result)
             raise HTTPException(status_code=400, detail=error_msg or "Failed to get access token")
         
         # TikTok API might return data in a nested 'data' object or directly
@@ -1839,16 +2748,22 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
             access_token = token_data_response.get("access_token")
             open_id = token_data_response.get("open_id")
             refresh_token = token_data_response.get("refresh_token")
+            expires_in = token_data_response.get("expires_in")
+            refresh_expires_in = token_data_response.get("refresh_expires_in")
+            granted_scope = token_data_response.get("scope")
         else:
             access_token = token_result.get("access_token")
             open_id = token_result.get("open_id")
             refresh_token = token_result.get("refresh_token")
+            expires_in = token_result.get("expires_in")
+            refresh_expires_in = token_result.get("refresh_expires_in")
+            granted_scope = token_result.get("scope")
         
         if not access_token or not open_id:
-            logger.error(f"Missing access_token or open_id in response. Full response: {token_result}")
-            logger.error(f"Response keys: {list(token_result.keys()) if isinstance(token_result, dict) else 'Not a dict'}")
+            logger.error("Missing access_token or open_id in response. Full response: %s", token_result)
+            logger.error("Response keys: %s", list(token_result.keys()) if isinstance(token_result, dict) else 'Not a dict')
             if isinstance(token_result, dict) and "data" in token_result:
-                logger.error(f"Data object keys: {list(token_result['data'].keys()) if isinstance(token_result['data'], dict) else 'Not a dict'}")
+                logger.error("Data object keys: %s", list(token_result['data'].keys()) if isinstance(token_result['data'], dict) else 'Not a dict')
             raise HTTPException(status_code=400, detail=f"Invalid token response: Missing access_token or open_id. Response structure: {list(token_result.keys()) if isinstance(token_result, dict) else 'Not a dict'}")
         
         # Get user info
@@ -1858,14 +2773,14 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
             "Content-Type": "application/json"
         }
         params = {
-            "fields": "open_id,union_id,avatar_url,display_name,follower_count,following_count,likes_count,video_count"
+            "fields": TIKTOK_USER_INFO_FIELDS
         }
         
         user_response = requests.get(user_info_url, headers=headers, params=params)
         user_result = user_response.json()
         
         if user_response.status_code != 200:
-            logger.warning(f"Failed to get TikTok user info: {user_result}")
+            logger.warning("Failed to get TikTok user info: %s", user_result)
             # Continue anyway with basic info
             user_data = {
                 "open_id": open_id,
@@ -1877,18 +2792,30 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
         # Store session
         tiktok_sessions[open_id] = {
             "access_token": access_token,
-            "open_id": open_id,
-            "display_name": user_data.get("display_name", "TikTok User"),
-            "avatar_url": user_data.get("avatar_url", ""),
-            "follower_count": str(user_data.get("follower_count", 0)),
-            "following_count": str(user_data.get("following_count", 0)),
-            "likes_count": str(user_data.get("likes_count", 0)),
-            "video_count": str(user_data.get("video_count", 0))
+            **tiktok_token_fields(refresh_token, expires_in, refresh_expires_in),
+            **tiktok_profile_from_user_data(open_id, user_data)
         }
+        token_refresher.schedule("tiktok", open_id, tiktok_sessions[open_id].get("expires_at") if refresh_token else None)
+        profile_cache.put("tiktok", open_id, tiktok_profile_from_user_data(open_id, user_data))
+        token_states.record_valid(
+            "tiktok", access_token,
+            scopes=granted_scope.split(",") if granted_scope else None,
+            expires_in=expires_in,
+            details={
+                "success": True,
+                "is_valid": True,
+                "user": {
+                    "open_id": open_id,
+                    "display_name": user_data.get("display_name", "TikTok User"),
+                    "avatar_url": user_data.get("avatar_url", "")
+                }
+            } if user_response.status_code == 200 else None
+        )
         
         # Log TikTok connection event
         social_logger.info(f"TIKTOK_CONNECTED - User: {user_data.get('display_name', 'TikTok User')} | ID: {open_id} | Avatar: {user_data.get('avatar_url', 'N/A')} | Followers: {user_data.get('follower_count', 0)}")
-        logger.info(f"TikTok login successful for user: {open_id}")
+        publish_events.record("tiktok", open_id, CONNECTED, display_name=user_data.get('display_name'))
+        logger.info("TikTok login successful for user: %s", open_id)
         
         return JSONResponse({
             "success": True,
@@ -1904,59 +2831,46 @@ async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request m
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"TikTok login error: {str(e)}")
+        logger.error("TikTok login error: %s", e)
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 
-@app.post("/api/tiktok/upload-video")
-async def upload_tiktok_video(
-    video: UploadFile | None = File(None),
-    description: str = Form(""),
-    user_id: str = Form(""),
-    video_url: str | None = Form(None)
-):
+@app.post("/api/tiktok/login")
+async def tiktok_login(request: YouTubeAuthRequest):  # Reuse the same request model
     """
-    Upload video to TikTok
+    Exchange TikTok authorization code for access token
+    """
+    return await executors.run("tiktok", perform_tiktok_login, request)
+
+
+# TikTok inbox upload URLs are valid for an hour after init
+TIKTOK_UPLOAD_URL_TTL = 50 * 60
+
+def publish_tiktok_video(user_id: str, description: str = "", path: Optional[str] = None,
+                         video_url: Optional[str] = None) -> dict:
     """
+    Send a video to the user's TikTok inbox (blocking - also run by job workers)
+    
+    Uploads the local file at path, or downloads video_url (e.g. a Cloudinary
+    processed video) first when no path is given.
+    """
+    if not user_id or user_id not in tiktok_sessions:
+        raise HTTPException(status_code=401, detail="Not logged in to TikTok")
+    
+    session = tiktok_sessions[user_id]
+    access_token = session["access_token"]
+    
+    # Fail fast on a token already known to be rejected (no per-upload introspection call)
+    verdict = token_states.verdict(access_token)
+    if verdict is not None and not verdict['valid']:
+        raise HTTPException(status_code=401, detail=f"TikTok session expired. Please reconnect. ({verdict['reason']})")
+    
     temp_path = None
+    started = False
     try:
-        import requests
-        
-        logger.info(f"TikTok upload attempt for user_id: {user_id}")
-        logger.info(f"Available sessions: {list(tiktok_sessions.keys())}")
-        
-        # Validate user session
-        if not user_id or user_id not in tiktok_sessions:
-            raise HTTPException(status_code=401, detail="Not logged in to TikTok")
-        
-        session = tiktok_sessions[user_id]
-        access_token = session["access_token"]
-        
-        # Check token and log available scopes
-        logger.info(f"TikTok upload for user: {user_id}")
-        logger.info(f"Access token: {access_token[:20]}...")
-        
-        # Try to get token info to see what scopes we have
-        try:
-            token_info_url = "https://open.tiktokapis.com/v2/user/info/?fields=open_id,display_name,avatar_url"
-            token_headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            token_response = requests.get(token_info_url, headers=token_headers)
-            logger.info(f"Token validation response: {token_response.status_code}")
-            if token_response.status_code == 200:
-                token_data = token_response.json()
-                logger.info(f"Token info: {token_data}")
-            else:
-                logger.warning(f"Token validation failed: {token_response.text}")
-        except Exception as e:
-            logger.warning(f"Could not validate token: {e}")
-        
-        # Save video temporarily (from uploaded file or Cloudinary URL)
-        if video_url:
+        if path is None:
             # Download from URL (e.g., Cloudinary processed)
-            temp_path = f"/tmp/tiktok_upload_{user_id}.mp4"
+            temp_path = path = f"/tmp/tiktok_upload_{user_id}_{uuid.uuid4().hex}.mp4"
             resp = requests.get(video_url, stream=True, timeout=60)
             if resp.status_code != 200:
                 raise HTTPException(status_code=400, detail="Failed to download video from URL")
@@ -1964,107 +2878,171 @@ async def upload_tiktok_video(
                 for chunk in resp.iter_content(chunk_size=8192):
                     if chunk:
                         f.write(chunk)
-        else:
-            if not video:
-                raise HTTPException(status_code=400, detail="No video provided")
-            temp_path = f"/tmp/tiktok_upload_{user_id}_{video.filename}"
-            with open(temp_path, "wb") as f:
-                f.write(await video.read())
         
-        file_size = os.path.getsize(temp_path)
+        file_size = os.path.getsize(path)
         
         # Log TikTok upload start
-        social_logger.info(f"TIKTOK_UPLOAD_START - User: {user_id} | File: {video.filename if video else 'from_url'} | Description: {description} | Size: {file_size} bytes")
+        social_logger.info(f"TIKTOK_UPLOAD_START - User: {user_id} | File: {os.path.basename(path) if video_url is None else 'from_url'} | Description: {description} | Size: {file_size} bytes")
+        publish_events.record("tiktok", user_id, UPLOAD_START, file=os.path.basename(path) if video_url is None else video_url,
+                              description=description, bytes=file_size)
+        started = True
         
-        # Step 1: Initialize upload for Inbox flow (works without audit)
-        init_url = "https://open.tiktokapis.com/v2/post/publish/inbox/video/init/"
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
+        # A retry of the same video reuses the inbox upload already initialized
+        saga = publish_sagas.saga(saga_id("tiktok", user_id, file_digest(path)), f"tiktok video for {user_id}")
         
-        # Inbox init requires only source_info
-        init_data = {
-            "source_info": {
-                "source": "FILE_UPLOAD",
-                "video_size": file_size,
-                "chunk_size": file_size,
-                "total_chunk_count": 1
+        # Step 1: Initialize upload for Inbox flow (works without audit)
+        def init_upload():
+            init_url = "https://open.tiktokapis.com/v2/post/publish/inbox/video/init/"
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json"
             }
-        }
-        
-        init_response = requests.post(init_url, headers=headers, json=init_data)
-        # Log raw response for debugging
-        try:
-            logger.info(f"TikTok INIT raw: status={init_response.status_code} body={init_response.text}")
-        except Exception:
-            pass
-        try:
-            init_result = init_response.json()
-        except Exception:
-            init_result = {"raw": init_response.text}
-        
-        if init_response.status_code != 200:
-            logger.error(f"TikTok init failed: {init_response.status_code} - {init_result}")
-            raise HTTPException(status_code=400, detail=f"TikTok upload failed: {init_result}")
-        
-        upload_url = init_result.get("data", {}).get("upload_url")
-        publish_id = init_result.get("data", {}).get("publish_id")
+            
+            # Inbox init requires only source_info
+            init_data = {
+                "source_info": {
+                    "source": "FILE_UPLOAD",
+                    "video_size": file_size,
+                    "chunk_size": file_size,
+                    "total_chunk_count": 1
+                }
+            }
+            
+            init_response = requests.post(init_url, headers=headers, json=init_data)
+            # Log raw response for debugging
+            try:
+                logger.info("TikTok INIT raw: status=%s body=%s", init_response.status_code, init_response.text)
+            except Exception:
+                pass
+            try:
+                init_result = init_response.json()
+            except Exception:
+                init_result = {"raw": init_response.text}
+            
+            if init_response.status_code != 200:
+                logger.error("TikTok init failed: %s - %s", init_response.status_code, init_result)
+                if is_auth_failure(init_response.status_code, init_result):
+                    token_states.record_invalid("tiktok", access_token, f"Upload init failed: {init_response.status_code}")
+                    raise HTTPException(status_code=401, detail=f"TikTok session expired. Please reconnect. ({init_result})")
+                raise HTTPException(status_code=400, detail=f"TikTok upload failed: {init_result}")
+            token_states.record_valid("tiktok", access_token)
+            
+            upload_url = init_result.get("data", {}).get("upload_url")
+            publish_id = init_result.get("data", {}).get("publish_id")
+            
+            if not upload_url or not publish_id:
+                raise HTTPException(status_code=400, detail="Invalid init response")
+            return {"upload_url": upload_url, "publish_id": publish_id}
         
-        if not upload_url or not publish_id:
-            raise HTTPException(status_code=400, detail="Invalid init response")
+        with span("tiktok_init"):
+            inbox = saga.stage("init", init_upload, ttl=TIKTOK_UPLOAD_URL_TTL)
+        publish_id = inbox["publish_id"]
         
         # Step 2: Upload video file (single chunk with Content-Range)
-        with open(temp_path, "rb") as f:
+        def put_video():
             upload_headers = {
                 "Content-Type": "video/mp4",
                 "Content-Length": str(file_size),
                 "Content-Range": f"bytes 0-{file_size - 1}/{file_size}",
             }
-            upload_response = requests.put(upload_url, headers=upload_headers, data=f)
-        # Log raw upload response
-        try:
-            logger.info(f"TikTok UPLOAD raw: status={upload_response.status_code} body={upload_response.text}")
-        except Exception:
-            pass
+            with open(path, "rb") as f:
+                upload_response = requests.put(inbox["upload_url"], headers=upload_headers, data=f)
+            # Log raw upload response
+            try:
+                logger.info("TikTok UPLOAD raw: status=%s body=%s", upload_response.status_code, upload_response.text)
+            except Exception:
+                pass
+            
+            if upload_response.status_code not in (200, 201, 202, 204):
+                logger.error("TikTok upload PUT failed: status=%s body=%s", upload_response.status_code, upload_response.text)
+                if 400 <= upload_response.status_code < 500:
+                    # Upload URL rejected - the next attempt initializes a new one
+                    saga.discard("init")
+                raise HTTPException(status_code=400, detail="Failed to upload video file")
+            return True
         
-        if upload_response.status_code not in (200, 201, 202, 204):
-            logger.error(f"TikTok upload PUT failed: status={upload_response.status_code} body={upload_response.text}")
-            raise HTTPException(status_code=400, detail="Failed to upload video file")
+        with span("tiktok_upload", bytes=file_size):
+            saga.stage("uploaded", put_video)
+        saga.finish()
         
-        # Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-            temp_path = None
+        profile_cache.invalidate("tiktok", user_id)
         
         # Inbox flow complete – user gets a TikTok notification to finish posting
         social_logger.info(f"TIKTOK_UPLOAD_SUCCESS - User: {user_id} | Publish ID: {publish_id}")
-        logger.info(f"TikTok inbox upload initialized and file uploaded for user: {user_id}")
+        publish_events.record("tiktok", user_id, UPLOAD_SUCCESS, publish_id)
+        logger.info("TikTok inbox upload initialized and file uploaded for user: %s", user_id)
+        return {"publish_id": publish_id}
+    
+    except Exception as e:
+        # Every failure after UPLOAD_START is recorded, including the HTTPExceptions raised for init/PUT errors
+        if started:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            social_logger.error(f"TIKTOK_UPLOAD_FAILED - User: {user_id} | File: {os.path.basename(path) if path else 'from_url'} | Error: {error}")
+            publish_events.record("tiktok", user_id, UPLOAD_FAILED, error=error)
+        raise
+    finally:
+        # Clean up downloaded file
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+@app.post("/api/tiktok/upload-video")
+@idempotent
+async def upload_tiktok_video(
+    request: Request,
+    video: UploadFile | None = File(None),
+    description: str = Form(""),
+    user_id: str = Form(""),
+    video_url: str | None = Form(None)
+):
+    """
+    Upload video to TikTok
+    
+    Send ``Prefer: respond-async`` to queue the upload and get 202 with a job id.
+    """
+    temp_path = None
+    try:
+        logger.info("TikTok upload attempt for user_id: %s", user_id)
+        
+        # Validate user session
+        if not user_id or user_id not in tiktok_sessions:
+            raise HTTPException(status_code=401, detail="Not logged in to TikTok")
+        
+        if not video_url and not video:
+            raise HTTPException(status_code=400, detail="No video provided")
+        
+        if prefers_async(request):
+            return await accept_job("tiktok_video", {
+                "user_id": user_id,
+                "description": description,
+                "path": None if video_url else await spool_upload(video),
+                "video_url": video_url
+            })
+        
+        # Save uploaded video temporarily (URL sources are downloaded by the upload itself)
+        if not video_url:
+            temp_path = f"/tmp/tiktok_upload_{user_id}_{video.filename}"
+            await executors.run("storage", write_file, temp_path, await video.read())
+        
+        result = await executors.run("tiktok", publish_tiktok_video, user_id, description, temp_path, video_url)
         return JSONResponse({
             "success": True,
             "message": "TikTok inbox upload ready. Finish posting in TikTok app.",
-            "publish_id": publish_id
+            "publish_id": result["publish_id"]
         })
         
     except HTTPException:
-        # Clean up temp file on error
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
         raise
     except Exception as e:
-        # Clean up temp file on error
+        logger.error("TikTok upload error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        # Clean up temp file
         if temp_path and os.path.exists(temp_path):
             os.remove(temp_path)
-        social_logger.error(f"TIKTOK_UPLOAD_FAILED - User: {user_id} | File: {video.filename} | Error: {str(e)}")
-        logger.error(f"TikTok upload error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
-@app.post("/api/tiktok/logout")
-async def tiktok_logout(request: TikTokLogoutRequest):
-    """
-    Logout from TikTok - validates token first, then calls official /oauth/revoke/ endpoint
-    """
+def perform_tiktok_logout(request: TikTokLogoutRequest):
+    """Logout from TikTok (blocking - runs on the tiktok executor)"""
     try:
         import requests
         
@@ -2075,9 +3053,13 @@ async def tiktok_logout(request: TikTokLogoutRequest):
             session = tiktok_sessions[request.user_id]
             access_token = session.get("access_token")
             
-            # Step 1: Validate token by attempting to fetch user info
+            # Step 1: Validate token (cached verdict, else fetch user info)
             token_valid = False
-            if access_token:
+            verdict = token_states.verdict(access_token)
+            if verdict is not None:
+                token_valid = verdict['valid']
+                logger.info(f"Using cached TikTok token verdict for user: {request.user_id}")
+            elif access_token:
                 try:
                     token_info_url = "https://open.tiktokapis.com/v2/user/info/?fields=open_id,display_name,avatar_url"
                     token_headers = {
@@ -2095,7 +3077,7 @@ async def tiktok_logout(request: TikTokLogoutRequest):
                         else:
                             logger.info(f"TikTok token validation failed: Invalid response structure for user: {request.user_id}")
                     else:
-                        logger.info(f"TikTok token validation failed: {token_response.status_code} - {token_response.text}")
+                        logger.info("TikTok token validation failed: %s - %s", token_response.status_code, token_response.text)
                 except Exception as validation_error:
                     logger.info(f"TikTok token validation error: {str(validation_error)}")
             
@@ -2127,7 +3109,10 @@ async def tiktok_logout(request: TikTokLogoutRequest):
                 logger.info(f"TikTok token was already invalid, skipping revoke for user: {request.user_id}")
             
             # Delete local session
+            token_states.forget(access_token)
             del tiktok_sessions[request.user_id]
+            token_refresher.cancel("tiktok", request.user_id)
+            profile_cache.invalidate("tiktok", request.user_id)
             logger.info(f"TikTok logout successful for user: {request.user_id}")
         
         return JSONResponse({
@@ -2140,14 +3125,83 @@ async def tiktok_logout(request: TikTokLogoutRequest):
         raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
 
 
+@app.post("/api/tiktok/logout")
+async def tiktok_logout(request: TikTokLogoutRequest):
+    """
+    Logout from TikTok - validates token first, then calls official /oauth/revoke/ endpoint
+    """
+    return await executors.run("tiktok", perform_tiktok_logout, request)
+
+
+def validate_tiktok_session(user_id: str, access_token: str) -> dict:
+    """
+    Validate a TikTok access token by calling /v2/user/info/ (blocking)
+    
+    Returns:
+        Validate endpoint response payload
+    """
+    try:
+        token_info_url = "https://open.tiktokapis.com/v2/user/info/?fields=open_id,display_name,avatar_url"
+        token_headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        logger.info(f"Validating TikTok access token for user: {user_id}")
+        token_response = requests.get(token_info_url, headers=token_headers)
+        
+        if token_response.status_code == 200:
+            token_data = token_response.json()
+            if token_data.get("data", {}).get("user"):
+                user_info = token_data.get("data", {}).get("user", {})
+                logger.info(f"TikTok token validated successfully for user: {user_id}")
+                result = {
+                    "success": True,
+                    "is_valid": True,
+                    "user": {
+                        "open_id": user_info.get("open_id"),
+                        "display_name": user_info.get("display_name"),
+                        "avatar_url": user_info.get("avatar_url")
+                    }
+                }
+                token_states.record_valid("tiktok", access_token, details=result)
+                return result
+            else:
+                logger.info(f"TikTok token validation failed: Invalid response structure for user: {user_id}")
+                return {
+                    "success": False,
+                    "is_valid": False,
+                    "error": "Invalid response structure"
+                }
+        else:
+            logger.info("TikTok token validation failed: %s - %s", token_response.status_code, token_response.text)
+            try:
+                error_payload = token_response.json()
+            except Exception:
+                error_payload = None
+            if is_auth_failure(token_response.status_code, error_payload):
+                token_states.record_invalid("tiktok", access_token, f"Token validation failed: {token_response.status_code}")
+            return {
+                "success": False,
+                "is_valid": False,
+                "error": f"Token validation failed: {token_response.status_code}",
+                "status_code": token_response.status_code
+            }
+    except Exception as validation_error:
+        logger.error(f"TikTok token validation error: {str(validation_error)}")
+        return {
+            "success": False,
+            "is_valid": False,
+            "error": f"Validation error: {str(validation_error)}"
+        }
+
+
 @app.post("/api/tiktok/validate")
 async def tiktok_validate(request: TikTokValidateRequest):
     """
     Validate TikTok access token using /v2/user/info/ endpoint
+    Concurrent validations for the same user share one upstream request.
     """
     try:
-        import requests
-        
         if request.user_id not in tiktok_sessions:
             return JSONResponse({
                 "success": False,
@@ -2165,57 +3219,121 @@ async def tiktok_validate(request: TikTokValidateRequest):
                 "error": "No access token found"
             })
         
-        # Validate token by calling /v2/user/info/
-        try:
-            token_info_url = "https://open.tiktokapis.com/v2/user/info/?fields=open_id,display_name,avatar_url"
-            token_headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            logger.info(f"Validating TikTok access token for user: {request.user_id}")
-            token_response = requests.get(token_info_url, headers=token_headers)
-            
-            if token_response.status_code == 200:
-                token_data = token_response.json()
-                if token_data.get("data", {}).get("user"):
-                    user_info = token_data.get("data", {}).get("user", {})
-                    logger.info(f"TikTok token validated successfully for user: {request.user_id}")
-                    return JSONResponse({
-                        "success": True,
-                        "is_valid": True,
-                        "user": {
-                            "open_id": user_info.get("open_id"),
-                            "display_name": user_info.get("display_name"),
-                            "avatar_url": user_info.get("avatar_url")
-                        }
-                    })
-                else:
-                    logger.info(f"TikTok token validation failed: Invalid response structure for user: {request.user_id}")
-                    return JSONResponse({
-                        "success": False,
-                        "is_valid": False,
-                        "error": "Invalid response structure"
-                    })
-            else:
-                logger.info(f"TikTok token validation failed: {token_response.status_code} - {token_response.text}")
-                return JSONResponse({
-                    "success": False,
-                    "is_valid": False,
-                    "error": f"Token validation failed: {token_response.status_code}",
-                    "status_code": token_response.status_code
-                })
-        except Exception as validation_error:
-            logger.error(f"TikTok token validation error: {str(validation_error)}")
+        # Serve a fresh cached verdict without going upstream
+        verdict = token_states.verdict(access_token)
+        if verdict is not None and verdict['valid'] and verdict.get('details'):
+            return JSONResponse(verdict['details'])
+        if verdict is not None and not verdict['valid']:
             return JSONResponse({
                 "success": False,
                 "is_valid": False,
-                "error": f"Validation error: {str(validation_error)}"
+                "error": verdict['reason']
             })
+        
+        result = await executors.run(
+            "tiktok",
+            upstream_flight.do,
+            ("tiktok", request.user_id, "validate"),
+            lambda: validate_tiktok_session(request.user_id, access_token)
+        )
+        return JSONResponse(result)
     except Exception as e:
         logger.error(f"TikTok validate error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Validation failed: {str(e)}")
 
 
+@app.get("/api/tiktok/user-info")
+async def tiktok_user_info(user_id: str):
+    """
+    Get TikTok user information (served from the profile cache)
+    """
+    try:
+        if user_id not in tiktok_sessions:
+            raise HTTPException(status_code=401, detail="Not logged in to TikTok")
+        
+        def load_user():
+            user_response = requests.get(
+                "https://open.tiktokapis.com/v2/user/info/",
+                headers={
+                    "Authorization": f"Bearer {tiktok_sessions[user_id]['access_token']}",
+                    "Content-Type": "application/json"
+                },
+                params={"fields": TIKTOK_USER_INFO_FIELDS},
+                timeout=30
+            )
+            if user_response.status_code != 200:
+                raise Exception(f"TikTok user info failed: {user_response.status_code} - {user_response.text}")
+            user_data = user_response.json().get("data", {}).get("user", {})
+            return tiktok_profile_from_user_data(user_id, user_data)
+        
+        profile = await executors.run("tiktok", profile_cache.get_or_load, "tiktok", user_id, load_user)
+        
+        return JSONResponse({
+            "success": True,
+            "data": profile
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"TikTok user info error: {str(e)}")
+        # Fall back to the profile captured at login
+        session = tiktok_sessions.get(user_id, {})
+        return JSONResponse({
+            "success": True,
+            "data": {k: v for k, v in session.items() if k != "access_token"}
+        })
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Status of a queued publish/transcode job (result once succeeded, error once dead)
+    """
+    job = await executors.run("storage", job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JSONResponse({
+        "success": True,
+        "data": job_status(job)
+    })
+
+
+def event_time(value: Optional[str], name: str) -> Optional[float]:
+    """Unix seconds or an ISO 8601 date/time (UTC unless it has an offset)"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be Unix seconds or an ISO 8601 date")
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+
+@app.get("/api/publish-events")
+async def get_publish_events(account: Optional[str] = None, platform: Optional[str] = None, event: Optional[str] = None,
+                             since: Optional[str] = None, until: Optional[str] = None, limit: int = 50,
+                             cursor: Optional[int] = None):
+    """
+    Connections and uploads, newest first, filtered by account, platform,
+    event (connected, upload_start, upload_success, upload_failed) and time;
+    pass next_cursor back as cursor for the next page
+    """
+    if event is not None and event not in EVENTS:
+        raise HTTPException(status_code=400, detail=f"event must be one of: {', '.join(EVENTS)}")
+    page = await executors.run(
+        "storage", publish_events.query,
+        account=account, platform=platform, event=event,
+        since=event_time(since, "since"), until=event_time(until, "until"), limit=limit, cursor=cursor
+    )
+    return JSONResponse({
+        "success": True,
+        "data": page
+    })
+
+
 @app.get("/health")
 async def health_check():
     """
@@ -2223,52 +3341,43 @@ async def health_check():
     """
     return {"status": "healthy", "service": "Social Media API"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness: ffmpeg and its encoders, free disk and storage backends, from
+    the cached capability probe (503 until the first probe finished or when
+    transcodes cannot run; "degraded" when a storage backend does not answer)
+    """
+    status, report = capabilities.readiness()
+    report["ffmpeg_workers"] = FFMPEG_WORKERS
+    report["ffmpeg_threads"] = FFMPEG_THREADS
+    return JSONResponse(report, status_code=503 if status == NOT_READY else 200)
+
 @app.get("/api/ffmpeg/status")
 async def check_ffmpeg_status():
-    """Check if FFmpeg is available on the system"""
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], 
-                              capture_output=True, 
-                              text=True, 
-                              timeout=10)
-        
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            return JSONResponse({
-                "success": True,
-                "ffmpeg_available": True,
-                "version": version_line,
-                "message": "FFmpeg is installed and working"
-            })
-        else:
-            return JSONResponse({
-                "success": False,
-                "ffmpeg_available": False,
-                "error": result.stderr,
-                "message": "FFmpeg command failed"
-            })
-            
-    except subprocess.TimeoutExpired:
-        return JSONResponse({
-            "success": False,
-            "ffmpeg_available": False,
-            "error": "FFmpeg check timed out",
-            "message": "FFmpeg check timed out"
-        })
-    except FileNotFoundError:
-        return JSONResponse({
-            "success": False,
-            "ffmpeg_available": False,
-            "error": "FFmpeg not found in PATH",
-            "message": "FFmpeg not installed"
-        })
-    except Exception as e:
+    """Check if FFmpeg is available on the system (from the cached capability probe)"""
+    snapshot = capabilities.snapshot()
+    if snapshot is None:
+        # First probe still running - don't wait on the event loop for it
+        snapshot = await executors.run("storage", capabilities.probe)
+    ffmpeg = snapshot["ffmpeg"]
+    if ffmpeg["available"]:
         return JSONResponse({
-            "success": False,
-            "ffmpeg_available": False,
-            "error": str(e),
-            "message": f"Error checking FFmpeg: {e}"
+            "success": True,
+            "ffmpeg_available": True,
+            "version": ffmpeg["version"],
+            "video_encoder": ffmpeg["video_encoder"],
+            "audio_encoder": ffmpeg["audio_encoder"],
+            "probed_at": snapshot["probed_at"],
+            "message": "FFmpeg is installed and working"
         })
+    return JSONResponse({
+        "success": False,
+        "ffmpeg_available": False,
+        "error": "FFmpeg not found in PATH or not working",
+        "probed_at": snapshot["probed_at"],
+        "message": "FFmpeg not installed"
+    })
 
 @app.get("/api/instagram/webhook")
 async def instagram_webhook_verify(request: Request):
@@ -2301,7 +3410,7 @@ async def instagram_webhook_receive(request: Request):
     """
     try:
         body = await request.json()
-        logger.info(f"Instagram webhook received: {body}")
+        logger.info("Instagram webhook received: %s", body)
         
         # Process webhook data here
         # This is where you'd handle Instagram events like media updates, etc.
@@ -2312,18 +3421,14 @@ async def instagram_webhook_receive(request: Request):
         logger.error(f"Instagram webhook processing error: {str(e)}")
         raise HTTPException(status_code=500, detail="Webhook processing error")
 
-@app.post("/api/instagram/graph/long-lived-token")
-async def get_long_lived_token(request: dict):
-    """
-    Get long-lived access token from short-lived token
-    """
+def perform_long_lived_token_exchange(request: dict):
+    """Get long-lived access token from short-lived token (blocking - runs on the instagram executor)"""
     try:
         access_token = request.get("access_token")
         if not access_token:
             raise HTTPException(status_code=400, detail="Access token is required")
         
-        instagram_graph_api = InstagramGraphAPI()
-        long_lived_token = instagram_graph_api.get_long_lived_token(access_token)
+        long_lived_token = services.instagram_graph.get_long_lived_token(access_token)
         
         return JSONResponse({
             "success": True,
@@ -2340,18 +3445,22 @@ async def get_long_lived_token(request: dict):
             "error": str(e)
         }, status_code=500)
 
-@app.post("/api/instagram/graph/pages")
-async def get_facebook_pages(request: dict):
+
+@app.post("/api/instagram/graph/long-lived-token")
+async def get_long_lived_token(request: dict):
     """
-    Get Facebook pages for the user
+    Get long-lived access token from short-lived token
     """
+    return await executors.run("instagram", perform_long_lived_token_exchange, request)
+
+def perform_get_facebook_pages(request: dict):
+    """Get Facebook pages for the user (blocking - runs on the instagram executor)"""
     try:
         access_token = request.get("access_token")
         if not access_token:
             raise HTTPException(status_code=400, detail="Access token is required")
         
-        instagram_graph_api = InstagramGraphAPI()
-        pages_data = instagram_graph_api.get_user_pages(access_token)
+        pages_data = services.instagram_graph.get_user_pages(access_token)
         
         return JSONResponse({
             "success": True,
@@ -2364,11 +3473,16 @@ async def get_facebook_pages(request: dict):
             "error": str(e)
         }, status_code=500)
 
-@app.post("/api/instagram/graph/instagram-account")
-async def get_instagram_account(request: dict):
+
+@app.post("/api/instagram/graph/pages")
+async def get_facebook_pages(request: dict):
     """
-    Get Instagram Business account from Facebook page
+    Get Facebook pages for the user
     """
+    return await executors.run("instagram", perform_get_facebook_pages, request)
+
+def perform_get_instagram_account(request: dict):
+    """Get Instagram Business account from Facebook page (blocking - runs on the instagram executor)"""
     try:
         page_id = request.get("page_id")
         page_access_token = request.get("page_access_token")
@@ -2376,8 +3490,7 @@ async def get_instagram_account(request: dict):
         if not page_id or not page_access_token:
             raise HTTPException(status_code=400, detail="Page ID and page access token are required")
         
-        instagram_graph_api = InstagramGraphAPI()
-        ig_data = instagram_graph_api.get_instagram_account(page_id, page_access_token)
+        ig_data = services.instagram_graph.get_instagram_account(page_id, page_access_token)
         
         return JSONResponse({
             "success": True,
@@ -2390,14 +3503,21 @@ async def get_instagram_account(request: dict):
             "error": str(e)
         }, status_code=500)
 
+
+@app.post("/api/instagram/graph/instagram-account")
+async def get_instagram_account(request: dict):
+    """
+    Get Instagram Business account from Facebook page
+    """
+    return await executors.run("instagram", perform_get_instagram_account, request)
+
 @app.get("/api/instagram/platform/auth-url")
 async def instagram_platform_auth_url():
     """
     Get Instagram Platform OAuth authorization URL (direct Instagram auth, no Facebook pages required)
     """
     try:
-        instagram_platform_api = InstagramPlatformAPI()
-        auth_url = instagram_platform_api.get_auth_url()
+        auth_url = services.instagram_platform.get_auth_url()
         
         return JSONResponse({
             "success": True,
@@ -2410,30 +3530,25 @@ async def instagram_platform_auth_url():
             "error": str(e)
         }, status_code=500)
 
-@app.post("/api/instagram/platform/login")
-async def instagram_platform_login(request: dict):
-    """
-    Instagram Platform OAuth login (direct Instagram auth, no Facebook pages required)
-    """
+def perform_instagram_platform_login(request: dict):
+    """Instagram Platform OAuth login (blocking - runs on the instagram executor)"""
     try:
         code = request.get("code")
         if not code:
             raise HTTPException(status_code=400, detail="Authorization code is required")
         
-        instagram_platform_api = InstagramPlatformAPI()
-        
         # Exchange code for access token
-        token_data = instagram_platform_api.exchange_code_for_token(code)
+        token_data = services.instagram_platform.exchange_code_for_token(code)
         access_token = token_data.get("access_token")
         
         if not access_token:
             raise HTTPException(status_code=400, detail="No access token received")
         
         # Get long-lived token
-        long_lived_token = instagram_platform_api.get_long_lived_token(access_token)
+        long_lived_token = services.instagram_platform.get_long_lived_token(access_token)
         
         # Get user info
-        user_info = instagram_platform_api.get_user_info(long_lived_token)
+        user_info = services.instagram_platform.get_user_info(long_lived_token)
         
         return JSONResponse({
             "success": True,
@@ -2447,16 +3562,246 @@ async def instagram_platform_login(request: dict):
             }
         })
     except Exception as e:
-        logger.error(f"Instagram Platform login error: {str(e)}")
+        logger.error("Instagram Platform login error: %s", e)
         return JSONResponse({
             "success": False,
             "error": str(e)
         }, status_code=500)
 
 
+@app.post("/api/instagram/platform/login")
+async def instagram_platform_login(request: dict):
+    """
+    Instagram Platform OAuth login (direct Instagram auth, no Facebook pages required)
+    """
+    return await executors.run("instagram", perform_instagram_platform_login, request)
+
+
 # Load existing sessions on startup
-# Sessions are now stored in memory only - no persistence across restarts
-# Users will need to reconnect after server restarts
+# YouTube, TikTok and Instagram Graph/Meta sessions live in the session store
+# (SESSION_STORE_URL) and survive restarts without loading anything here
+
+def refresh_instagram_graph_token(ig_user_id: str) -> Optional[float]:
+    """
+    Renew the long-lived user token before it expires and re-derive the
+    page token from it (page tokens from a long-lived user token don't expire)
+    
+    Returns:
+        Expiry of the long-lived user token, or None if it can't be renewed
+    """
+    session = instagram_graph_sessions.get(ig_user_id)
+    if not session or not session.get('user_access_token'):
+        return None
+    
+    def refresh():
+        user_token = session['user_access_token']
+        expires_at = session.get('user_token_expires_at')
+        fields = {}
+        
+        if expires_at and expires_at - time.time() <= token_refresher.lead_time:
+            try:
+                long_lived = services.instagram_graph.exchange_long_lived_token(user_token)
+            except HTTPException as e:
+                if e.status_code == 400:
+                    token_states.record_invalid("instagram_graph", session.get('access_token'), f"long-lived token renewal rejected: {e.detail}")
+                    logger.warning(f"Instagram Graph token renewal rejected for user {ig_user_id}: {e.detail}")
+                    return None
+                raise
+            user_token = long_lived['access_token']
+            expires_at = time.time() + long_lived['expires_in'] if long_lived.get('expires_in') else None
+            fields['user_access_token'] = user_token
+            fields['user_token_expires_at'] = expires_at
+            logger.info(f"Renewed Instagram Graph long-lived token for user: {ig_user_id}")
+        
+        if session.get('page_id'):
+            page_token = services.instagram_graph.get_page_access_token(session['page_id'], user_token)
+            if page_token != session.get('access_token'):
+                fields['access_token'] = page_token
+                token_states.forget(session.get('access_token'))
+                token_states.record_valid("instagram_graph", page_token)
+        
+        if fields:
+            instagram_graph_sessions.patch(ig_user_id, fields)
+        return expires_at
+    
+    return upstream_flight.do(("instagram_graph", ig_user_id, "refresh"), refresh)
+
+
+token_refresher.add_refresher("youtube", refresh_youtube_token)
+token_refresher.add_refresher("tiktok", refresh_tiktok_token)
+token_refresher.add_refresher("instagram_graph", refresh_instagram_graph_token)
+
+
+def schedule_stored_token_refreshes():
+    """Queue every stored credential that can be refreshed, ordered by expiry"""
+    now = time.time()
+    for user_id, session in youtube_sessions.items():
+        creds_dict = session.get('credentials') or {}
+        if creds_dict.get('refresh_token'):
+            expires_at = youtube_token_expires_at(youtube_credentials_from_dict(creds_dict))
+            token_refresher.schedule("youtube", user_id, expires_at or now)
+    for open_id, session in tiktok_sessions.items():
+        if session.get('refresh_token'):
+            token_refresher.schedule("tiktok", open_id, session.get('expires_at') or now)
+    for ig_user_id, session in instagram_graph_sessions.items():
+        if session.get('user_access_token') and session.get('user_token_expires_at'):
+            token_refresher.schedule("instagram_graph", ig_user_id, session['user_token_expires_at'])
+
+
+@app.on_event("startup")
+async def start_token_refresher():
+    """Start background token refresh for all stored credentials"""
+    try:
+        schedule_stored_token_refreshes()
+    except Exception as e:
+        logger.error(f"Failed to schedule stored token refreshes: {e}")
+    token_refresher.start()
+
+
+@app.on_event("shutdown")
+async def stop_token_refresher():
+    token_refresher.stop()
+
+
+@app.on_event("shutdown")
+async def stop_executors():
+    executors.shutdown()
+
+# Platform SDKs are imported in the background once the app serves requests
+# (PREWARM_IMPORTS=false imports them only when a route first needs them)
+PREWARM_IMPORTS = os.getenv('PREWARM_IMPORTS', 'true').lower() == 'true'
+
+@app.on_event("startup")
+async def prewarm_platform_imports():
+    if PREWARM_IMPORTS:
+        prewarm()
+
+# Event-loop lag and the call sites blocking it (see /api/debug/event-loop)
+loop_monitor = LoopMonitor(threshold=float(os.getenv('LOOP_STALL_THRESHOLD_MS', '100')) / 1000)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    loop_monitor.stop()
+
+# ffmpeg encoders, free disk and storage reachability, probed at startup and
+# every CAPABILITY_REFRESH_INTERVAL seconds (served by /ready)
+capabilities = Capabilities(
+    {
+        "scratch": tempfile.gettempdir(),
+        "static": "static",
+        "sessions": SESSIONS_DIR,
+        "job_spool": JOB_SPOOL_DIR
+    },
+    storage_status=lambda: services.file_uploads.storage_status(),
+    refresh_interval=float(os.getenv('CAPABILITY_REFRESH_INTERVAL', '3600')),
+    min_free_mb=float(os.getenv('READY_MIN_FREE_DISK_MB', '500'))
+)
+
+@app.on_event("startup")
+async def start_capability_probe():
+    capabilities.start()
+
+@app.on_event("shutdown")
+async def stop_capability_probe():
+    capabilities.stop()
+
+
+@app.on_event("startup")
+async def purge_publish_checkpoints():
+    """Drop checkpoints of publishes abandoned long ago"""
+    try:
+        await executors.run("storage", publish_sagas.purge)
+    except Exception as e:
+        logger.error(f"Failed to purge publish checkpoints: {e}")
+
+@app.on_event("startup")
+async def compact_publish_events():
+    """Drop publish events past retention"""
+    try:
+        await executors.run("storage", publish_events.compact)
+    except Exception as e:
+        logger.error(f"Failed to compact publish events: {e}")
+
+
+# Job handlers run by job_worker.py processes (payload keys are the function arguments)
+JOB_HANDLERS = {
+    "reels_transcode": lambda payload: transcode_video_for_reels(**payload),
+    "instagram_reel": lambda payload: publish_instagram_reel(**payload),
+    "instagram_graph_media": lambda payload: publish_instagram_graph_media(**payload),
+    "youtube_short": lambda payload: publish_youtube_short(**payload),
+    "tiktok_video": lambda payload: publish_tiktok_video(**payload),
+}
+
+def job_error_is_permanent(error: Exception) -> bool:
+    """Client errors (bad input, expired session) fail the job without retrying"""
+    if isinstance(error, PermanentJobError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code is not None and 400 <= status_code < 500 and status_code != 429
+
+def finalize_job(job: dict):
+    """Delete a finished job's spooled upload"""
+    path = job["payload"].get("path")
+    if path and os.path.dirname(os.path.abspath(path)) == os.path.abspath(JOB_SPOOL_DIR) and os.path.exists(path):
+        os.remove(path)
+
+def traced_job_handler(kind: str, handler):
+    """Run a job handler as a trace continuing the one of the request that queued it"""
+    def run(payload: dict):
+        payload = dict(payload)
+        with tracer.trace(f"job {kind}", payload.pop(JOB_TRACEPARENT, None), kind="consumer"):
+            return handler(payload)
+    return run
+
+def create_job_worker(name: str) -> JobWorker:
+    """Job worker consuming every job kind this API can queue"""
+    handlers = {kind: traced_job_handler(kind, handler) for kind, handler in JOB_HANDLERS.items()}
+    return JobWorker(
+        job_queue, handlers, name,
+        is_permanent=job_error_is_permanent,
+        finalize=finalize_job
+    )
+
+
+def start_job_workers():
+    """
+    Start JOB_WORKERS worker processes, once per API process. Each worker
+    imports this whole module, so they only start when there is work to do.
+    """
+    if job_worker_processes or not JOB_WORKERS:
+        return
+    import job_worker
+    context = multiprocessing.get_context("spawn")
+    for index in range(JOB_WORKERS):
+        process = context.Process(target=job_worker.worker_main, name=f"job-worker-{index}", daemon=True)
+        process.start()
+        job_worker_processes.append(process)
+    logger.info(f"Started {JOB_WORKERS} job worker process(es)")
+
+
+@app.on_event("startup")
+async def resume_job_workers():
+    """Start the workers right away when jobs left by a crash or restart are waiting"""
+    try:
+        counts = job_queue.stats()
+    except Exception as e:
+        logger.error(f"Failed to read job queue state: {e}")
+        return
+    if counts[QUEUED] or counts[RUNNING]:
+        start_job_workers()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    # Interrupted jobs are re-delivered once their lease expires
+    for process in job_worker_processes:
+        process.terminate()
+    for process in job_worker_processes:
+        process.join(timeout=5)
 
 # def load_existing_sessions():
 #     """Load existing sessions from file on startup"""
@@ -2480,6 +3825,16 @@ async def instagram_platform_login(request: dict):
 # Load sessions on startup
 # load_existing_sessions()
 
+# Debug endpoints that change server state or load it require this token (disabled when unset)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+def require_admin(request: Request):
+    """Reject the request unless it carries the admin token in X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
 # Debug endpoints for production testing
 @app.get("/api/debug/sessions")
 async def debug_sessions():
@@ -2487,10 +3842,9 @@ async def debug_sessions():
     Debug endpoint to check stored sessions
     """
     try:
-        # Get sessions from memory (not disk)
-        logger.info(f"[DEBUG] Checking instagram_graph_sessions in memory")
-        logger.info(f"[DEBUG] Total sessions in memory: {len(instagram_graph_sessions)}")
-        logger.info(f"[DEBUG] Session keys: {list(instagram_graph_sessions.keys())}")
+        # Get sessions from the session store
+        logger.info(f"[DEBUG] Checking instagram_graph_sessions in the session store")
+        logger.info(f"[DEBUG] Total sessions in the session store: {len(instagram_graph_sessions)}")
         
         # Mask sensitive data
         safe_sessions = {}
@@ -2502,13 +3856,12 @@ async def debug_sessions():
                 'followers_count': session.get('followers_count'),
                 'media_count': session.get('media_count'),
                 'account_type': session.get('account_type'),
-                'has_access_token': bool(session.get('access_token')),
-                'access_token_preview': session.get('access_token', '')[:10] + '...' if session.get('access_token') else None
+                'has_access_token': bool(session.get('access_token'))
             }
         
         return JSONResponse({
             "success": True,
-            "message": f"Found {len(instagram_graph_sessions)} Instagram Graph sessions in memory",
+            "message": f"Found {len(instagram_graph_sessions)} Instagram Graph sessions in the session store",
             "sessions": safe_sessions
         })
     except Exception as e:
@@ -2530,8 +3883,8 @@ async def debug_sessions_full():
         
         return JSONResponse({
             "success": True,
-            "message": f"Found {len(instagram_graph_sessions)} Instagram Graph sessions in memory",
-            "sessions": instagram_graph_sessions,
+            "message": f"Found {len(instagram_graph_sessions)} Instagram Graph sessions in the session store",
+            "sessions": dict(instagram_graph_sessions.items()),
             "warning": "This endpoint exposes sensitive data - use only for debugging"
         })
     except Exception as e:
@@ -2542,6 +3895,201 @@ async def debug_sessions_full():
             "details": str(e)
         })
 
+@app.get("/api/debug/executors")
+async def debug_executors():
+    """
+    Debug endpoint with per-executor concurrency, queue depth and saturation
+    """
+    return JSONResponse({
+        "success": True,
+        "data": executors.stats()
+    })
+
+@app.get("/api/debug/services")
+async def debug_services():
+    """
+    Debug endpoint listing the shared service objects, how often each was
+    built and whether its configuration changed since
+    """
+    return JSONResponse({
+        "success": True,
+        "data": services.stats()
+    })
+
+@app.post("/api/debug/services/reload")
+async def debug_reload_services(request: Request):
+    """
+    Re-read the .env file; services whose configuration changed are rebuilt
+    on their next use (admin only)
+    """
+    require_admin(request)
+    load_dotenv(override=True)
+    return JSONResponse({
+        "success": True,
+        "data": services.stats()
+    })
+
+@app.get("/api/debug/imports")
+async def debug_imports():
+    """
+    Debug endpoint showing which lazily imported platform SDKs are loaded,
+    how long each import took and whether a request or the prewarm loaded it
+    """
+    return JSONResponse({
+        "success": True,
+        "data": import_status()
+    })
+
+@app.get("/api/debug/jobs")
+async def debug_jobs():
+    """
+    Debug endpoint with job counts by state and the most recent dead letters
+    """
+    return JSONResponse({
+        "success": True,
+        "data": {
+            "counts": await executors.run("storage", job_queue.stats),
+            "workers": [{"name": p.name, "pid": p.pid, "alive": p.is_alive()} for p in job_worker_processes],
+            "dead_letters": [job_status(job) for job in await executors.run("storage", job_queue.dead_letters)]
+        }
+    })
+
+@app.post("/api/debug/jobs/{job_id}/retry")
+async def debug_retry_job(request: Request, job_id: str):
+    """
+    Re-queue a dead-lettered job (admin only)
+    """
+    require_admin(request)
+    if not await executors.run("storage", job_queue.retry_dead, job_id):
+        raise HTTPException(status_code=404, detail="No dead-lettered job with that id")
+    return JSONResponse({
+        "success": True,
+        "message": f"Job {job_id} re-queued"
+    })
+
+@metrics_registry.collector
+def collect_service_metrics():
+    """Executor, job queue and session gauges, read when /metrics is scraped"""
+    executor_stats = executors.stats()
+    job_counts = job_queue.stats()
+    sessions = {
+        "instagram": instagram_session_journal.count("instagram"),
+        "instagram_graph": len(instagram_graph_sessions),
+        "instagram_meta": len(instagram_meta_sessions),
+        "youtube": len(youtube_sessions),
+        "tiktok": len(tiktok_sessions)
+    }
+    log_stats = log_pipeline.stats()
+    return {
+        "executor_active": ("Calls running on a named executor",
+                            [({"executor": name}, stats["active"]) for name, stats in executor_stats.items()]),
+        "executor_queued": ("Calls waiting for a named executor",
+                            [({"executor": name}, stats["queued"]) for name, stats in executor_stats.items()]),
+        "executor_saturation": ("Share of a named executor's workers and queue in use (0-1)",
+                                [({"executor": name}, stats["saturation"]) for name, stats in executor_stats.items()]),
+        "executor_rejected": ("Calls rejected by a named executor since start",
+                              [({"executor": name}, stats["rejected"]) for name, stats in executor_stats.items()]),
+        "job_queue_jobs": ("Jobs in the durable queue by state",
+                           [({"state": state}, count) for state, count in job_counts.items()]),
+        "job_workers_alive": ("Job worker processes started by this API process that are alive",
+                              [({}, sum(1 for p in job_worker_processes if p.is_alive()))]),
+        "active_sessions": ("Stored sessions per platform",
+                            [({"platform": platform}, count) for platform, count in sessions.items()]),
+        "instagrapi_resident_clients": ("instagrapi clients held in memory",
+                                        [({}, instagram_clients.stats()["resident"])]),
+        "log_records_queued": ("Log records waiting for the writer thread",
+                               [({}, log_stats["queued"])]),
+        "log_records_dropped": ("Log records dropped because the log queue was full",
+                                [({}, log_stats["dropped"])])
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Metrics in the Prometheus text format (route latency, upstream calls,
+    ffmpeg, executor and job queue depths, sessions)
+    """
+    return Response(await executors.run("storage", metrics_registry.render), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/debug/event-loop")
+async def debug_event_loop():
+    """
+    Debug endpoint with event-loop lag percentiles and the call sites that
+    blocked the loop longest (with a sample stack each)
+    """
+    return JSONResponse({
+        "success": True,
+        "data": loop_monitor.stats(top=20)
+    })
+
+@app.post("/api/debug/event-loop/reset")
+async def debug_reset_event_loop(request: Request):
+    """
+    Forget recorded blocking call sites (e.g. after deploying a fix; admin only)
+    """
+    require_admin(request)
+    loop_monitor.reset()
+    return JSONResponse({
+        "success": True,
+        "message": "Event loop statistics reset"
+    })
+
+# On-demand CPU profiles of this process (see /api/debug/profile)
+profiler = SamplingProfiler(
+    interval=float(os.getenv('PROFILER_INTERVAL_MS', '10')) / 1000,
+    max_overhead=float(os.getenv('PROFILER_MAX_OVERHEAD', '0.02'))
+)
+
+@app.get("/api/debug/profile")
+async def debug_profile(request: Request, seconds: float = 30, format: str = "speedscope", include_idle: bool = False):
+    """
+    Sample this process's stacks for ``seconds`` and return the CPU profile:
+    ``speedscope`` JSON (open at https://www.speedscope.app) or ``collapsed``
+    stacks (flamegraph.pl). Waiting threads are skipped unless include_idle.
+    Admin only: the stacks expose code paths and argument-bearing frames.
+    """
+    require_admin(request)
+    if not 0 < seconds <= 300:
+        raise HTTPException(status_code=400, detail="seconds must be between 0 and 300")
+    if format not in ("speedscope", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be speedscope or collapsed")
+    try:
+        profiler.start(seconds, include_idle=include_idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    await asyncio.sleep(seconds)
+    profile = await executors.run("storage", profiler.stop, False)
+    logger.info(f"CPU profile recorded: {profile.summary()}")
+    
+    if format == "collapsed":
+        return Response(profile.collapsed(), media_type="text/plain")
+    filename = f"profile-{int(profile.started_at)}.speedscope.json"
+    return JSONResponse(profile.speedscope(), headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/api/debug/publishes")
+async def debug_publishes():
+    """
+    Debug endpoint listing unfinished publishes and their checkpointed stages
+    """
+    return JSONResponse({
+        "success": True,
+        "data": await executors.run("storage", publish_sagas.pending)
+    })
+
+@app.get("/api/debug/instagram/clients")
+async def debug_instagram_clients():
+    """
+    Debug endpoint with instagrapi client registry and worker pool metrics
+    """
+    return JSONResponse({
+        "success": True,
+        "data": {
+            **instagram_clients.stats(),
+            "pool": instagrapi_pool.stats() if instagrapi_pool is not None else None
+        }
+    })
+
 @app.get("/api/debug/instagram/status")
 async def debug_instagram_status():
     """
@@ -2549,27 +4097,27 @@ async def debug_instagram_status():
     """
     try:
         # Test credentials
-        if not instagram_graph_api.validate_credentials():
+        if not services.instagram_graph.validate_credentials():
             return JSONResponse({
                 "success": False,
                 "error": "Instagram Graph API credentials not configured",
                 "details": {
-                    "app_id": instagram_graph_api.app_id,
-                    "redirect_uri": instagram_graph_api.redirect_uri,
-                    "scopes": instagram_graph_api.scopes
+                    "app_id": services.instagram_graph.app_id,
+                    "redirect_uri": services.instagram_graph.redirect_uri,
+                    "scopes": services.instagram_graph.scopes
                 }
             })
         
         # Test auth URL generation
         try:
-            auth_url, state = instagram_graph_api.get_auth_url()
+            auth_url, state = services.instagram_graph.get_auth_url()
             return JSONResponse({
                 "success": True,
                 "message": "Instagram Graph API is properly configured",
                 "details": {
-                    "app_id": instagram_graph_api.app_id,
-                    "redirect_uri": instagram_graph_api.redirect_uri,
-                    "scopes": instagram_graph_api.scopes,
+                    "app_id": services.instagram_graph.app_id,
+                    "redirect_uri": services.instagram_graph.redirect_uri,
+                    "scopes": services.instagram_graph.scopes,
                     "auth_url": auth_url,
                     "state": state
                 }
@@ -2589,11 +4137,8 @@ async def debug_instagram_status():
             "details": str(e)
         })
 
-@app.post("/api/debug/instagram/test-token")
-async def debug_test_token(request: dict):
-    """
-    Debug endpoint to test access token and get detailed info
-    """
+def perform_debug_test_token(request: dict):
+    """Debug endpoint to test access token and get detailed info (blocking - runs on the instagram executor)"""
     try:
         access_token = request.get('access_token')
         if not access_token:
@@ -2604,7 +4149,7 @@ async def debug_test_token(request: dict):
         
         # Test access token validation
         try:
-            user_info = instagram_graph_api.get_user_info(access_token)
+            user_info = services.instagram_graph.get_user_info(access_token)
             logger.info(f"Debug - User info: {user_info}")
         except Exception as e:
             return JSONResponse({
@@ -2615,7 +4160,7 @@ async def debug_test_token(request: dict):
         
         # Test Facebook Pages retrieval
         try:
-            pages_data = instagram_graph_api.get_user_pages(access_token)
+            pages_data = services.instagram_graph.get_user_pages(access_token)
             pages = pages_data.get('data', [])
             
             # Check Instagram connections
@@ -2656,6 +4201,14 @@ async def debug_test_token(request: dict):
             "details": str(e)
         })
 
+
+@app.post("/api/debug/instagram/test-token")
+async def debug_test_token(request: dict):
+    """
+    Debug endpoint to test access token and get detailed info
+    """
+    return await executors.run("instagram", perform_debug_test_token, request)
+
 @app.get("/api/debug/login-history")
 async def debug_login_history():
     """
@@ -2670,8 +4223,7 @@ async def debug_login_history():
         for user_id, session in instagram_graph_sessions.items():
             sessions_detail[user_id] = {
                 'username': session.get('username'),
-                'has_token': bool(session.get('access_token')),
-                'token_preview': session.get('access_token', '')[:20] + '...' if session.get('access_token') else None
+                'has_token': bool(session.get('access_token'))
             }
         
         return JSONResponse({
@@ -2681,7 +4233,7 @@ async def debug_login_history():
                 "total_sessions": session_count,
                 "sessions": sessions_detail,
                 "session_keys": list(instagram_graph_sessions.keys()),
-                "note": "This shows current in-memory sessions. Sessions are lost on server restart."
+                "note": "This shows sessions from the persistent session store. Sessions survive server restarts."
             }
         })
     except Exception as e:
@@ -2699,7 +4251,6 @@ if __name__ == "__main__":
         app, 
         host="0.0.0.0", 
         port=port,
-        log_level="error",  # Only show errors, not INFO messages
-        access_log=False  # Completely disable access logs
+        log_config=None  # Logging is set up above (LOG_LEVEL, LOG_ACCESS)
     )
 # Backend restart trigger - Sun Oct 26 10:49:19 EDT 2025
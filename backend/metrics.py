@@ -0,0 +1,489 @@
+"""
+Metrics
+Dependency-free metrics registry (counters, gauges, histograms) rendered in
+the Prometheus text exposition format, plus the instrumentation feeding it:
+an ASGI middleware for routes and hooks on the HTTP clients used to reach
+upstreams (requests, httplib2 for the YouTube API, boto3 for S3), which
+also open a tracing span per call
+
+Metrics are per process: scrape every API instance (and worker process
+that exposes /metrics) separately.
+"""
+
+import re
+import time
+import bisect
+import functools
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import tracing
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds, from fast API calls to long uploads and transcodes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+# Upstream name by host suffix (first match wins)
+UPSTREAMS = (
+    ("graph.facebook.com", "graph"),
+    ("graph.instagram.com", "graph"),
+    ("api.instagram.com", "instagram_oauth"),
+    ("instagram.com", "instagram"),
+    ("tiktokapis.com", "tiktok"),
+    ("tiktok.com", "tiktok"),
+    ("youtube.googleapis.com", "youtube"),
+    ("oauth2.googleapis.com", "google_oauth"),
+    ("googleapis.com", "youtube"),
+    ("cloudinary.com", "cloudinary"),
+    ("amazonaws.com", "s3"),
+)
+
+
+def upstream_name(host: Optional[str]) -> str:
+    """Bounded label for an upstream host"""
+    host = (host or "").lower()
+    for suffix, name in UPSTREAMS:
+        if host == suffix or host.endswith("." + suffix):
+            return name
+    return "other"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base for labelled metrics; values are keyed by label values"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if not re.fullmatch(r"[a-zA-Z_:][a-zA-Z0-9_:]*", name):
+            raise ValueError(f"Invalid metric name: {name}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples()
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Metric):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets (with _sum and _count)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # [per-bucket counts (+Inf last), sum]
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class Registry:
+    """
+    Named metrics plus collectors evaluated at scrape time
+
+    A collector returns gauges read from live state (executor queues, job
+    counts, session counts) as ``{name: (documentation, [(labels, value)])}``.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Dict[str, Tuple[str, Iterable[Tuple[Dict[str, Any], float]]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, fn: Callable[[], Dict[str, Tuple[str, Iterable[Tuple[Dict[str, Any], float]]]]]):
+        """Register a scrape-time collector (usable as a decorator)"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        """Everything in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collect, '__name__', collect)} failed: {e}")
+                continue
+            for name, (documentation, samples) in families.items():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} gauge")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_request_duration = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+http_requests_in_flight = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests being handled")
+http_request_bytes = REGISTRY.counter(
+    "http_request_bytes_total", "Request body bytes received by route", ("route",))
+http_response_bytes = REGISTRY.counter(
+    "http_response_bytes_total", "Response body bytes sent by route", ("route",))
+
+upstream_requests = REGISTRY.counter(
+    "upstream_requests_total", "Calls to upstream APIs by outcome (status class or error)", ("upstream", "outcome"))
+upstream_request_duration = REGISTRY.histogram(
+    "upstream_request_duration_seconds", "Upstream API call latency", ("upstream",))
+upstream_sent_bytes = REGISTRY.counter(
+    "upstream_sent_bytes_total", "Request body bytes sent to upstream APIs", ("upstream",))
+upstream_received_bytes = REGISTRY.counter(
+    "upstream_received_bytes_total", "Response body bytes received from upstream APIs", ("upstream",))
+
+ffmpeg_runs = REGISTRY.counter(
+    "ffmpeg_runs_total", "ffmpeg invocations by outcome", ("operation", "outcome"))
+ffmpeg_wall_seconds = REGISTRY.histogram(
+    "ffmpeg_wall_seconds", "ffmpeg wall-clock time", ("operation",))
+ffmpeg_cpu_seconds = REGISTRY.histogram(
+    "ffmpeg_cpu_seconds", "ffmpeg user+system CPU time", ("operation",),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200))
+ffmpeg_realtime_factor = REGISTRY.histogram(
+    "ffmpeg_realtime_factor", "Seconds of media processed per wall-clock second", ("operation",),
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64))
+
+
+def _outcome(status: Optional[int], error: Optional[str]) -> str:
+    if error:
+        return f"error:{error}"
+    return f"{status // 100}xx"
+
+
+def record_upstream(host: Optional[str], duration: float, status: Optional[int] = None,
+                    error: Optional[str] = None, sent: int = 0, received: int = 0) -> None:
+    """Record one upstream call"""
+    upstream = upstream_name(host)
+    upstream_requests.inc(upstream=upstream, outcome=_outcome(status, error))
+    upstream_request_duration.observe(duration, upstream=upstream)
+    if sent:
+        upstream_sent_bytes.inc(sent, upstream=upstream)
+    if received:
+        upstream_received_bytes.inc(received, upstream=upstream)
+
+
+def _length(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def instrument_requests() -> None:
+    """Time every call made with requests (module functions and sessions alike)"""
+    from requests.adapters import HTTPAdapter
+
+    if getattr(HTTPAdapter.send, "_instrumented", False):
+        return
+    send = HTTPAdapter.send
+
+    @functools.wraps(send)
+    def instrumented_send(self, request, *args, **kwargs):
+        url = urlsplit(request.url)
+        sent = _length(request.headers.get("Content-Length"))
+        with tracing.span(f"http.{upstream_name(url.hostname)}", "client",
+                          method=request.method, host=url.hostname, path=url.path) as span:
+            started = time.perf_counter()
+            try:
+                response = send(self, request, *args, **kwargs)
+            except Exception as e:
+                record_upstream(url.hostname, time.perf_counter() - started, error=type(e).__name__, sent=sent)
+                raise
+            # Streamed bodies are counted by their declared length
+            record_upstream(url.hostname, time.perf_counter() - started, status=response.status_code, sent=sent,
+                            received=_length(response.headers.get("Content-Length")))
+            if span is not None:
+                span.set(status=response.status_code)
+            return response
+
+    instrumented_send._instrumented = True
+    HTTPAdapter.send = instrumented_send
+
+
+def instrument_httplib2() -> None:
+    """Time every httplib2 call (the transport of the Google API client used for YouTube)"""
+    try:
+        import httplib2
+    except ImportError:
+        return
+
+    if getattr(httplib2.Http.request, "_instrumented", False):
+        return
+    request = httplib2.Http.request
+
+    @functools.wraps(request)
+    def instrumented_request(self, uri, method="GET", body=None, *args, **kwargs):
+        url = urlsplit(uri)
+        sent = len(body) if isinstance(body, (bytes, str)) else 0
+        with tracing.span(f"http.{upstream_name(url.hostname)}", "client",
+                          method=method, host=url.hostname, path=url.path) as span:
+            started = time.perf_counter()
+            try:
+                response, content = request(self, uri, method, body, *args, **kwargs)
+            except Exception as e:
+                record_upstream(url.hostname, time.perf_counter() - started, error=type(e).__name__, sent=sent)
+                raise
+            record_upstream(url.hostname, time.perf_counter() - started, status=response.status, sent=sent,
+                            received=len(content or b""))
+            if span is not None:
+                span.set(status=response.status)
+            return response, content
+
+    instrumented_request._instrumented = True
+    httplib2.Http.request = instrumented_request
+
+
+def instrument_boto3_client(client) -> None:
+    """Time the calls of a boto3 client through its event hooks"""
+    host = urlsplit(client.meta.endpoint_url).hostname
+
+    def before_call(params, context, model=None, **kwargs):
+        body = params.get("body")
+        context["metrics_started"] = time.perf_counter()
+        context["metrics_sent"] = len(body) if isinstance(body, (bytes, str)) else 0
+        context["metrics_span"] = tracing.start_span(
+            f"http.{upstream_name(host)}", "client", host=host, operation=getattr(model, "name", None)
+        )
+
+    def after_call(http_response, context, **kwargs):
+        record_upstream(host, time.perf_counter() - context.get("metrics_started", time.perf_counter()),
+                        status=http_response.status_code, sent=context.get("metrics_sent", 0),
+                        received=_length(http_response.headers.get("content-length")))
+        span = context.get("metrics_span")
+        if span is not None:
+            span.set(status=http_response.status_code)
+            span.end()
+
+    def after_call_error(exception, context, **kwargs):
+        record_upstream(host, time.perf_counter() - context.get("metrics_started", time.perf_counter()),
+                        error=type(exception).__name__, sent=context.get("metrics_sent", 0))
+        span = context.get("metrics_span")
+        if span is not None:
+            span.end(error=exception)
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+
+
+_BENCH = re.compile(r"bench: utime=([\d.]+)s stime=([\d.]+)s rtime=([\d.]+)s")
+_PROGRESS = re.compile(r"time=(\d+):(\d+):([\d.]+)")
+
+
+def record_ffmpeg(operation: str, outcome: str, wall: float, stderr: str = "") -> None:
+    """
+    Record an ffmpeg run; CPU time and media duration are parsed from the
+    stderr of a run with -benchmark (``bench: utime=..``) and its progress lines
+    """
+    ffmpeg_runs.inc(operation=operation, outcome=outcome)
+    ffmpeg_wall_seconds.observe(wall, operation=operation)
+    bench = _BENCH.search(stderr or "")
+    if bench:
+        ffmpeg_cpu_seconds.observe(float(bench.group(1)) + float(bench.group(2)), operation=operation)
+    progress = _PROGRESS.findall(stderr or "")
+    if progress and wall > 0:
+        hours, minutes, seconds = progress[-1]
+        media_seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        if media_seconds > 0:
+            ffmpeg_realtime_factor.observe(media_seconds / wall, operation=operation)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and body bytes per route
+
+    Routes are labelled with their template (``/api/jobs/{job_id}``), mounts
+    with their prefix and anything unmatched as ``unmatched``, so label
+    cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        received = 0
+        sent = 0
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            http_requests_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or scope.get("root_path") or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=status)
+            http_request_duration.observe(time.perf_counter() - started, method=method, route=route)
+            if received:
+                http_request_bytes.inc(received, route=route)
+            if sent:
+                http_response_bytes.inc(sent, route=route)
@@ -0,0 +1,144 @@
+"""
+Profile Cache
+Stale-while-revalidate cache for account and channel profile data
+(Instagram account info, YouTube channel, TikTok user info)
+"""
+
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileCache:
+    """
+    In-memory profile cache keyed by (platform, account)
+
+    Entries younger than ``ttl`` are served as-is. Entries older than ``ttl``
+    but younger than ``stale_ttl`` are served immediately while a background
+    refresh fetches fresh data. Anything older is reloaded synchronously.
+    The cache holds at most ``max_entries`` profiles (least recently used
+    entries are evicted first).
+    """
+
+    def __init__(self, ttl: float = 300, stale_ttl: float = 3600, max_entries: int = 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def get(self, platform: str, account: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached profile without loading it
+
+        Args:
+            platform: Platform name (instagram, youtube, tiktok, ...)
+            account: Account identifier on that platform
+
+        Returns:
+            Cached profile data (fresh or stale), or None if not cached
+        """
+        key = (platform, str(account))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, data = entry
+            if time.monotonic() - stored_at > self.stale_ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def get_or_load(self, platform: str, account: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Get a profile, loading or revalidating it as needed
+
+        Args:
+            platform: Platform name
+            account: Account identifier on that platform
+            loader: Blocking callable that fetches the profile from upstream
+
+        Returns:
+            Profile data
+        """
+        key = (platform, str(account))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, data = entry
+                age = now - stored_at
+                if age <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+                if age <= self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, loader, entry),
+                            name=f"profile-refresh-{platform}",
+                            daemon=True
+                        ).start()
+                    return data
+            self.misses += 1
+
+        data = loader()
+        self.put(platform, account, data)
+        return data
+
+    def put(self, platform: str, account: str, data: Dict[str, Any]) -> None:
+        """Store a freshly fetched profile"""
+        key = (platform, str(account))
+        with self._lock:
+            self._entries[key] = (time.monotonic(), data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, platform: str, account: str) -> None:
+        """Drop a cached profile, e.g. after a publish or logout"""
+        with self._lock:
+            self._entries.pop((platform, str(account)), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshing": len(self._refreshing)
+            }
+
+    def _refresh(self, key: Tuple[str, str], loader: Callable[[], Dict[str, Any]],
+                 stale: Tuple[float, Dict[str, Any]]) -> None:
+        """Background revalidation of a stale entry"""
+        try:
+            data = loader()
+            with self._lock:
+                # Skip the write if the entry was invalidated (or replaced) while refreshing
+                if self._entries.get(key) is stale:
+                    self._entries[key] = (time.monotonic(), data)
+        except Exception as e:
+            logger.warning(f"Profile refresh failed for {key[0]}:{key[1]}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
@@ -0,0 +1,191 @@
+"""
+Publish Event Log
+Append-only record of account connections and uploads per platform
+(connected, upload_start, upload_success, upload_failed), indexed by
+account, platform, event and time, so "what did account X publish this
+week" is an index lookup instead of a log grep.
+
+Events older than the retention period are deleted (and their pages
+returned to the file) at most once an hour while events are written.
+
+Backend:
+    sqlite:///path/to/publish_events.db  - local file, shared by the API and job worker processes
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+from tracing import current_trace
+
+logger = logging.getLogger(__name__)
+
+CONNECTED = "connected"
+UPLOAD_START = "upload_start"
+UPLOAD_SUCCESS = "upload_success"
+UPLOAD_FAILED = "upload_failed"
+EVENTS = (CONNECTED, UPLOAD_START, UPLOAD_SUCCESS, UPLOAD_FAILED)
+
+MAX_PAGE_SIZE = 500
+
+
+class PublishEventLog:
+    """
+    SQLite-backed publish event log (WAL)
+
+    Rows are only ever appended (and deleted by retention), so the rowid
+    orders events by time and doubles as the pagination cursor.
+    """
+
+    def __init__(self, path: str, retention: float = 90 * 86400):
+        self.path = path
+        self.retention = retention
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        # Must precede the first table so compaction can shrink the file
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS publish_events ("
+            " id INTEGER PRIMARY KEY,"
+            " ts REAL NOT NULL,"
+            " platform TEXT NOT NULL,"
+            " account TEXT NOT NULL,"
+            " event TEXT NOT NULL,"
+            " media_id TEXT,"
+            " trace_id TEXT,"
+            " detail TEXT"
+            ")"
+        )
+        # Index entries are ordered by (column, rowid): newest-first pages for
+        # one account, platform or outcome are read straight off an index
+        conn.execute("CREATE INDEX IF NOT EXISTS publish_events_account ON publish_events (account)")
+        conn.execute("CREATE INDEX IF NOT EXISTS publish_events_platform ON publish_events (platform)")
+        conn.execute("CREATE INDEX IF NOT EXISTS publish_events_event ON publish_events (event)")
+        conn.execute("CREATE INDEX IF NOT EXISTS publish_events_ts ON publish_events (ts)")
+        self._last_compaction = 0.0
+        logger.info(f"Publish event log ready: {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def record(self, platform: str, account: str, event: str, media_id: Optional[str] = None, **detail) -> None:
+        """
+        Append an event (never raises - a failed write must not fail the upload)
+
+        Args:
+            platform: instagram, instagram_graph, youtube or tiktok
+            account: Account id on that platform (the session key)
+            event: One of EVENTS
+            media_id: Published media / video / publish id, when known
+            **detail: Anything else worth keeping (file, title, error, ...)
+        """
+        now = time.time()
+        trace = current_trace()    # Links the event to the request or job that caused it
+        try:
+            self._connection().execute(
+                "INSERT INTO publish_events (ts, platform, account, event, media_id, trace_id, detail)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (now, platform, str(account), event, str(media_id) if media_id is not None else None,
+                 trace.trace_id if trace is not None else None, json.dumps(detail, default=str) if detail else None)
+            )
+            if now - self._last_compaction > 3600:
+                self._last_compaction = now
+                self.compact()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to record {platform} {event} event for {account}: {e}")
+
+    def query(self, account: Optional[str] = None, platform: Optional[str] = None, event: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None, limit: int = 50,
+              cursor: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Events matching every given filter, newest first
+
+        Args:
+            since / until: Unix time bounds (inclusive / exclusive)
+            limit: Page size (at most MAX_PAGE_SIZE)
+            cursor: ``next_cursor`` of the previous page
+
+        Returns:
+            {"events": [...], "next_cursor": int or None}
+        """
+        clauses, params = [], []
+        for column, value in (("account", account), ("platform", platform), ("event", event)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connection().execute(
+            f"SELECT * FROM publish_events {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit + 1)
+        ).fetchall()
+        events = [self._event(row) for row in rows[:limit]]
+        return {
+            "events": events,
+            "next_cursor": events[-1]["id"] if len(rows) > limit else None
+        }
+
+    @staticmethod
+    def _event(row: sqlite3.Row) -> Dict[str, Any]:
+        event = dict(row)
+        event["detail"] = json.loads(event["detail"]) if event["detail"] else {}
+        return event
+
+    def compact(self) -> int:
+        """Delete events older than the retention period; returns how many"""
+        conn = self._connection()
+        deleted = conn.execute("DELETE FROM publish_events WHERE ts < ?", (time.time() - self.retention,)).rowcount
+        if deleted:
+            conn.executescript("PRAGMA incremental_vacuum")    # Steps until every free page is released
+            logger.info(f"Compacted publish event log: {deleted} event(s) past retention deleted")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._connection().execute(
+            "SELECT platform, event, COUNT(*) AS count FROM publish_events GROUP BY platform, event"
+        ).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row["platform"], {})[row["event"]] = row["count"]
+        return {"events": counts, "retention_days": self.retention / 86400}
+
+
+def create_publish_event_log(url: str, **kwargs) -> PublishEventLog:
+    """
+    Create a publish event log from a URL
+
+    Args:
+        url: sqlite:///relative/or/absolute/path.db
+        **kwargs: retention
+
+    Returns:
+        PublishEventLog instance
+    """
+    if url.startswith("sqlite:///"):
+        return PublishEventLog(url[len("sqlite:///"):], **kwargs)
+    raise ValueError(f"Unsupported PUBLISH_EVENTS_URL: {url}")
@@ -0,0 +1,156 @@
+"""
+Publish Saga
+Checkpointed multi-stage publishes (storage upload -> container -> publish,
+TikTok init -> upload, YouTube resumable session -> upload), so a retry
+resumes from the first incomplete stage instead of starting over
+"""
+
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with span("digest"), open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def saga_id(*parts: Any) -> str:
+    """Stable saga id for a publish: the same account, media and options give the same id"""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+
+class PublishSaga:
+    """
+    One publish, as ordered stages whose outputs are checkpointed
+
+    ``stage(name, fn)`` returns the checkpointed output when the stage has
+    already completed, otherwise runs ``fn`` and checkpoints its result
+    before returning it. Re-running a stage (its output expired or was
+    discarded) drops the checkpoints of every later stage, since they were
+    derived from the old output.
+    """
+
+    def __init__(self, sagas: "PublishSagas", saga_id: str, description: str = ""):
+        self._sagas = sagas
+        self.id = saga_id
+        self.description = description
+
+        record = sagas.sessions.get(saga_id) or {}
+        self._stages: Dict[str, Dict[str, Any]] = dict(record.get("stages", {}))
+        self.resumed = bool(self._stages)
+        if self.resumed:
+            logger.info(f"Resuming publish {description or saga_id} after stages: {', '.join(self._stages)}")
+
+    def completed(self) -> List[str]:
+        """Names of checkpointed stages, in order"""
+        return list(self._stages)
+
+    def get(self, name: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Checkpointed output of a stage (None if missing or older than ttl)"""
+        entry = self._stages.get(name)
+        if entry is None:
+            return None
+        if ttl is not None and time.time() - entry["at"] > ttl:
+            return None
+        return entry["output"]
+
+    def record(self, name: str, output: Any) -> None:
+        """Checkpoint a stage output (also used for progress inside a stage)"""
+        stages = list(self._stages)
+        if name in stages:
+            # Later stages were derived from the previous output
+            for later in stages[stages.index(name) + 1:]:
+                self._stages.pop(later, None)
+        self._stages[name] = {"output": output, "at": time.time()}
+        self._save()
+
+    def discard(self, name: str) -> None:
+        """Drop a stage's checkpoint (and later ones), e.g. an upload URL the platform rejected"""
+        stages = list(self._stages)
+        if name not in stages:
+            return
+        for dropped in stages[stages.index(name):]:
+            self._stages.pop(dropped, None)
+        self._save()
+
+    def stage(self, name: str, fn: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Run a stage once
+
+        Args:
+            name: Stage name (unique within the saga)
+            fn: Performs the stage; its result must be JSON-serializable
+            ttl: Seconds a checkpointed output stays usable (None = forever)
+
+        Returns:
+            The stage output
+        """
+        output = self.get(name, ttl)
+        if output is not None:
+            logger.info(f"Publish {self.description or self.id}: stage {name} already done, skipping")
+            return output
+        output = fn()
+        self.record(name, output)
+        return output
+
+    def finish(self) -> None:
+        """The publish completed - forget its checkpoints"""
+        self._sagas.sessions.pop(self.id, None)
+
+    def _save(self) -> None:
+        now = time.time()
+
+        def merge(record):
+            record = record or {"description": self.description, "created_at": now}
+            record["stages"] = self._stages
+            record["updated_at"] = now
+            return record
+        self._sagas.sessions.store.update(self._sagas.sessions.platform, self.id, merge)
+
+
+class PublishSagas:
+    """
+    Saga checkpoints kept in the session store (so API and job worker
+    processes see the same progress). Checkpoints of publishes that were
+    never retried are purged after ``max_age`` seconds.
+    """
+
+    def __init__(self, sessions, max_age: float = 7 * 86400):
+        self.sessions = sessions
+        self.max_age = max_age
+
+    def saga(self, saga_id: str, description: str = "") -> PublishSaga:
+        """Open (or resume) the saga with this id"""
+        return PublishSaga(self, saga_id, description)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Unfinished publishes with their completed stages"""
+        return [
+            {
+                "id": saga_id,
+                "description": record.get("description"),
+                "stages": list(record.get("stages", {})),
+                "updated_at": record.get("updated_at")
+            }
+            for saga_id, record in self.sessions.items()
+        ]
+
+    def purge(self) -> int:
+        """Delete checkpoints older than max_age"""
+        cutoff = time.time() - self.max_age
+        stale = [saga_id for saga_id, record in self.sessions.items() if record.get("updated_at", 0) < cutoff]
+        for saga_id in stale:
+            self.sessions.pop(saga_id, None)
+        if stale:
+            logger.info(f"Purged {len(stale)} abandoned publish checkpoint(s)")
+        return len(stale)
@@ -0,0 +1,204 @@
+"""
+Sampling Profiler
+In-process statistical profiler: a background thread periodically captures
+every thread's stack with sys._current_frames() and aggregates identical
+stacks. Output is collapsed stacks (flamegraph.pl / speedscope import) or
+the speedscope JSON format.
+
+The sampler measures its own CPU time and stretches the sampling interval
+when needed so its overhead stays under ``max_overhead`` of one core.
+Only this process is sampled (not instagrapi or job worker processes).
+"""
+
+import os
+import sys
+import time
+import threading
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_STACK_DEPTH = 128
+
+# Leaf frames in these modules mean the thread is waiting, not on CPU
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py", "socket.py", "ssl.py", "subprocess.py", "thread.py")
+_IDLE_FUNCTIONS = {"wait", "select", "poll", "sleep", "get", "accept", "recv", "recv_into", "read", "readinto", "communicate", "_worker"}
+
+Frame = Tuple[str, str, int]   # (function, file, first line)
+
+
+def _thread_group(name: str) -> str:
+    """Pool threads (``youtube-worker_3``) are aggregated under their pool name"""
+    base, _, suffix = name.rpartition("_")
+    return base if base and suffix.isdigit() else name
+
+
+class Profile:
+    """Aggregated samples of one profiling window"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()        # (thread group, frames root->leaf) -> samples
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.sampler_cpu = 0.0
+        self.effective_interval = interval
+
+    @property
+    def overhead(self) -> float:
+        """Share of one core the sampler used"""
+        return self.sampler_cpu / self.duration if self.duration else 0.0
+
+    def collapsed(self) -> str:
+        """Collapsed stacks, one ``thread;frame;...;leaf count`` line per distinct stack"""
+        lines = []
+        for (thread, frames), count in self.stacks.most_common():
+            names = [thread] + [f"{function} ({os.path.basename(path)}:{line})" for function, path, line in frames]
+            lines.append(f"{';'.join(name.replace(';', ':') for name in names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str = "cast-backend") -> Dict[str, Any]:
+        """Speedscope file format: one sampled profile per thread group, weighted in seconds"""
+        frame_index: Dict[Frame, int] = {}
+        frames: List[Dict[str, Any]] = []
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for (thread, stack), count in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": 0.0,
+                "samples": [],
+                "weights": []
+            })
+            weight = count * self.effective_interval
+            profile["samples"].append(indices)
+            profile["weights"].append(weight)
+            profile["endValue"] += weight
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{name} {time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(self.started_at))}Z",
+            "exporter": "sampling_profiler",
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda profile: profile["endValue"], reverse=True)
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": round(self.effective_interval * 1000, 2),
+            "samples": self.samples,
+            "idle_samples_skipped": self.idle_samples,
+            "distinct_stacks": len(self.stacks),
+            "sampler_overhead": round(self.overhead, 4)
+        }
+
+
+class SamplingProfiler:
+    """
+    Runs one profiling window at a time
+
+    Usage:
+        profiler.start(seconds=30)
+        ...
+        profile = profiler.stop()      # waits for the window to end
+        profile.speedscope()
+    """
+
+    def __init__(self, interval: float = 0.01, max_overhead: float = 0.02):
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_profile: Optional[Profile] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: Optional[float] = None, include_idle: bool = False) -> Profile:
+        """
+        Start sampling for ``seconds`` in the background
+
+        Raises:
+            RuntimeError: a profiling window is already running
+        """
+        with self._lock:
+            if self.running:
+                raise RuntimeError("A profile is already being recorded")
+            self._stop.clear()
+            profile = Profile(interval or self.interval)
+            self._thread = threading.Thread(
+                target=self._sample, args=(profile, seconds, include_idle), name="sampling-profiler", daemon=True
+            )
+            self._thread.start()
+        logger.info(f"Sampling profiler started for {seconds}s every {profile.interval * 1000:.1f}ms")
+        return profile
+
+    def stop(self, early: bool = True) -> Optional[Profile]:
+        """Wait for the running window to finish (ending it now if ``early``) and return its profile"""
+        if early:
+            self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        return self.last_profile
+
+    def _sample(self, profile: Profile, seconds: float, include_idle: bool) -> None:
+        own_id = threading.get_ident()
+        started = time.monotonic()
+        cpu_started = time.thread_time()
+        interval = profile.interval
+        try:
+            while not self._stop.is_set() and time.monotonic() - started < seconds:
+                tick_cpu = time.thread_time()
+                names = {thread.ident: _thread_group(thread.name) for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = self._stack(frame)
+                    if not include_idle and self._is_idle(stack):
+                        profile.idle_samples += 1
+                        continue
+                    profile.stacks[(names.get(thread_id, str(thread_id)), stack)] += 1
+                    profile.samples += 1
+                cost = time.thread_time() - tick_cpu
+                # Keep the sampler's CPU share under max_overhead
+                interval = max(profile.interval, cost / self.max_overhead)
+                profile.effective_interval = interval
+                self._stop.wait(interval)
+        finally:
+            profile.duration = time.monotonic() - started
+            profile.sampler_cpu = time.thread_time() - cpu_started
+            self.last_profile = profile
+            logger.info(f"Sampling profiler finished: {profile.samples} samples, overhead {profile.overhead:.2%}")
+
+    @staticmethod
+    def _stack(frame) -> Tuple[Frame, ...]:
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        frames.reverse()
+        return tuple(frames)
+
+    @staticmethod
+    def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+        if not stack:
+            return True
+        function, path, _ = stack[-1]
+        return path.endswith(_IDLE_MODULES) and function in _IDLE_FUNCTIONS
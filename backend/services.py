@@ -0,0 +1,102 @@
+"""
+Service Container
+Long-lived API wrappers and clients (Graph API, Instagram Platform API,
+file upload service with its S3 client) built once per process and shared
+by every request and executor thread, instead of constructed per call
+
+Each service declares the environment variables it is configured from.
+A service is rebuilt the next time it is used after one of them changed
+(e.g. an edited .env was reloaded), so config changes apply without a
+restart. Job worker processes build their own.
+"""
+
+import os
+import time
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Service:
+    def __init__(self, factory: Callable[[], Any], config: Tuple[str, ...]):
+        self.factory = factory
+        self.config = config
+        self.instance: Any = None
+        self.fingerprint: Optional[Tuple[Optional[str], ...]] = None
+        self.built_at: Optional[float] = None
+        self.builds = 0
+        self.lock = threading.Lock()
+
+    def current_config(self) -> Tuple[Optional[str], ...]:
+        return tuple(os.environ.get(name) for name in self.config)
+
+
+class ServiceContainer:
+    """
+    Lazily built, shared service objects
+
+    Usage:
+        services.register("instagram_graph", InstagramGraphAPI, config=("FACEBOOK_APP_ID", ...))
+        services.instagram_graph.get_auth_url()     # same object on every call
+    """
+
+    def __init__(self):
+        self._services: Dict[str, _Service] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], config: Iterable[str] = ()) -> None:
+        """
+        Args:
+            name: Service name (also readable as an attribute)
+            factory: Builds the service; called again when its config changes
+            config: Environment variables the service reads
+        """
+        self._services[name] = _Service(factory, tuple(config))
+
+    def get(self, name: str) -> Any:
+        """The shared instance, built on first use or after a config change"""
+        service = self._services.get(name)
+        if service is None:
+            raise KeyError(f"Unknown service: {name}")
+        fingerprint = service.current_config()
+        if service.instance is not None and service.fingerprint == fingerprint:
+            return service.instance
+        with service.lock:
+            if service.instance is None or service.fingerprint != fingerprint:
+                # A failed build is not cached - the next call tries again
+                rebuilding = service.instance is not None
+                service.instance = service.factory()
+                service.fingerprint = fingerprint
+                service.built_at = time.time()
+                service.builds += 1
+                logger.info(f"{'Rebuilt' if rebuilding else 'Built'} service {name}")
+            return service.instance
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.get(name)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Drop built instances (all, or one) so they are rebuilt on next use"""
+        for service_name, service in self._services.items():
+            if name is None or service_name == name:
+                with service.lock:
+                    service.instance = None
+                    service.fingerprint = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "built": service.instance is not None,
+                "builds": service.builds,
+                "built_at": service.built_at,
+                "config_changed": service.instance is not None and service.fingerprint != service.current_config(),
+                "config": list(service.config)
+            }
+            for name, service in self._services.items()
+        }
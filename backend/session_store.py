@@ -0,0 +1,570 @@
+"""
+Session Store
+Persistent, multi-worker storage for platform sessions (YouTube, TikTok,
+Instagram Graph/Meta credentials), indexed by platform and account.
+
+Backends:
+    sqlite:///path/to/sessions.db  - local file, shared by all workers on a host
+    redis://host:port/db           - shared by all instances (requires the redis package)
+    journal:///path/to/sessions    - append-only journal with snapshot compaction
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(ABC):
+    """Base class for session store backends"""
+
+    @abstractmethod
+    def get(self, platform: str, account: str) -> Optional[Dict[str, Any]]:
+        """Get session data for an account, or None"""
+
+    @abstractmethod
+    def put(self, platform: str, account: str, data: Dict[str, Any]) -> None:
+        """Create or replace session data for an account"""
+
+    @abstractmethod
+    def delete(self, platform: str, account: str) -> bool:
+        """Delete session data; returns True if it existed"""
+
+    @abstractmethod
+    def update(self, platform: str, account: str,
+               fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically read-modify-write session data
+
+        Args:
+            platform: Platform name
+            account: Account identifier
+            fn: Receives the current data (or None) and returns the new data
+                (None deletes the session)
+
+        Returns:
+            The new session data
+        """
+
+    @abstractmethod
+    def accounts(self, platform: str) -> List[str]:
+        """List account identifiers with a session on a platform"""
+
+    def items(self, platform: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """List (account, data) pairs for a platform"""
+        return [(account, data) for account in self.accounts(platform)
+                if (data := self.get(platform, account)) is not None]
+
+    def count(self, platform: str) -> int:
+        """Number of sessions on a platform"""
+        return len(self.accounts(platform))
+
+    def platform(self, platform: str) -> "PlatformSessions":
+        """Dict-like view of one platform's sessions"""
+        return PlatformSessions(self, platform)
+
+
+class PlatformSessions(MutableMapping):
+    """
+    Dict-like view over one platform's sessions in a SessionStore
+
+    Values are copies: mutating a returned dict does not persist it.
+    Use ``patch`` (or assign the whole value) to change stored sessions.
+    """
+
+    def __init__(self, store: SessionStore, platform: str):
+        self.store = store
+        self.platform = platform
+
+    def __getitem__(self, account: str) -> Dict[str, Any]:
+        data = self.store.get(self.platform, str(account))
+        if data is None:
+            raise KeyError(account)
+        return data
+
+    def __setitem__(self, account: str, data: Dict[str, Any]) -> None:
+        self.store.put(self.platform, str(account), data)
+
+    def __delitem__(self, account: str) -> None:
+        if not self.store.delete(self.platform, str(account)):
+            raise KeyError(account)
+
+    def __contains__(self, account: object) -> bool:
+        return self.store.get(self.platform, str(account)) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.accounts(self.platform))
+
+    def __len__(self) -> int:
+        return self.store.count(self.platform)
+
+    def items(self):
+        return self.store.items(self.platform)
+
+    def patch(self, account: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically merge fields into an existing session
+
+        Returns:
+            The updated session data, or None if the session no longer exists
+        """
+        def merge(current):
+            if current is None:
+                return None
+            current.update(fields)
+            return current
+        return self.store.update(self.platform, str(account), merge)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed session store
+
+    Uses WAL mode so several uvicorn workers on the same host can share one
+    database file. Each thread gets its own connection.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " platform TEXT NOT NULL,"
+            " account TEXT NOT NULL,"
+            " data TEXT NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (platform, account)"
+            ") WITHOUT ROWID"
+        )
+        logger.info(f"SQLite session store ready: {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, platform: str, account: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT data FROM sessions WHERE platform = ? AND account = ?",
+            (platform, account)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, platform: str, account: str, data: Dict[str, Any]) -> None:
+        self._connection().execute(
+            "INSERT INTO sessions (platform, account, data, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (platform, account) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+            (platform, account, json.dumps(data), time.time())
+        )
+
+    def delete(self, platform: str, account: str) -> bool:
+        cursor = self._connection().execute(
+            "DELETE FROM sessions WHERE platform = ? AND account = ?",
+            (platform, account)
+        )
+        return cursor.rowcount > 0
+
+    def update(self, platform: str, account: str,
+               fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        conn = self._connection()
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent updaters serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE platform = ? AND account = ?",
+                (platform, account)
+            ).fetchone()
+            new_data = fn(json.loads(row[0]) if row else None)
+            if new_data is None:
+                conn.execute("DELETE FROM sessions WHERE platform = ? AND account = ?", (platform, account))
+            else:
+                conn.execute(
+                    "INSERT INTO sessions (platform, account, data, updated_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (platform, account) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                    (platform, account, json.dumps(new_data), time.time())
+                )
+            conn.execute("COMMIT")
+            return new_data
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def accounts(self, platform: str) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT account FROM sessions WHERE platform = ? ORDER BY account",
+            (platform,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def items(self, platform: str) -> List[Tuple[str, Dict[str, Any]]]:
+        rows = self._connection().execute(
+            "SELECT account, data FROM sessions WHERE platform = ? ORDER BY account",
+            (platform,)
+        ).fetchall()
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def count(self, platform: str) -> int:
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE platform = ?",
+            (platform,)
+        ).fetchone()
+        return row[0]
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store (works with any Redis-protocol server)
+
+    Each session is a JSON string at ``{prefix}:{platform}:{account}``; a set
+    at ``{prefix}:{platform}:index`` indexes accounts per platform. Updates
+    use WATCH/MULTI optimistic transactions.
+    """
+
+    def __init__(self, url: str, prefix: str = "sessions"):
+        try:
+            import redis
+        except ImportError:
+            raise ValueError("The redis package is required for redis:// session stores (pip install redis)")
+
+        self.prefix = prefix
+        self._redis_module = redis
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        logger.info(f"Redis session store ready: {url.split('@')[-1]}")
+
+    def _key(self, platform: str, account: str) -> str:
+        return f"{self.prefix}:{platform}:{account}"
+
+    def _index(self, platform: str) -> str:
+        return f"{self.prefix}:{platform}:index"
+
+    def get(self, platform: str, account: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.get(self._key(platform, account))
+        return json.loads(raw) if raw else None
+
+    def put(self, platform: str, account: str, data: Dict[str, Any]) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.set(self._key(platform, account), json.dumps(data))
+        pipe.sadd(self._index(platform), account)
+        pipe.execute()
+
+    def delete(self, platform: str, account: str) -> bool:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self._key(platform, account))
+        pipe.srem(self._index(platform), account)
+        deleted, _ = pipe.execute()
+        return deleted > 0
+
+    def update(self, platform: str, account: str,
+               fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        key = self._key(platform, account)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    new_data = fn(json.loads(raw) if raw else None)
+                    pipe.multi()
+                    if new_data is None:
+                        pipe.delete(key)
+                        pipe.srem(self._index(platform), account)
+                    else:
+                        pipe.set(key, json.dumps(new_data))
+                        pipe.sadd(self._index(platform), account)
+                    pipe.execute()
+                    return new_data
+                except self._redis_module.WatchError:
+                    # Another writer changed the session - retry with fresh data
+                    continue
+
+    def accounts(self, platform: str) -> List[str]:
+        return sorted(self.client.smembers(self._index(platform)))
+
+    def items(self, platform: str) -> List[Tuple[str, Dict[str, Any]]]:
+        accounts = self.accounts(platform)
+        if not accounts:
+            return []
+        raws = self.client.mget([self._key(platform, account) for account in accounts])
+        return [(account, json.loads(raw)) for account, raw in zip(accounts, raws) if raw]
+
+    def count(self, platform: str) -> int:
+        return self.client.scard(self._index(platform))
+
+
+class JournalSessionStore(SessionStore):
+    """
+    Append-only journal session store with periodic compaction
+
+    Every write appends one JSON line to ``{base}.journal`` (constant time,
+    independent of the number of accounts). When the journal grows past
+    ``compact_after`` records (and is larger than the live data), the full
+    state is checkpointed to ``{base}.snapshot.json`` through a temp file and
+    an atomic rename, and the journal is reset. Startup recovery loads the
+    snapshot once and replays the short journal tail; a torn final line from
+    a crash mid-write is ignored.
+
+    Writers in several processes are serialized with an flock on
+    ``{base}.lock``; each process tails the journal to pick up the others'
+    writes before reading.
+    """
+
+    def __init__(self, base_path: str, compact_after: int = 1000, fsync: bool = False,
+                 legacy_json: Optional[str] = None, legacy_platform: str = "instagram"):
+        self.base_path = base_path
+        self.snapshot_path = f"{base_path}.snapshot.json"
+        self.journal_path = f"{base_path}.journal"
+        self.lock_path = f"{base_path}.lock"
+        self.compact_after = compact_after
+        self.fsync = fsync
+
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._journal_inode = None
+        self._journal_offset = 0
+        self._journal_records = 0
+        self._lock = threading.RLock()
+        self._flock_depth = 0
+        self._flock_handle = None
+
+        with self._file_lock():
+            if legacy_json and os.path.exists(legacy_json) and not os.path.exists(self.snapshot_path):
+                self._migrate_legacy(legacy_json, legacy_platform)
+            self._reload()
+
+        logger.info(f"Journal session store ready: {base_path} ({len(self._state)} sessions, {self._journal_records} journal records)")
+
+    # -- locking -----------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock across threads and processes (re-entrant within a thread)"""
+        with self._lock:
+            if self._flock_depth == 0:
+                self._flock_handle = open(self.lock_path, "a")
+                if fcntl is not None:
+                    fcntl.flock(self._flock_handle, fcntl.LOCK_EX)
+            self._flock_depth += 1
+            try:
+                yield
+            finally:
+                self._flock_depth -= 1
+                if self._flock_depth == 0:
+                    if fcntl is not None:
+                        fcntl.flock(self._flock_handle, fcntl.LOCK_UN)
+                    self._flock_handle.close()
+                    self._flock_handle = None
+
+    # -- recovery ----------------------------------------------------------
+
+    def _migrate_legacy(self, legacy_json: str, platform: str) -> None:
+        """Import a legacy {account: data} JSON file as the first snapshot"""
+        with open(legacy_json, "r") as f:
+            legacy = json.load(f)
+        self._state = {(platform, str(account)): data for account, data in legacy.items()}
+        self._write_snapshot()
+        logger.info(f"Migrated {len(legacy)} sessions from {legacy_json}")
+
+    def _reload(self) -> None:
+        """Load the snapshot and replay the whole journal"""
+        # Hold the file lock so a concurrent compaction cannot swap files mid-reload
+        with self._file_lock():
+            state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r") as f:
+                    for entry in json.load(f)["sessions"]:
+                        state[(entry["platform"], entry["account"])] = entry["data"]
+            self._state = state
+            self._journal_inode = None
+            self._journal_offset = 0
+            self._journal_records = 0
+            self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Apply journal records written since the last read (by any process)"""
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            if self._journal_inode is not None:
+                # Journal was compacted away by another process
+                self._reload()
+            return
+
+        if self._journal_inode is not None and stat.st_ino != self._journal_inode:
+            self._reload()
+            return
+        if stat.st_size < self._journal_offset:
+            self._reload()
+            return
+        self._journal_inode = stat.st_ino
+        if stat.st_size == self._journal_offset:
+            return
+
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            chunk = f.read()
+        consumed = 0
+        for line in chunk.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                # Torn write (crash mid-append, or a writer still appending) - stop here
+                break
+            consumed += len(line)
+            try:
+                self._apply(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping corrupt journal record in {self.journal_path}")
+            self._journal_records += 1
+        self._journal_offset += consumed
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        key = (record["p"], record["a"])
+        if record["op"] == "put":
+            self._state[key] = record["d"]
+        else:
+            self._state.pop(key, None)
+
+    # -- writes ------------------------------------------------------------
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Append one record (file lock held) and apply it in memory"""
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        if self._journal_inode is not None and os.path.getsize(self.journal_path) > self._journal_offset:
+            # Caught up under the file lock, so anything past our offset is a torn write
+            os.truncate(self.journal_path, self._journal_offset)
+        with open(self.journal_path, "ab") as f:
+            f.write(line)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            stat = os.fstat(f.fileno())
+        self._apply(record)
+        self._journal_inode = stat.st_ino
+        self._journal_offset = stat.st_size
+        self._journal_records += 1
+
+        if self._journal_records >= max(self.compact_after, len(self._state)):
+            self.compact()
+
+    def _write_snapshot(self) -> None:
+        """Checkpoint the in-memory state via temp file + atomic rename"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        sessions = [
+            {"platform": platform, "account": account, "data": data}
+            for (platform, account), data in self._state.items()
+        ]
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "written_at": time.time(), "sessions": sessions}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def compact(self) -> None:
+        """Checkpoint the full state and reset the journal"""
+        with self._file_lock():
+            self._catch_up()
+            self._write_snapshot()
+            # Replaying the old journal over the new snapshot is idempotent, so a
+            # crash between these two renames loses nothing
+            empty_path = f"{self.journal_path}.tmp"
+            open(empty_path, "wb").close()
+            os.replace(empty_path, self.journal_path)
+            self._journal_inode = os.stat(self.journal_path).st_ino
+            self._journal_offset = 0
+            self._journal_records = 0
+        logger.info(f"Compacted session journal {self.base_path} ({len(self._state)} sessions)")
+
+    # -- SessionStore API --------------------------------------------------
+
+    def get(self, platform: str, account: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._catch_up()
+            data = self._state.get((platform, account))
+            return json.loads(json.dumps(data)) if data is not None else None
+
+    def put(self, platform: str, account: str, data: Dict[str, Any]) -> None:
+        with self._file_lock():
+            self._catch_up()
+            self._append({"op": "put", "p": platform, "a": account, "d": data})
+
+    def delete(self, platform: str, account: str) -> bool:
+        with self._file_lock():
+            self._catch_up()
+            if (platform, account) not in self._state:
+                return False
+            self._append({"op": "del", "p": platform, "a": account})
+            return True
+
+    def update(self, platform: str, account: str,
+               fn: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        with self._file_lock():
+            self._catch_up()
+            current = self._state.get((platform, account))
+            new_data = fn(json.loads(json.dumps(current)) if current is not None else None)
+            if new_data is None:
+                if current is not None:
+                    self._append({"op": "del", "p": platform, "a": account})
+            else:
+                self._append({"op": "put", "p": platform, "a": account, "d": new_data})
+            return new_data
+
+    def accounts(self, platform: str) -> List[str]:
+        with self._lock:
+            self._catch_up()
+            return sorted(account for (p, account) in self._state if p == platform)
+
+    def items(self, platform: str) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            self._catch_up()
+            return sorted(
+                (account, json.loads(json.dumps(data)))
+                for (p, account), data in self._state.items() if p == platform
+            )
+
+    def count(self, platform: str) -> int:
+        with self._lock:
+            self._catch_up()
+            return sum(1 for (p, _) in self._state if p == platform)
+
+
+def create_session_store(url: str) -> SessionStore:
+    """
+    Create a session store from a URL
+
+    Args:
+        url: sqlite:///relative/or/absolute/path.db, redis://host:port/db
+             or journal:///relative/or/absolute/base_path
+
+    Returns:
+        SessionStore instance
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url)
+    if url.startswith("journal:///"):
+        return JournalSessionStore(url[len("journal:///"):])
+    raise ValueError(f"Unsupported SESSION_STORE_URL: {url}")
@@ -0,0 +1,96 @@
+"""
+Single-flight Request Coalescing
+Concurrent identical upstream calls share one in-flight request and its result
+"""
+
+import asyncio
+import threading
+import logging
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """A single in-flight call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.shared = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and receive the same result (or exception).
+    Once the call finishes the key is released, so later calls go upstream
+    again. Keys are typically (platform, account, operation) tuples.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run a blocking function once per key across concurrent callers
+
+        Args:
+            key: Coalescing key, e.g. ("youtube", user_id, "validate")
+            fn: Blocking callable performing the upstream request
+
+        Returns:
+            The result of fn (shared by all concurrent callers)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.shared += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.shared:
+                logger.info(f"Single-flight call {key} shared with {call.shared} waiting caller(s)")
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Async variant of do() - runs the blocking call off the event loop
+
+        Args:
+            key: Coalescing key
+            fn: Blocking callable performing the upstream request
+
+        Returns:
+            The result of fn (shared by all concurrent callers)
+        """
+        return await asyncio.to_thread(self.do, key, fn)
+
+    def in_flight(self) -> int:
+        """Number of keys with a call currently running"""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,36 @@
+import threading
+
+from client_registry import ClientRegistry
+
+
+def test_background_sweep_spills_idle_and_expires_pending_clients():
+    spilled = []
+    done = threading.Event()
+
+    def spill(account, client):
+        spilled.append((account, client))
+        done.set()
+
+    registry = ClientRegistry(idle_ttl=0.05, pending_ttl=0.05, spill=spill, sweep_interval=0.02)
+    registry.put_pending("bob", "client-b")
+    registry.put("alice", "client-a")
+    registry.start()
+    try:
+        # Nothing touches the registry: only the sweep thread can evict
+        assert done.wait(5)
+    finally:
+        registry.stop()
+
+    assert spilled == [("alice", "client-a")]
+    assert registry.accounts() == []
+    assert registry.expired_pending == 1
+    assert registry.evictions == 1
+
+
+def test_stop_ends_the_sweep():
+    registry = ClientRegistry(idle_ttl=0.05, sweep_interval=0.02)
+    registry.start()
+    registry.stop()
+    registry.put("alice", "client-a")
+    threading.Event().wait(0.2)
+    assert "alice" in registry
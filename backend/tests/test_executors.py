@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+
+from executors import BoundedExecutor, ExecutorSaturated
+
+
+def blocker():
+    """A call that holds its worker until released"""
+    started, release = threading.Event(), threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+        return "done"
+    return call, started, release
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, reject_status=429)
+    call, started, release = blocker()
+    running = executor.submit(call)
+    started.wait(5)
+    queued = executor.submit(lambda: "queued")
+
+    with pytest.raises(ExecutorSaturated) as error:
+        executor.submit(lambda: "rejected")
+    assert error.value.status_code == 429
+    assert "Retry-After" in error.value.headers
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    assert running.result(5) == "done"
+    assert queued.result(5) == "queued"
+    stats = executor.stats()
+    assert (stats["active"], stats["queued"], stats["completed"]) == (0, 0, 2)
+    executor.shutdown()
+
+
+def test_failed_call_is_counted_and_raised():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        executor.submit(fail).result(5)
+    stats = executor.stats()
+    assert (stats["active"], stats["queued"], stats["failed"]) == (0, 0, 1)
+    executor.shutdown()
+
+
+def test_cancelled_queued_run_releases_its_slot():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    call, started, release = blocker()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(call))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        waiting = asyncio.ensure_future(executor.run(lambda: "never runs"))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queued"] == 1
+
+        waiting.cancel()        # e.g. the client disconnected
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        release.set()
+        assert await running == "done"
+
+    asyncio.run(scenario())
+    stats = executor.stats()
+    assert (stats["active"], stats["queued"]) == (0, 0)
+    # The freed slot is usable again
+    assert executor.submit(lambda: "again").result(5) == "again"
+    executor.shutdown()
+
+
+def test_shutdown_releases_queued_slots():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=2)
+    call, started, release = blocker()
+    executor.submit(call)
+    started.wait(5)
+    executor.submit(lambda: None)
+    executor.submit(lambda: None)
+
+    executor.shutdown()     # cancel_futures=True drops the queued calls
+    release.set()
+    assert executor.stats()["queued"] == 0
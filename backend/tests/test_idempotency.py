@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from idempotency import (
+    SQLiteIdempotencyStore, STARTED, IN_FLIGHT, COMPLETED, MISMATCH, complete_key, release_key
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteIdempotencyStore(str(tmp_path / "idempotency.db"), ttl=60, lock_ttl=30)
+
+
+def test_first_request_starts_and_retry_waits_while_in_flight(store):
+    assert store.begin("upload:k1", "fp") == (STARTED, None)
+    outcome, record = store.begin("upload:k1", "fp")
+    assert outcome == IN_FLIGHT
+    assert record["state"] == IN_FLIGHT
+
+
+def test_completed_response_is_replayed(store):
+    store.begin("upload:k1", "fp")
+    store.complete("upload:k1", 202, '{"job_id": "j1"}', {"location": "/api/jobs/j1"})
+
+    outcome, record = store.begin("upload:k1", "fp")
+    assert outcome == COMPLETED
+    assert (record["status_code"], record["body"]) == (202, '{"job_id": "j1"}')
+    assert record["headers"] == {"location": "/api/jobs/j1"}
+
+
+def test_same_key_for_a_different_request_is_a_mismatch(store):
+    store.begin("upload:k1", "fp-a")
+    store.complete("upload:k1", 200, "{}", {})
+    outcome, _ = store.begin("upload:k1", "fp-b")
+    assert outcome == MISMATCH      # the endpoint answers 422
+
+
+def test_released_key_can_be_retried(store):
+    store.begin("upload:k1", "fp")
+    assert release_key(store, "upload:k1")      # the request failed
+    assert store.begin("upload:k1", "fp") == (STARTED, None)
+
+
+def test_release_keeps_completed_responses(store):
+    store.begin("upload:k1", "fp")
+    store.complete("upload:k1", 200, "{}", {})
+    store.release("upload:k1")
+    assert store.begin("upload:k1", "fp")[0] == COMPLETED
+
+
+def test_abandoned_key_can_be_taken_over_after_lock_ttl(tmp_path):
+    store = SQLiteIdempotencyStore(str(tmp_path / "idempotency.db"), ttl=60, lock_ttl=0.05)
+    store.begin("upload:k1", "fp")
+    time.sleep(0.1)
+    assert store.begin("upload:k1", "fp") == (STARTED, None)
+
+
+class FlakyStore:
+    """Fails the first ``failures`` calls to complete()"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.completed = []
+
+    def complete(self, key, status_code, body, headers):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("database is locked")
+        self.completed.append(key)
+
+
+def test_complete_key_retries_store_errors():
+    store = FlakyStore(failures=2)
+    assert complete_key(store, "upload:k1", 200, "{}", {}, attempts=3, backoff=0)
+    assert store.completed == ["upload:k1"]
+
+
+def test_complete_key_never_raises():
+    store = FlakyStore(failures=10)
+    assert not complete_key(store, "upload:k1", 200, "{}", {}, attempts=3, backoff=0)
@@ -0,0 +1,166 @@
+import types
+
+import pytest
+
+import job_queue
+from job_queue import (
+    DEAD, QUEUED, RUNNING, SUCCEEDED, RETRY_BACKOFF,
+    JobWorker, PermanentJobError, SQLiteJobQueue, retry_delay
+)
+
+
+class Clock:
+    """Stands in for time.time() inside job_queue"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue, "time", types.SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return SQLiteJobQueue(str(tmp_path / "jobs.db"), visibility_timeout=30, max_attempts=3)
+
+
+def test_retry_delay_follows_backoff_schedule():
+    assert [retry_delay(n) for n in range(6)] == [0, *RETRY_BACKOFF, RETRY_BACKOFF[-1], RETRY_BACKOFF[-1]]
+
+
+def test_claim_leases_oldest_job_of_the_given_kinds(queue, clock):
+    first = queue.enqueue("upload", {"n": 1})
+    clock.advance(1)
+    queue.enqueue("upload", {"n": 2})
+    queue.enqueue("transcode", {"n": 3})
+
+    assert queue.claim("w1", ["other"]) is None
+    job = queue.claim("w1", ["upload"])
+    assert (job["id"], job["state"], job["worker"], job["attempts"]) == (first, RUNNING, "w1", 1)
+    assert job["payload"] == {"n": 1}
+    assert job["lease_expires_at"] == clock.now + 30
+
+
+def test_delayed_job_is_not_claimable_early(queue, clock):
+    queue.enqueue("upload", {}, delay=60)
+    assert queue.claim("w1", ["upload"]) is None
+    clock.advance(60)
+    assert queue.claim("w1", ["upload"]) is not None
+
+
+def test_expired_lease_is_taken_over(queue, clock):
+    job_id = queue.enqueue("upload", {})
+    queue.claim("w1", ["upload"])
+    assert queue.claim("w2", ["upload"]) is None
+
+    clock.advance(31)
+    job = queue.claim("w2", ["upload"])
+    assert (job["id"], job["worker"], job["attempts"]) == (job_id, "w2", 2)
+    # The crashed worker's late result is discarded
+    assert not queue.complete(job_id, "w1", "late")
+    assert queue.fail(job_id, "w1", "late") is None
+    assert queue.complete(job_id, "w2", {"ok": True})
+    assert queue.get(job_id)["state"] == SUCCEEDED
+
+
+def test_extend_keeps_the_lease(queue, clock):
+    queue.enqueue("upload", {})
+    job = queue.claim("w1", ["upload"])
+    clock.advance(25)
+    assert queue.extend(job["id"], "w1")
+    clock.advance(25)
+    assert queue.claim("w2", ["upload"]) is None
+    assert not queue.extend(job["id"], "w2")
+
+
+def test_expired_lease_on_last_attempt_is_dead_lettered(queue, clock):
+    job_id = queue.enqueue("upload", {}, max_attempts=1)
+    queue.claim("w1", ["upload"])
+    clock.advance(31)
+
+    assert queue.claim("w2", ["upload"]) is None
+    job = queue.get(job_id)
+    assert (job["state"], job["error"]) == (DEAD, "Lease expired")
+
+
+def test_failed_attempts_back_off_then_dead_letter(queue, clock):
+    job_id = queue.enqueue("upload", {})
+    for attempt in (1, 2):
+        assert queue.claim("w1", ["upload"])["attempts"] == attempt
+        assert queue.fail(job_id, "w1", "HTTP 500") == QUEUED
+        assert queue.get(job_id)["available_at"] == clock.now + retry_delay(attempt)
+        clock.advance(retry_delay(attempt) - 1)
+        assert queue.claim("w1", ["upload"]) is None
+        clock.advance(1)
+
+    queue.claim("w1", ["upload"])
+    assert queue.fail(job_id, "w1", "HTTP 500") == DEAD
+    assert [job["id"] for job in queue.dead_letters()] == [job_id]
+    assert queue.stats() == {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, DEAD: 1}
+
+
+def test_permanent_failure_skips_retries(queue):
+    job_id = queue.enqueue("upload", {})
+    queue.claim("w1", ["upload"])
+    assert queue.fail(job_id, "w1", "bad video", retry=False) == DEAD
+
+
+def test_retry_dead_restores_attempt_budget(queue):
+    job_id = queue.enqueue("upload", {}, max_attempts=1)
+    queue.claim("w1", ["upload"])
+    queue.fail(job_id, "w1", "HTTP 500")
+
+    assert queue.retry_dead(job_id)
+    assert not queue.retry_dead(job_id)
+    job = queue.claim("w1", ["upload"])
+    assert (job["id"], job["attempts"]) == (job_id, 1)
+
+
+def test_purge_deletes_old_succeeded_jobs_only(queue, clock):
+    done = queue.enqueue("upload", {})
+    queue.claim("w1", ["upload"])
+    queue.complete(done, "w1", None)
+    dead = queue.enqueue("upload", {}, max_attempts=1)
+    queue.claim("w1", ["upload"])
+    queue.fail(dead, "w1", "boom")
+
+    clock.advance(queue.retention + 1)
+    assert queue.purge() == 1
+    assert queue.get(done) is None
+    assert queue.get(dead)["state"] == DEAD
+
+
+def test_worker_records_outcomes_and_finalizes_terminal_jobs(queue, clock):
+    finalized = []
+
+    def upload(payload):
+        if payload["mode"] == "retry":
+            raise RuntimeError("HTTP 503")
+        if payload["mode"] == "permanent":
+            raise PermanentJobError("unsupported format")
+        return {"media_id": "m1"}
+
+    worker = JobWorker(queue, {"upload": upload}, "w1", finalize=lambda job: finalized.append(job["id"]))
+    jobs = []
+    for mode in ("ok", "retry", "permanent"):
+        jobs.append(queue.enqueue("upload", {"mode": mode}))
+        clock.advance(1)
+    for _ in range(3):
+        worker.process(queue.claim("w1", ["upload"]))
+    ok, retry, permanent = jobs
+
+    assert queue.get(ok)["result"] == {"media_id": "m1"}
+    assert queue.get(retry)["state"] == QUEUED
+    assert queue.get(permanent)["state"] == DEAD
+    assert queue.get(permanent)["error"] == "PermanentJobError: unsupported format"
+    assert finalized == [ok, permanent]
@@ -0,0 +1,148 @@
+import threading
+import types
+
+import pytest
+
+import profile_cache
+from profile_cache import ProfileCache
+
+
+class Clock:
+    """Stands in for time.monotonic() inside profile_cache"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(profile_cache, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def wait_for_refreshes(cache):
+    for _ in range(500):
+        if cache.stats()["refreshing"] == 0:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("background refresh never finished")
+
+
+def test_fresh_hit_does_not_call_the_loader(clock):
+    cache = ProfileCache(ttl=300, stale_ttl=3600)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"followers": len(calls)}
+
+    assert cache.get_or_load("youtube", "u1", loader) == {"followers": 1}
+    clock.advance(299)
+    assert cache.get_or_load("youtube", "u1", loader) == {"followers": 1}
+    assert len(calls) == 1
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_stale_hit_serves_old_data_and_refreshes_once(clock):
+    cache = ProfileCache(ttl=300, stale_ttl=3600)
+    cache.put("youtube", "u1", {"followers": 1})
+    clock.advance(301)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return {"followers": 2}
+
+    # Concurrent stale hits share one background refresh
+    for _ in range(3):
+        assert cache.get_or_load("youtube", "u1", loader) == {"followers": 1}
+    release.set()
+    wait_for_refreshes(cache)
+
+    assert len(calls) == 1
+    assert cache.stats()["stale_hits"] == 3
+    assert cache.get("youtube", "u1") == {"followers": 2}
+    assert cache.get_or_load("youtube", "u1", loader) == {"followers": 2}
+    assert len(calls) == 1
+
+
+def test_entry_past_stale_ttl_is_reloaded_synchronously(clock):
+    cache = ProfileCache(ttl=300, stale_ttl=3600)
+    cache.put("youtube", "u1", {"followers": 1})
+    clock.advance(3601)
+    assert cache.get_or_load("youtube", "u1", lambda: {"followers": 2}) == {"followers": 2}
+    assert cache.stats()["misses"] == 1
+
+
+def test_invalidate_during_refresh_discards_the_stale_result(clock):
+    cache = ProfileCache(ttl=300, stale_ttl=3600)
+    cache.put("instagram", "alice", {"media_count": 10})
+    clock.advance(301)
+    started, release = threading.Event(), threading.Event()
+
+    def loader():
+        started.set()
+        release.wait(5)
+        return {"media_count": 10}
+
+    cache.get_or_load("instagram", "alice", loader)
+    assert started.wait(5)
+    cache.invalidate("instagram", "alice")    # e.g. a publish finished
+    release.set()
+    wait_for_refreshes(cache)
+    assert cache.get("instagram", "alice") is None
+
+
+def test_refresh_does_not_overwrite_data_stored_after_invalidate(clock):
+    cache = ProfileCache(ttl=300, stale_ttl=3600)
+    cache.put("instagram", "alice", {"media_count": 10})
+    clock.advance(301)
+    started, release = threading.Event(), threading.Event()
+
+    def loader():
+        started.set()
+        release.wait(5)
+        return {"media_count": 10}
+
+    cache.get_or_load("instagram", "alice", loader)
+    assert started.wait(5)
+    cache.invalidate("instagram", "alice")
+    cache.put("instagram", "alice", {"media_count": 11})
+    release.set()
+    wait_for_refreshes(cache)
+    assert cache.get("instagram", "alice") == {"media_count": 11}
+
+
+def test_failed_refresh_keeps_serving_stale_data(clock):
+    cache = ProfileCache(ttl=300, stale_ttl=3600)
+    cache.put("tiktok", "t1", {"likes": 1})
+    clock.advance(301)
+
+    def loader():
+        raise RuntimeError("upstream 500")
+
+    assert cache.get_or_load("tiktok", "t1", loader) == {"likes": 1}
+    wait_for_refreshes(cache)
+    assert cache.get("tiktok", "t1") == {"likes": 1}
+
+
+def test_least_recently_used_entry_is_evicted_at_the_size_bound(clock):
+    cache = ProfileCache(max_entries=2)
+    cache.put("youtube", "a", {"n": 1})
+    cache.put("youtube", "b", {"n": 2})
+    assert cache.get("youtube", "a") == {"n": 1}    # "b" is now least recently used
+    cache.put("youtube", "c", {"n": 3})
+
+    assert cache.get("youtube", "b") is None
+    assert cache.get("youtube", "a") == {"n": 1}
+    assert cache.get("youtube", "c") == {"n": 3}
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,115 @@
+import json
+import os
+
+from session_store import JournalSessionStore
+
+
+def journal_lines(store):
+    with open(store.journal_path, "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def test_reopen_replays_snapshot_and_journal(tmp_path):
+    base = str(tmp_path / "sessions")
+    store = JournalSessionStore(base, compact_after=100)
+    store.put("instagram", "alice", {"n": 1})
+    store.put("instagram", "bob", {"n": 2})
+    store.put("instagram", "alice", {"n": 3})
+    store.delete("instagram", "bob")
+
+    reopened = JournalSessionStore(base, compact_after=100)
+    assert reopened.items("instagram") == [("alice", {"n": 3})]
+    assert reopened.get("instagram", "bob") is None
+
+
+def test_torn_last_line_is_ignored_and_overwritten(tmp_path):
+    base = str(tmp_path / "sessions")
+    store = JournalSessionStore(base, compact_after=100)
+    store.put("instagram", "alice", {"n": 1})
+    store.put("instagram", "bob", {"n": 2})
+
+    # Crash in the middle of appending a record
+    with open(store.journal_path, "ab") as f:
+        f.write(b'{"op":"put","p":"instagram","a":"carol","d":{"n"')
+
+    recovered = JournalSessionStore(base, compact_after=100)
+    assert recovered.accounts("instagram") == ["alice", "bob"]
+
+    # The next write replaces the torn tail instead of appending after it
+    recovered.put("instagram", "dave", {"n": 4})
+    lines = journal_lines(recovered)
+    assert all(line.endswith(b"\n") for line in lines)
+    assert [json.loads(line)["a"] for line in lines] == ["alice", "bob", "dave"]
+    assert JournalSessionStore(base, compact_after=100).accounts("instagram") == ["alice", "bob", "dave"]
+
+
+def test_corrupt_complete_line_is_skipped(tmp_path):
+    base = str(tmp_path / "sessions")
+    store = JournalSessionStore(base, compact_after=100)
+    store.put("instagram", "alice", {"n": 1})
+    with open(store.journal_path, "ab") as f:
+        f.write(b"not json\n")
+    store.put("instagram", "bob", {"n": 2})
+
+    assert JournalSessionStore(base, compact_after=100).accounts("instagram") == ["alice", "bob"]
+
+
+def test_compaction_checkpoints_state_and_resets_journal(tmp_path):
+    base = str(tmp_path / "sessions")
+    store = JournalSessionStore(base, compact_after=5)
+    for i in range(4):
+        store.put("instagram", "alice", {"n": i})
+    assert not os.path.exists(store.snapshot_path)
+    assert len(journal_lines(store)) == 4
+
+    store.put("instagram", "alice", {"n": 4})    # Fifth record triggers compaction
+    assert os.path.getsize(store.journal_path) == 0
+    with open(store.snapshot_path) as f:
+        snapshot = json.load(f)
+    assert snapshot["sessions"] == [{"platform": "instagram", "account": "alice", "data": {"n": 4}}]
+
+    store.put("youtube", "chan", {"n": 5})
+    reopened = JournalSessionStore(base, compact_after=5)
+    assert reopened.get("instagram", "alice") == {"n": 4}
+    assert reopened.get("youtube", "chan") == {"n": 5}
+
+
+def test_compaction_waits_for_the_journal_to_outgrow_live_data(tmp_path):
+    store = JournalSessionStore(str(tmp_path / "sessions"), compact_after=2)
+    for i in range(5):
+        store.put("instagram", f"user{i}", {"n": i})
+    # Compacted at the second record; with five live sessions the journal
+    # now has to reach five records before the next checkpoint
+    assert len(journal_lines(store)) == 3
+    store.put("instagram", "user0", {"n": 10})
+    assert len(journal_lines(store)) == 4
+    store.put("instagram", "user0", {"n": 11})
+    assert os.path.getsize(store.journal_path) == 0
+
+
+def test_second_instance_sees_writes_and_compactions(tmp_path):
+    base = str(tmp_path / "sessions")
+    first = JournalSessionStore(base, compact_after=3)
+    second = JournalSessionStore(base, compact_after=3)
+
+    first.put("instagram", "alice", {"n": 1})
+    assert second.get("instagram", "alice") == {"n": 1}
+
+    first.put("instagram", "bob", {"n": 2})
+    first.put("instagram", "carol", {"n": 3})    # Compacts: journal replaced
+    second.delete("instagram", "alice")
+    assert first.accounts("instagram") == ["bob", "carol"]
+    assert second.accounts("instagram") == ["bob", "carol"]
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / "instagram_sessions.json"
+    legacy.write_text(json.dumps({"alice": {"n": 1}}))
+    base = str(tmp_path / "sessions")
+
+    store = JournalSessionStore(base, legacy_json=str(legacy))
+    assert store.items("instagram") == [("alice", {"n": 1})]
+
+    store.put("instagram", "alice", {"n": 2})
+    legacy.write_text(json.dumps({"alice": {"n": 99}}))
+    assert JournalSessionStore(base, legacy_json=str(legacy)).get("instagram", "alice") == {"n": 2}
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def wait_for_waiters(flight, key, count):
+    """Block until ``count`` callers are waiting on the call for ``key``"""
+    for _ in range(500):
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call is not None and call.shared >= count:
+                return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"{count} waiting caller(s) never arrived")
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"followers": 10}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, ("youtube", "u1", "validate"), fetch) for _ in range(4)]
+        wait_for_waiters(flight, ("youtube", "u1", "validate"), 3)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert len(calls) == 1
+    assert results == [{"followers": 10}] * 4
+    assert all(result is results[0] for result in results)
+    assert flight.coalesced == 3
+    assert flight.in_flight() == 0
+
+
+def test_error_reaches_every_waiting_caller():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5)
+        raise ValueError("upstream 500")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "key", fetch) for _ in range(3)]
+        wait_for_waiters(flight, "key", 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="upstream 500"):
+                future.result(5)
+    assert flight.in_flight() == 0
+
+
+def test_key_is_released_after_the_call():
+    flight = SingleFlight()
+    results = iter(["first", "second"])
+
+    assert flight.do("key", lambda: next(results)) == "first"
+    assert flight.do("key", lambda: next(results)) == "second"
+    assert flight.coalesced == 0
+
+
+def test_failed_call_is_not_cached():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("timeout")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fetch(value):
+        release.wait(5)
+        return value
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flight.do, "a", lambda: fetch("a"))
+        second = pool.submit(flight.do, "b", lambda: fetch("b"))
+        release.set()
+        assert (first.result(5), second.result(5)) == ("a", "b")
+    assert flight.coalesced == 0
+
+
+def test_do_async_coalesces_across_tasks():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "profile"
+
+    async def main():
+        tasks = [asyncio.create_task(flight.do_async("key", fetch)) for _ in range(3)]
+        await asyncio.to_thread(wait_for_waiters, flight, "key", 2)
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(main()) == ["profile"] * 3
+    assert len(calls) == 1
@@ -0,0 +1,160 @@
+"""
+Token Refresh Scheduler
+Refreshes stored platform credentials in the background shortly before they
+expire, so publish requests start with a valid token
+"""
+
+import time
+import heapq
+import threading
+import logging
+from itertools import count
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A refresher gets the account id and returns the new expiry (unix time), or
+# None when the account should no longer be tracked (logged out, revoked)
+Refresher = Callable[[str], Optional[float]]
+
+
+class TokenRefreshScheduler:
+    """
+    Expiry-ordered priority queue of stored credentials
+
+    Each (platform, account) is due ``lead_time`` seconds before its token
+    expires. One background thread pops due entries in expiry order and runs
+    the platform's refresher, at most one refresh every ``min_interval``
+    seconds. Failed refreshes are retried after ``retry_delay`` seconds.
+    Rescheduling an account replaces its previous entry.
+    """
+
+    def __init__(self, lead_time: float = 600, min_interval: float = 1.0, retry_delay: float = 300):
+        self.lead_time = lead_time
+        self.min_interval = min_interval
+        self.retry_delay = retry_delay
+
+        self._refreshers: Dict[str, Refresher] = {}
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._due: Dict[Tuple[str, str], float] = {}
+        self._seq = count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._last_refresh = 0.0
+
+        self.refreshed = 0
+        self.failed = 0
+
+    def add_refresher(self, platform: str, refresher: Refresher) -> None:
+        """Register the refresh function for a platform"""
+        self._refreshers[platform] = refresher
+
+    def schedule(self, platform: str, account: str, expires_at: Optional[float]) -> None:
+        """
+        Track a credential (or move it) in the queue
+
+        Args:
+            platform: Platform with a registered refresher
+            account: Account identifier on that platform
+            expires_at: Unix time the current token expires; None stops tracking
+        """
+        if expires_at is None:
+            self.cancel(platform, account)
+            return
+        self._push(platform, account, expires_at - self.lead_time)
+
+    def cancel(self, platform: str, account: str) -> None:
+        """Stop tracking a credential (e.g. on logout)"""
+        with self._cond:
+            # Heap entry is dropped lazily when it reaches the top
+            self._due.pop((platform, account), None)
+
+    def start(self) -> None:
+        """Start the background refresh thread"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="token-refresh", daemon=True)
+            self._thread.start()
+        logger.info(f"Token refresh scheduler started ({len(self._due)} credentials tracked)")
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        """Return queue size, next due time and counters"""
+        with self._cond:
+            next_due = min(self._due.values()) if self._due else None
+            return {
+                "tracked": len(self._due),
+                "next_due_in": round(next_due - time.time(), 1) if next_due is not None else None,
+                "refreshed": self.refreshed,
+                "failed": self.failed
+            }
+
+    def _push(self, platform: str, account: str, due: float) -> None:
+        with self._cond:
+            self._due[(platform, account)] = due
+            heapq.heappush(self._heap, (due, next(self._seq), platform, account))
+            self._cond.notify()
+
+    def _next_due(self) -> Optional[Tuple[str, str]]:
+        """Block until an entry is due; return its key (None when stopped)"""
+        with self._cond:
+            while not self._stopped:
+                # Skip entries that were cancelled or rescheduled
+                while self._heap:
+                    due, _, platform, account = self._heap[0]
+                    if self._due.get((platform, account)) == due:
+                        break
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - time.time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                _, _, platform, account = heapq.heappop(self._heap)
+                del self._due[(platform, account)]
+                return platform, account
+            return None
+
+    def _run(self) -> None:
+        while True:
+            key = self._next_due()
+            if key is None:
+                return
+            platform, account = key
+
+            # Rate limit refresh calls so a burst of expiries is spread out
+            delay = self._last_refresh + self.min_interval - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            self._last_refresh = time.time()
+
+            refresher = self._refreshers.get(platform)
+            if refresher is None:
+                logger.warning(f"No token refresher registered for {platform}")
+                continue
+            try:
+                expires_at = refresher(account)
+                self.refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Token refresh failed for {platform}:{account}, retrying in {self.retry_delay}s: {e}")
+                self._push(platform, account, time.time() + self.retry_delay)
+                continue
+            if expires_at is None:
+                continue
+            if expires_at - self.lead_time <= time.time():
+                # Still inside the lead window - don't spin on a token that
+                # could not be renewed far enough
+                self._push(platform, account, time.time() + self.retry_delay)
+            else:
+                self.schedule(platform, account, expires_at)
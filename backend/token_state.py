@@ -0,0 +1,170 @@
+"""
+Token State Cache
+Per-token validity verdicts (valid/invalid, scopes, expiry) learned from
+login responses, successful API calls and auth failures
+"""
+
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Graph API OAuthException codes and TikTok error codes that mean the token itself is bad
+GRAPH_AUTH_ERROR_CODES = {102, 190, 463, 467}
+TIKTOK_AUTH_ERROR_CODES = {"access_token_invalid", "scope_not_authorized", "token_expired"}
+
+
+def token_fingerprint(token: str) -> str:
+    """Stable, non-reversible key for a token (raw tokens are never stored)"""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def is_auth_failure(status_code: int, payload: Any = None) -> bool:
+    """
+    Decide whether an upstream error response means the token is invalid
+
+    Args:
+        status_code: HTTP status code of the upstream response
+        payload: Parsed JSON body, if any
+
+    Returns:
+        True for auth failures (401, Graph OAuthException, TikTok token errors)
+    """
+    if status_code == 401:
+        return True
+    if not isinstance(payload, dict):
+        return False
+
+    error = payload.get("error")
+    if isinstance(error, dict):
+        # Graph API: {"error": {"type": "OAuthException", "code": 190}}
+        if error.get("type") == "OAuthException" or error.get("code") in GRAPH_AUTH_ERROR_CODES:
+            return True
+        # TikTok: {"error": {"code": "access_token_invalid"}}
+        if error.get("code") in TIKTOK_AUTH_ERROR_CODES:
+            return True
+    elif isinstance(error, str) and error in TIKTOK_AUTH_ERROR_CODES:
+        return True
+    return False
+
+
+class TokenStateCache:
+    """
+    Cache of token validity verdicts
+
+    A valid verdict is trusted for ``valid_ttl`` seconds (and never past the
+    token's own expiry); an invalid verdict for ``invalid_ttl`` seconds.
+    Callers go upstream only when there is no fresh verdict, and feed the
+    outcome of every upstream call back in.
+    """
+
+    def __init__(self, valid_ttl: float = 300, invalid_ttl: float = 3600, max_entries: int = 4096):
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self.max_entries = max_entries
+
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record_valid(self, platform: str, token: str, scopes: Optional[List[str]] = None,
+                     expires_in: Optional[float] = None, expires_at: Optional[float] = None,
+                     details: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Record that a token was accepted upstream
+
+        Args:
+            platform: Platform the token belongs to
+            token: Access token
+            scopes: Granted scopes, if known (kept from earlier verdicts otherwise)
+            expires_in: Seconds until the token expires, if known
+            expires_at: Absolute expiry (unix time), if known
+            details: Last successful validation payload, served to pollers
+        """
+        if not token:
+            return
+        if expires_in is not None:
+            expires_at = time.time() + float(expires_in)
+
+        key = token_fingerprint(token)
+        with self._lock:
+            previous = self._states.get(key, {})
+            self._states[key] = {
+                "platform": platform,
+                "valid": True,
+                "scopes": scopes if scopes is not None else previous.get("scopes"),
+                "expires_at": expires_at if expires_at is not None else previous.get("expires_at"),
+                "checked_at": time.time(),
+                "reason": None,
+                "details": details if details is not None else previous.get("details")
+            }
+            self._touch(key)
+
+    def record_invalid(self, platform: str, token: str, reason: str) -> None:
+        """Record that a token was rejected upstream with an auth error"""
+        if not token:
+            return
+        key = token_fingerprint(token)
+        with self._lock:
+            previous = self._states.get(key, {})
+            self._states[key] = {
+                "platform": platform,
+                "valid": False,
+                "scopes": previous.get("scopes"),
+                "expires_at": previous.get("expires_at"),
+                "checked_at": time.time(),
+                "reason": reason,
+                "details": None
+            }
+            self._touch(key)
+        logger.info(f"Marked {platform} token invalid: {reason}")
+
+    def verdict(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a fresh verdict for a token
+
+        Returns:
+            State dict (valid, scopes, expires_at, checked_at, reason, details),
+            or None if the verdict is unknown or stale
+        """
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            state = self._states.get(token_fingerprint(token))
+            if state is None:
+                return None
+            if state["valid"]:
+                if state["expires_at"] is not None and now >= state["expires_at"]:
+                    return None
+                if now - state["checked_at"] > self.valid_ttl:
+                    return None
+            elif now - state["checked_at"] > self.invalid_ttl:
+                return None
+            return dict(state)
+
+    def forget(self, token: str) -> None:
+        """Drop any verdict for a token (e.g. on logout)"""
+        if not token:
+            return
+        with self._lock:
+            self._states.pop(token_fingerprint(token), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return verdict counts"""
+        with self._lock:
+            valid = sum(1 for state in self._states.values() if state["valid"])
+            return {
+                "entries": len(self._states),
+                "valid": valid,
+                "invalid": len(self._states) - valid
+            }
+
+    def _touch(self, key: str) -> None:
+        """Mark a key as recently used and enforce the size bound (lock held)"""
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
@@ -0,0 +1,412 @@
+"""
+Tracing
+Lightweight spans for requests and jobs: one trace per HTTP request or
+queued job, with spans for pipeline stages (ingest, transcode, storage
+upload, container creation, publish...) and outbound HTTP calls
+
+Finished traces are exported in the background to:
+    file:///path/to/traces.jsonl  - one JSON trace per line
+    http://collector:4318         - OTLP/HTTP (JSON encoding), e.g. an OpenTelemetry Collector
+
+Synchronous responses also carry a Server-Timing header summarizing stages.
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import random
+import secrets
+import threading
+import contextlib
+import contextvars
+import urllib.request
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Spans kept per trace; later ones are dropped (and counted)
+MAX_SPANS_PER_TRACE = 1000
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None, start_ns: Optional[int] = None):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.finished(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class Trace:
+    """Spans of one request or job; exported when its root span ends"""
+
+    def __init__(self, tracer: "Tracer", trace_id: Optional[str] = None):
+        self.tracer = tracer
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def finished(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped += 1
+                return
+            self.spans.append(span)
+        if span is self.root:
+            self.tracer.export(self)
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: total duration of each stage name (outbound
+        calls grouped per upstream), so far, plus the overall time and trace id
+        """
+        with self._lock:
+            spans = [span for span in self.spans if span is not self.root]
+        totals: Dict[str, float] = {}
+        for span in spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        if self.root is not None:
+            entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        entries.append(f'trace;desc="{self.trace_id}"')
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name if self.root else None,
+            "duration_ms": round(self.root.duration_ms, 3) if self.root else None,
+            "dropped_spans": self.dropped,
+            "spans": [span.to_dict() for span in spans]
+        }
+
+
+class Tracer:
+    """Starts traces and spans, and hands finished traces to an exporter"""
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def configure(self, exporter=None, sample_rate: float = 1.0) -> None:
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def export(self, trace: Trace) -> None:
+        if self.exporter is not None and random.random() < self.sample_rate:
+            self.exporter.submit(trace)
+
+    @contextlib.contextmanager
+    def trace(self, name: str, traceparent: Optional[str] = None, kind: str = "server", **attributes) -> Iterator[Span]:
+        """
+        Start a trace whose root span covers the block
+
+        Args:
+            name: Root span name, e.g. "POST /api/youtube/upload-short" or "job youtube_short"
+            traceparent: W3C traceparent of the caller, continued if valid
+        """
+        trace_id, parent_id = None, None
+        match = _TRACEPARENT.match(traceparent or "")
+        if match:
+            trace_id, parent_id = match.groups()
+        trace = Trace(self, trace_id)
+        root = trace.root = Span(trace, name, parent_id, kind, attributes)
+        token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.end(error=e)
+            raise
+        finally:
+            _current_span.reset(token)
+            root.end()
+
+
+tracer = Tracer()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace() -> Optional[Trace]:
+    span = _current_span.get()
+    return span.trace if span is not None else None
+
+
+def traceparent() -> Optional[str]:
+    """W3C traceparent of the current span (to continue the trace elsewhere, e.g. in a job)"""
+    span = _current_span.get()
+    if span is None:
+        return None
+    return f"00-{span.trace.trace_id}-{span.span_id}-01"
+
+
+def start_span(name: str, kind: str = "internal", **attributes) -> Optional[Span]:
+    """
+    Start a child of the current span without making it current (for hooks
+    whose start and end are separate callbacks). None outside a trace.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+    """Child span of the current span covering the block (no-op outside a trace)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, kind, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.end(error=e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+class BatchExporter:
+    """
+    Exports finished traces from a background thread so requests never wait
+    on the collector; traces are dropped when the buffer is full
+    """
+
+    def __init__(self, max_buffer: int = 1000, batch_size: int = 50, flush_interval: float = 2.0):
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=max_buffer)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def write(self, traces: List[Trace]) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                logger.warning(f"Exporting {len(batch)} trace(s) failed: {e}")
+
+
+class JSONFileExporter(BatchExporter):
+    """Appends each trace as one JSON line"""
+
+    def __init__(self, path: str, **kwargs):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        super().__init__(**kwargs)
+
+    def write(self, traces: List[Trace]) -> None:
+        with open(self.path, "a") as f:
+            for trace in traces:
+                f.write(json.dumps(trace.to_dict(), default=str) + "\n")
+
+
+class OTLPExporter(BatchExporter):
+    """Posts traces to an OTLP/HTTP collector (JSON encoding, POST {endpoint}/v1/traces)"""
+
+    KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+    def __init__(self, endpoint: str, service_name: str = "cast-backend", timeout: float = 5, **kwargs):
+        self.url = endpoint.rstrip("/") + ("" if endpoint.rstrip("/").endswith("/v1/traces") else "/v1/traces")
+        self.service_name = service_name
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        encoded = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                encoded.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                encoded.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                encoded.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                encoded.append({"key": key, "value": {"stringValue": str(value)}})
+        return encoded
+
+    def _span(self, trace: Trace, span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": self.KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns or span.start_ns),
+            "attributes": self._attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def write(self, traces: List[Trace]) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "tracing"},
+                    "spans": [self._span(trace, span) for trace in traces for span in list(trace.spans)]
+                }]
+            }]
+        }
+        # urllib rather than requests, so exports aren't traced or counted as upstream calls
+        request = urllib.request.Request(
+            self.url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def create_exporter(url: str, **kwargs) -> Optional[BatchExporter]:
+    """
+    Create a trace exporter from a URL
+
+    Args:
+        url: "" (no export), file:///path/traces.jsonl or http(s)://collector:4318
+        **kwargs: service_name for OTLP, max_buffer
+
+    Returns:
+        BatchExporter instance, or None when export is disabled
+    """
+    if not url:
+        return None
+    if url.startswith("file://"):
+        kwargs.pop("service_name", None)
+        return JSONFileExporter(url[len("file://"):], **kwargs)
+    if url.startswith(("http://", "https://")):
+        return OTLPExporter(url, **kwargs)
+    raise ValueError(f"Unsupported TRACE_EXPORT_URL: {url}")
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware starting a trace per HTTP request
+
+    Receiving the request body is recorded as the ``ingest`` span (for
+    multipart uploads this includes parsing, which consumes the body as it
+    arrives). A Server-Timing header with per-stage totals and the trace id
+    is added to every response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"traceparent", b"").decode("latin-1")
+        name = f"{scope['method']} {scope['path']}"
+
+        with tracer.trace(name, incoming, method=scope["method"], path=scope["path"]) as root:
+            trace = root.trace
+            ingest_started: Optional[int] = None
+            ingest_bytes = 0
+
+            async def traced_receive():
+                nonlocal ingest_started, ingest_bytes
+                message = await receive()
+                if message["type"] == "http.request":
+                    if ingest_started is None:
+                        ingest_started = time.time_ns()
+                    ingest_bytes += len(message.get("body", b""))
+                    if not message.get("more_body") and ingest_bytes:
+                        ingest = Span(trace, "ingest", root.span_id, "internal", {"bytes": ingest_bytes},
+                                      start_ns=ingest_started)
+                        ingest.end()
+                return message
+
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        root.name = f"{scope['method']} {route}"
+                    root.set(status=message["status"])
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", trace.server_timing().encode("latin-1"))
+                    ]
+                await send(message)
+
+            await self.app(scope, traced_receive, traced_send)
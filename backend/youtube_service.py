@@ -0,0 +1,119 @@
+"""
+YouTube Service Cache
+YouTube Data API service objects built once per credential from the
+discovery document bundled with google-api-python-client
+"""
+
+import threading
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+from lazy_imports import lazy_module
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+# Imported on first use (see lazy_imports)
+googleapiclient_discovery = lazy_module("googleapiclient.discovery")
+googleapiclient_discovery_cache = lazy_module("googleapiclient.discovery_cache")
+
+logger = logging.getLogger(__name__)
+
+_discovery_document: Optional[str] = None
+_discovery_lock = threading.Lock()
+
+
+def youtube_discovery_document() -> str:
+    """youtube v3 discovery document (read from the package once, no network)"""
+    global _discovery_document
+    if _discovery_document is None:
+        with _discovery_lock:
+            if _discovery_document is None:
+                document = googleapiclient_discovery_cache.get_static_doc("youtube", "v3")
+                if document is None:
+                    raise RuntimeError("youtube v3 discovery document is not bundled with google-api-python-client")
+                _discovery_document = document
+    return _discovery_document
+
+
+def build_youtube_service(credentials: "Credentials"):
+    """Build an uncached YouTube service (e.g. before the channel id is known)"""
+    # Parsed per build on purpose: googleapiclient mutates the parsed document
+    # while it creates methods, so a shared dict is not safe across threads
+    return googleapiclient_discovery.build_from_document(youtube_discovery_document(), credentials=credentials)
+
+
+class _Entry:
+    def __init__(self, token: str, service):
+        self.token = token
+        self.service = service
+        self.lock = threading.Lock()
+
+
+class YouTubeServiceCache:
+    """
+    Bounded LRU of YouTube services keyed by account
+
+    A service (and its authorized HTTP transport) is reused for as long as
+    the account's access token stays the same; a new token builds a new
+    service. httplib2 transports are not thread-safe, so each service is
+    used by one caller at a time through ``service()``.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.builds = 0
+
+    @contextmanager
+    def service(self, account: str, credentials: "Credentials") -> Iterator[Any]:
+        """
+        Borrow the account's service for the duration of the block
+
+        Args:
+            account: YouTube channel id
+            credentials: Current credentials for the account
+
+        Yields:
+            googleapiclient Resource for youtube v3
+        """
+        with self._lock:
+            entry = self._entries.get(account)
+            if entry is not None and entry.token == credentials.token:
+                self._entries.move_to_end(account)
+                self.hits += 1
+            else:
+                entry = None
+
+        if entry is None:
+            entry = _Entry(credentials.token, build_youtube_service(credentials))
+            with self._lock:
+                self.builds += 1
+                self._entries[account] = entry
+                self._entries.move_to_end(account)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        with entry.lock:
+            yield entry.service
+
+    def invalidate(self, account: str) -> None:
+        """Drop an account's service (logout)"""
+        with self._lock:
+            self._entries.pop(account, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "builds": self.builds
+            }